@@ -3,27 +3,64 @@ Classes relating to button use and management, leveraging asyncio Events to
 signal button presses.
 """
 
-from asyncio import Event, sleep
+from asyncio import Event, ThreadSafeFlag, wait_for_ms, TimeoutError
 from re import sub
+from time import ticks_ms, ticks_diff
 
 from machine import Pin
 
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
+
+DEBOUNCE_MS = 20
+LONG_PRESS_MS = 1000
+MULTI_CLICK_MS = 400
+
+EVENT_PRESS = "press"
+EVENT_RELEASE = "release"
+EVENT_LONG_PRESS = "long_press"
+EVENT_MULTI_CLICK = "multi_click"
 
 
 class Button:
     """
     Class to represent a button, with a name, GPIO pin, and an Event to signal
+    presses.
+    A pin interrupt records the time of the latest edge, and the watcher
+    task sleeps until an edge arrives or a debounce, long press or
+    multi-click timeout is due. A level change is only accepted once the pin
+    has had no edges for DEBOUNCE_MS, so bounce and short glitches are
+    ignored.
+    An optional event handler is called with the event type and a click
+    count for press, release, long press and multi-click events.
     """
 
     def __init__(
-        self, gpio_pin: int, button_name: str, button_pressed_event: Event
+        self, gpio_pin: int, button_name: str, button_pressed_event: Event, event_handler=None
     ) -> None:
-        self.logger = uLogger(f"Button {gpio_pin}")
+        self.logger = get_logger(f"Button {gpio_pin}")
         self.gpio = gpio_pin
         self.pin = Pin(gpio_pin, Pin.IN, Pin.PULL_UP)
         self.name = button_name
         self.button_pressed = button_pressed_event
+        self.event_handler = event_handler
+        self.edge_flag = ThreadSafeFlag()
+        self.stable_level = 1
+        self.last_edge = ticks_ms()
+        self.settle_pending = False
+        self.pressed = False
+        self.press_time = 0
+        self.release_time = 0
+        self.long_press_sent = False
+        self.click_count = 0
+        self._irq_handler_ref = self._irq_handler
+
+    def _irq_handler(self, pin: Pin) -> None:
+        """
+        Hard interrupt handler recording the edge time without allocating.
+        """
+        self.last_edge = ticks_ms()
+        self.settle_pending = True
+        self.edge_flag.set()
 
     async def wait_for_press(self) -> None:
         """
@@ -32,31 +69,98 @@ class Button:
         Also logs button press and release.
         """
         self.logger.info(f"Starting button press watcher for button: {self.name}")
+        self.stable_level = self.pin.value()
+        self.last_edge = ticks_ms()
+        self.pin.irq(trigger=Pin.IRQ_FALLING | Pin.IRQ_RISING, handler=self._irq_handler_ref, hard=True)
 
         while True:
-            current_value = self.pin.value()
-            active = 0
-            while active < 20:
-                if self.pin.value() != current_value:
-                    active += 1
-                else:
-                    active = 0
-                await sleep(0.001)
-
-            if self.pin.value() == 0:
-                self.logger.info(f"Button pressed: {self.name}")
-                self.button_pressed.set()
+            timeout_ms = self.next_timeout_ms(ticks_ms())
+            if timeout_ms is None:
+                await self.edge_flag.wait()
+            else:
+                try:
+                    await wait_for_ms(self.edge_flag.wait(), timeout_ms)
+                except TimeoutError:
+                    pass
+            self.process(ticks_ms())
+
+    def next_timeout_ms(self, now: int) -> int | None:
+        """
+        Return milliseconds until the next debounce, long press or
+        multi-click deadline, or None if the button is idle.
+        """
+        deadlines = []
+        if self.settle_pending:
+            deadlines.append(DEBOUNCE_MS - ticks_diff(now, self.last_edge))
+        if self.pressed and not self.long_press_sent:
+            deadlines.append(LONG_PRESS_MS - ticks_diff(now, self.press_time))
+        if not self.pressed and self.click_count:
+            deadlines.append(MULTI_CLICK_MS - ticks_diff(now, self.release_time))
+        if not deadlines:
+            return None
+        return max(1, min(deadlines))
+
+    def process(self, now: int) -> None:
+        """
+        Accept the pin level once it has been stable for DEBOUNCE_MS and
+        raise any events that are due.
+        """
+        if self.settle_pending and ticks_diff(now, self.last_edge) >= DEBOUNCE_MS:
+            # Clear the flag before re-checking, so an edge arriving from the
+            # interrupt in between leaves the settle pending
+            self.settle_pending = False
+            last_edge = self.last_edge
+            if ticks_diff(now, last_edge) < DEBOUNCE_MS:
+                self.settle_pending = True
             else:
-                self.logger.info(f"Button released: {self.name}")
+                level = self.pin.value()
+                if level != self.stable_level:
+                    self._change_level(level, last_edge)
+
+        if self.pressed and not self.long_press_sent and ticks_diff(now, self.press_time) >= LONG_PRESS_MS:
+            self.long_press_sent = True
+            self.click_count = 0
+            self.logger.info(f"Button long pressed: {self.name}")
+            self._send_event(EVENT_LONG_PRESS, 1)
+
+        if not self.pressed and self.click_count and ticks_diff(now, self.release_time) >= MULTI_CLICK_MS:
+            if self.click_count > 1:
+                self.logger.info(f"Button clicked {self.click_count} times: {self.name}")
+                self._send_event(EVENT_MULTI_CLICK, self.click_count)
+            self.click_count = 0
+
+    def _change_level(self, level: int, change_ticks: int) -> None:
+        self.stable_level = level
+        if level == 0:
+            self.pressed = True
+            self.press_time = change_ticks
+            self.long_press_sent = False
+            self.logger.info(f"Button pressed: {self.name}")
+            self.button_pressed.set()
+            self._send_event(EVENT_PRESS, self.click_count + 1)
+        else:
+            self.pressed = False
+            self.release_time = change_ticks
+            if not self.long_press_sent:
+                self.click_count += 1
+            self.logger.info(f"Button released: {self.name}")
+            self._send_event(EVENT_RELEASE, self.click_count)
+
+    def _send_event(self, event: str, count: int) -> None:
+        if self.event_handler is not None:
+            try:
+                self.event_handler(event, count)
+            except Exception as e:
+                self.logger.error(f"Button event handler failed for {event}: {e}")
 
     def get_name(self) -> str:
         """Get the name of the button"""
         return self.name
-    
+
     def get_id(self) -> str:
         """Get the ID of the button"""
         return sub(r"\s+", "_", self.name).lower()
-    
+
     def get_pin(self) -> int:
         """Get the GPIO pin of the button"""
         return self.gpio
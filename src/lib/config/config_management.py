@@ -1,4 +1,4 @@
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 import lib.config.config_template as config_template
 import config
 
@@ -8,7 +8,7 @@ class ConfigManagement:
     Apply defaults from config_template where values are missing in config.
     """
     def __init__(self) -> None:
-        self.log = uLogger("ConfigManagement")
+        self.log = get_logger("ConfigManagement")
         self.error_count = 0
     
     def configure_error_handling(self) -> None:
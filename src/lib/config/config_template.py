@@ -1,10 +1,21 @@
 ## Logging
 # Level 0-4: 0 = Disabled, 1 = Critical, 2 = Error, 3 = Warning, 4 = Info
 LOG_LEVEL = 2
-# Handlers: Populate list with zero or more of the following log output handlers (case sensitive): "Console", "File"
+# Handlers: Populate list with zero or more of the following log output handlers (case sensitive): "Console", "File", "Syslog"
 LOG_HANDLERS = ["Console", "File"]
-# Max log file size in bytes, there will be a maximum of 2 files at this size created
+# Max log segment size in bytes before a new segment is started
 LOG_FILE_MAX_SIZE = 10240
+# Number of log segments kept, the oldest is deleted when a new one is started, so logs use up to LOG_FILE_SEGMENTS * LOG_FILE_MAX_SIZE bytes
+LOG_FILE_SEGMENTS = 4
+# Log file lines are buffered in memory and written when this many bytes are buffered, critical messages are written immediately
+LOG_FILE_BUFFER_SIZE = 1024
+# Maximum time in milliseconds log file lines are buffered before being written
+LOG_FILE_FLUSH_MS = 5000
+# Syslog collector host name or IP address and UDP port for the "Syslog" log handler
+LOG_SYSLOG_HOST = ""
+LOG_SYSLOG_PORT = 514
+# Number of log records held for the syslog collector, further records are dropped while the collector cannot be reached
+LOG_SYSLOG_QUEUE_SIZE = 32
 
 ## IO
 SPACE_OPEN_BUTTON = 12
@@ -53,6 +64,8 @@ I2C_FREQ = 400000
 
 ## Sensors - Populate driver list with connected sensor modules from this supported list: ["SGP30", "BME280", "SCD30"]
 SENSOR_MODULES = []
+# Optional per module poll interval overrides in seconds, e.g. {"SCD30": 10}. Modules not listed are polled every 60 seconds
+SENSOR_POLL_INTERVALS_S = {}
 
 # Default CO2 calibration value for SCD30 (global average is currently 427)
 DEFAULT_CO2_CALIBRATION_VALUE = 427
@@ -69,20 +82,36 @@ CO2_ALARM_SILENCE_WINDOW_END_HOUR = 8
 # CO2 alarm GPIO pin config
 CO2_ALARM_LED_PIN = 6
 CO2_ALARM_BUZZER_PIN = 4
+# Tone frequency in Hz to drive a passive CO2 alarm buzzer with PWM, leave at 0 for an active buzzer switched on and off
+CO2_ALARM_BUZZER_PWM_FREQ = 0
 CO2_ALARM_SNOOZE_BUTTON_PIN = 5
 
+# Additional alarm rules for any configured sensor, sharing the CO2 alarm LED, buzzer, snooze and silence window. Each rule is a dict with
+# "module" and "sensor" and one or both of "threshold" (with optional "reset_threshold" to reset at) and "rate_per_min" (rise per minute),
+# plus optional "name" and "sustain_s" (seconds the condition must hold before triggering), e.g.
+# [{"name": "Hot", "module": "BME280", "sensor": "temperature", "threshold": 30, "reset_threshold": 28, "sustain_s": 300}]
+ALARM_RULES = []
+
 ## Sensor logging
 # Enable sensor logging to SMIB server
 SENSOR_LOGGING_ENABLED = True
-# Enable local sensor log cache in addition to pushing to SMIB (Not recommended as even pico2 has memory issues with this enabled)
+# Enable local minute and hour sensor logs on flash in addition to pushing to SMIB
 SENSOR_LOG_CACHE_ENABLED = False
-# This value will also be used to rotate out the failed API transaction logs if connection to the server fails
+# Size in bytes of each of the minute and hour sensor log files, older entries are overwritten once full
 SENSOR_LOG_FILE_MAX_SIZE = 50000
+# Maximum size in bytes of the queue of readings waiting to be pushed to SMIB, oldest readings are dropped once full during long outages
+SENSOR_UPLOAD_QUEUE_MAX_SIZE = 200000
+# Maximum number of queued readings sent to SMIB in each push request
+SENSOR_UPLOAD_BATCH_SIZE = 60
+# Push readings to SMIB in the compact columnar format, SMIB must support it (server echoes the schema_id once it has stored the units)
+SENSOR_UPLOAD_COMPACT_FORMAT = False
 
 ## Displays - Populate driver list with connected displays from this supported list: ["LCD1602", "SSD1306"]
 DISPLAY_DRIVERS = ["LCD1602", "SSD1306"]
 # Scroll speed for text on displays in characters per second
 SCROLL_SPEED = 4
+# Minimum time in milliseconds between display redraws, updates arriving within a frame are merged and only the latest value of each is drawn
+DISPLAY_FRAME_MS = 100
 
 ## RFID reader
 RFID_ENABLED = False
@@ -97,6 +126,12 @@ ENABLE_UI_LOGGING_UPLOAD = False
 ## Overclocking - Pico1 default 133MHz, Pico2 default 150MHz
 CLOCK_FREQUENCY = 250000000
 
+## Diagnostics
+# Event loop lag sampling interval in milliseconds for /api/system/loop, set to 0 to disable sampling
+LOOP_MONITOR_INTERVAL_MS = 100
+# Named tasks holding the event loop for longer than this many milliseconds are logged as stalls
+LOOP_MONITOR_STALL_MS = 50
+
 ## Configuration sections for API output
 # 
 # This dictionary defines the logical grouping and order of configuration variables
@@ -120,7 +155,7 @@ CLOCK_FREQUENCY = 250000000
 #    Reorder sections here to change the display order.
 #
 CONFIG_SECTIONS = {
-    "Logging": ["LOG_LEVEL", "LOG_HANDLERS", "LOG_FILE_MAX_SIZE"],
+    "Logging": ["LOG_LEVEL", "LOG_HANDLERS", "LOG_FILE_MAX_SIZE", "LOG_FILE_SEGMENTS", "LOG_FILE_BUFFER_SIZE", "LOG_FILE_FLUSH_MS", "LOG_SYSLOG_HOST", "LOG_SYSLOG_PORT", "LOG_SYSLOG_QUEUE_SIZE"],
     "IO": ["SPACE_OPEN_BUTTON", "SPACE_CLOSED_BUTTON", "SPACE_OPEN_LED", "SPACE_CLOSED_LED", "SPACE_OPEN_RELAY", "SPACE_OPEN_RELAY_ACTIVE_HIGH"],
     "WIFI": ["WIFI_SSID", "WIFI_PASSWORD", "WIFI_COUNTRY", "WIFI_CONNECT_TIMEOUT_SECONDS", "WIFI_CONNECT_RETRIES", "WIFI_RETRY_BACKOFF_SECONDS", "CUSTOM_HOSTNAME"],
     "NTP": ["NTP_SYNC_INTERVAL_SECONDS"],
@@ -128,11 +163,12 @@ CONFIG_SECTIONS = {
     "Web": ["WEBSERVER_HOST", "WEBSERVER_PORT"],
     "Space": ["SPACE_STATE_POLL_PERIOD_S", "ADD_HOURS_INPUT_TIMEOUT"],
     "I2C": ["SDA_PIN", "SCL_PIN", "I2C_ID", "I2C_FREQ"],
-    "Sensors": ["SENSOR_MODULES", "DEFAULT_CO2_CALIBRATION_VALUE"],
-    "CO2_Alarm": ["CO2_ALARM_THRESHOLD_PPM", "CO2_ALARM_RESET_THRESHOLD_PPM", "CO2_ALARM_SNOOZE_DURATION_S", "CO2_ALARM_SILENCE_WINDOW_START_HOUR", "CO2_ALARM_SILENCE_WINDOW_END_HOUR", "CO2_ALARM_LED_PIN", "CO2_ALARM_BUZZER_PIN", "CO2_ALARM_SNOOZE_BUTTON_PIN"],
-    "Sensor_Logging": ["SENSOR_LOGGING_ENABLED", "SENSOR_LOG_CACHE_ENABLED", "SENSOR_LOG_FILE_MAX_SIZE"],
-    "Displays": ["DISPLAY_DRIVERS", "SCROLL_SPEED"],
+    "Sensors": ["SENSOR_MODULES", "SENSOR_POLL_INTERVALS_S", "DEFAULT_CO2_CALIBRATION_VALUE"],
+    "CO2_Alarm": ["CO2_ALARM_THRESHOLD_PPM", "CO2_ALARM_RESET_THRESHOLD_PPM", "CO2_ALARM_SNOOZE_DURATION_S", "CO2_ALARM_SILENCE_WINDOW_START_HOUR", "CO2_ALARM_SILENCE_WINDOW_END_HOUR", "CO2_ALARM_LED_PIN", "CO2_ALARM_BUZZER_PIN", "CO2_ALARM_BUZZER_PWM_FREQ", "CO2_ALARM_SNOOZE_BUTTON_PIN", "ALARM_RULES"],
+    "Sensor_Logging": ["SENSOR_LOGGING_ENABLED", "SENSOR_LOG_CACHE_ENABLED", "SENSOR_LOG_FILE_MAX_SIZE", "SENSOR_UPLOAD_QUEUE_MAX_SIZE", "SENSOR_UPLOAD_BATCH_SIZE", "SENSOR_UPLOAD_COMPACT_FORMAT"],
+    "Displays": ["DISPLAY_DRIVERS", "SCROLL_SPEED", "DISPLAY_FRAME_MS"],
     "RFID": ["RFID_ENABLED", "RFID_SCK", "RFID_MOSI", "RFID_MISO", "RFID_RST", "RFID_CS"],
     "UI_Logging": ["ENABLE_UI_LOGGING_UPLOAD"],
     "Overclocking": ["CLOCK_FREQUENCY"],
+    "Diagnostics": ["LOOP_MONITOR_INTERVAL_MS", "LOOP_MONITOR_STALL_MS"],
 }
@@ -2,7 +2,7 @@
 
 # -*- coding: utf-8 -*-
 from time import sleep
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 from lib.displays.display import driver_registry
 from config import SCROLL_SPEED
 from asyncio import sleep as async_sleep, create_task
@@ -46,17 +46,31 @@ LCD_2LINE = 0x08
 LCD_1LINE = 0x00
 LCD_5x8DOTS = 0x00
 
+# Unchanged characters between two changed runs that are rewritten to join
+# the runs, rather than moving the cursor with another I2C transaction
+MAX_RUN_GAP = 3
+
 class LCD1602:
-    """Driver for the LCD1602 16x2 character LED display"""
+    """
+    Driver for the LCD1602 16x2 character LED display
+    A shadow copy of the characters on screen is kept, and text is compared
+    with it so only runs of changed characters are sent, each as a single
+    multi-byte I2C transaction after a cursor move. Rewriting unchanged text
+    such as the state line, spinner or scrolled errors then costs little or
+    no bus time.
+    """
 
     def __init__(self, i2c) -> None:
         """Configure and connect to display via I2C, throw error on connection issue."""
-        self.log = uLogger("LCD1602")
+        self.log = get_logger("LCD1602")
         self.log.info("Init LCD1602 display driver")
         self._row = 16
         self._col = 2
         self.error_loop_task = None
         self.spinner_task = None
+        self.shadow = [bytearray(b" " * self._row) for _ in range(self._col)]
+        self.cursor_col = 0
+        self.cursor_row = 0
 
         try:
             self.LCD1602_I2C = i2c
@@ -70,21 +84,54 @@ class LCD1602:
         """Execute a command against the display driver. Refer to command constants."""
         self.LCD1602_I2C.writeto_mem(LCD_ADDRESS, 0x80, chr(cmd))
 
-    def _write(self, data: int) -> None:
-        self.LCD1602_I2C.writeto_mem(LCD_ADDRESS, 0x40, chr(data))
-
-    def setCursor(self, col: int, row: int) -> None:
-        """Position the cursor ahead of writing a character or string."""
+    def _set_ddram_address(self, col: int, row: int) -> None:
         if(row == 0):
             col|=0x80
         else:
             col|=0xc0
         self.LCD1602_I2C.writeto(LCD_ADDRESS, bytearray([0x80, col]))
 
+    def setCursor(self, col: int, row: int) -> None:
+        """Position the cursor ahead of writing a character or string."""
+        self.cursor_col = col
+        self.cursor_row = row
+
+    def _write_text(self, row: int, col: int, data: bytes) -> None:
+        """
+        Write characters at a position, sending only the runs that differ
+        from the shadow buffer. Characters past the end of the line are
+        dropped.
+        """
+        shadow = self.shadow[row]
+        end = min(len(shadow), col + len(data))
+        position = col
+        while position < end:
+            if shadow[position] == data[position - col]:
+                position += 1
+                continue
+            run_start = position
+            run_end = position + 1
+            gap = 0
+            position += 1
+            while position < end and gap <= MAX_RUN_GAP:
+                if shadow[position] != data[position - col]:
+                    run_end = position + 1
+                    gap = 0
+                else:
+                    gap += 1
+                position += 1
+            position = run_end
+            run = data[run_start - col:run_end - col]
+            self._set_ddram_address(run_start, row)
+            self.LCD1602_I2C.writeto_mem(LCD_ADDRESS, 0x40, run)
+            shadow[run_start:run_end] = run
+
     def clear(self) -> None:
         """Clear the entire screen."""
         self._command(LCD_CLEARDISPLAY)
         sleep(0.002)
+        for line in self.shadow:
+            line[:] = b" " * self._row
             
     def print_update_startup(self) -> None:
         """Render update startup information on screen."""
@@ -111,8 +158,9 @@ class LCD1602:
         if(isinstance(arg, int)):
             arg=str(arg)
 
-        for x in bytearray(arg, 'utf-8'):
-            self._write(x)
+        data = bytes(arg, 'utf-8')
+        self._write_text(self.cursor_row, self.cursor_col, data)
+        self.cursor_col += len(data)
 
     def _text_to_line(self, text: str) -> str:
         """Internal function to ensure line fits the screen and no previous line text is present for short strings."""
@@ -2,8 +2,9 @@ from micropython import const
 from machine import I2C
 from framebuf import MONO_VLSB, FrameBuffer
 from time import sleep, time
-from asyncio import sleep as async_sleep, create_task
-from lib.ulogging import uLogger
+from asyncio import sleep as async_sleep
+from lib.supervisor import supervisor
+from lib.ulogging import get_logger
 from lib.registry import driver_registry
 
 _FRAMEBUF_FORMAT = MONO_VLSB
@@ -32,6 +33,9 @@ SET_CHARGE_PUMP = const(0x8D)
 class _SSD1306(FrameBuffer):
     """
     Base class for SSD1306 display driver
+    Drawing methods record the pages and columns they change, and show()
+    only sends that region of the framebuffer, so updating one line of text
+    does not resend the whole screen over I2C.
     """
     def __init__(
         self,
@@ -43,7 +47,7 @@ class _SSD1306(FrameBuffer):
         page_addressing: bool
     ):
         super().__init__(buffer, width, height, _FRAMEBUF_FORMAT)
-        self.log = uLogger("SSD1306")
+        self.log = get_logger("SSD1306")
         self.width = width
         self.height = height
         self.external_vcc = external_vcc
@@ -67,6 +71,8 @@ class _SSD1306(FrameBuffer):
         else:
             self.pagebuffer = None
             self.page_column_start = None
+        # Bounding box of pages and columns changed since the last show()
+        self.clear_dirty()
         # Let's get moving!
         self.screen_on_time = None
         self.power_on()
@@ -153,6 +159,7 @@ class _SSD1306(FrameBuffer):
         self.write_cmd(SET_SEG_REMAP | (rotate & 1))
         # com output (vertical mirror) is changed immediately
         # you need to call show() for the seg remap to be visible
+        self.mark_all_dirty()
 
     def write_framebuf(self) -> None:
         """Derived class must implement this"""
@@ -175,11 +182,77 @@ class _SSD1306(FrameBuffer):
         self._power = True
         self.screen_on_time = time()
 
+    def clear_dirty(self) -> None:
+        self.dirty_x0 = self.width
+        self.dirty_x1 = -1
+        self.dirty_p0 = self.pages
+        self.dirty_p1 = -1
+
+    def mark_dirty(self, x: int, y: int, w: int, h: int) -> None:
+        """Add a changed rectangle of pixels to the region to send"""
+        x0 = max(0, x)
+        x1 = min(self.width - 1, x + w - 1)
+        y0 = max(0, y)
+        y1 = min(self.height - 1, y + h - 1)
+        if x0 > x1 or y0 > y1:
+            return
+        self.dirty_x0 = min(self.dirty_x0, x0)
+        self.dirty_x1 = max(self.dirty_x1, x1)
+        self.dirty_p0 = min(self.dirty_p0, y0 >> 3)
+        self.dirty_p1 = max(self.dirty_p1, y1 >> 3)
+
+    def mark_all_dirty(self) -> None:
+        self.mark_dirty(0, 0, self.width, self.height)
+
+    def fill(self, c: int) -> None:
+        super().fill(c)
+        self.mark_all_dirty()
+
+    def fill_rect(self, x: int, y: int, w: int, h: int, c: int) -> None:
+        super().fill_rect(x, y, w, h, c)
+        self.mark_dirty(x, y, w, h)
+
+    def rect(self, x: int, y: int, w: int, h: int, c: int, f: bool = False) -> None:
+        super().rect(x, y, w, h, c, f)
+        self.mark_dirty(x, y, w, h)
+
+    def hline(self, x: int, y: int, w: int, c: int) -> None:
+        super().hline(x, y, w, c)
+        self.mark_dirty(x, y, w, 1)
+
+    def vline(self, x: int, y: int, h: int, c: int) -> None:
+        super().vline(x, y, h, c)
+        self.mark_dirty(x, y, 1, h)
+
+    def line(self, x1: int, y1: int, x2: int, y2: int, c: int) -> None:
+        super().line(x1, y1, x2, y2, c)
+        self.mark_dirty(min(x1, x2), min(y1, y2), abs(x2 - x1) + 1, abs(y2 - y1) + 1)
+
+    def pixel(self, x: int, y: int, c: int | None = None):
+        if c is None:
+            return super().pixel(x, y)
+        super().pixel(x, y, c)
+        self.mark_dirty(x, y, 1, 1)
+
+    def text(self, s: str, x: int, y: int, c: int = 1) -> None:
+        super().text(s, x, y, c)
+        self.mark_dirty(x, y, len(s) * 8, 8)
+
+    def blit(self, *args) -> None:
+        super().blit(*args)
+        self.mark_all_dirty()
+
+    def scroll(self, xstep: int, ystep: int) -> None:
+        super().scroll(xstep, ystep)
+        self.mark_all_dirty()
+
     def show(self) -> None:
-        """Update the display"""
+        """Update the changed region of the display"""
+        if self.dirty_x1 < 0:
+            return
         if not self.page_addressing:
-            xpos0 = 0
-            xpos1 = self.width - 1
+            xpos0 = self.dirty_x0
+            xpos1 = self.dirty_x1
             if self.width != 128:
                 # narrow displays use centered columns
                 col_offset = (128 - self.width) // 2
@@ -189,9 +262,10 @@ class _SSD1306(FrameBuffer):
             self.write_cmd(xpos0)
             self.write_cmd(xpos1)
             self.write_cmd(SET_PAGE_ADDR)
-            self.write_cmd(0)
-            self.write_cmd(self.pages - 1)
+            self.write_cmd(self.dirty_p0)
+            self.write_cmd(self.dirty_p1)
         self.write_framebuf()
+        self.clear_dirty()
 
 
 class SSD1306(_SSD1306):
@@ -228,6 +302,12 @@ class SSD1306(_SSD1306):
         # buffer).
         self.buffer = bytearray(((height // 8) * width) + 1)
         self.buffer[0] = 0x40  # Set first byte of data buffer to Co=0, D/C=1
+        # Partial updates are copied to the window buffer to send them in a
+        # single transaction with the data control byte in front
+        self.window = bytearray(((height // 8) * width) + 1)
+        self.window[0] = 0x40
+        self.window_view = memoryview(self.window)
+        self.buffer_view = memoryview(self.buffer)
         super().__init__(
             memoryview(self.buffer)[1:],
             width,
@@ -236,7 +316,7 @@ class SSD1306(_SSD1306):
             page_addressing=self.page_addressing,
         )
         self.log.info("Init SSD1306 display driver")
-        create_task(self.screensaver())
+        supervisor.start("ssd1306_screensaver", self.screensaver)
 
     def write_cmd(self, cmd: int) -> None:
         """Send a command to the I2C device"""
@@ -244,19 +324,29 @@ class SSD1306(_SSD1306):
         self.i2c.writeto(self.addr, bytearray([hex, cmd]), True)
 
     def write_framebuf(self) -> None:
-        """Blast out the frame buffer using a single I2C transaction to support
-        hardware I2C interfaces."""
+        """Blast out the changed pages and columns of the frame buffer using a
+        single I2C transaction, or one per page with page addressing, to
+        support hardware I2C interfaces."""
+        x0 = self.dirty_x0
+        columns = self.dirty_x1 - x0 + 1
         if self.page_addressing:
-            for page in range(self.pages):
+            column = ((self.page_column_start[1] & 0x0F) << 4) + self.page_column_start[0] + x0
+            for page in range(self.dirty_p0, self.dirty_p1 + 1):
                 self.write_cmd(0xB0 + page)
-                self.write_cmd(self.page_column_start[0])
-                self.write_cmd(self.page_column_start[1])
-                self.pagebuffer[1:] = self.buffer[
-                    1 + self.width * page : 1 + self.width * (page + 1)
-                ]
-                self.i2c.writeto(self.addr, self.pagebuffer, True)
-        else:
+                self.write_cmd(column & 0x0F)
+                self.write_cmd(0x10 | (column >> 4))
+                start = 1 + self.width * page + x0
+                self.pagebuffer[1:1 + columns] = self.buffer_view[start:start + columns]
+                self.i2c.writeto(self.addr, memoryview(self.pagebuffer)[0:1 + columns], True)
+        elif columns == self.width and self.dirty_p0 == 0 and self.dirty_p1 == self.pages - 1:
             self.i2c.writeto(self.addr, self.buffer, True)
+        else:
+            length = 1
+            for page in range(self.dirty_p0, self.dirty_p1 + 1):
+                start = 1 + self.width * page + x0
+                self.window[length:length + columns] = self.buffer_view[start:start + columns]
+                length += columns
+            self.i2c.writeto(self.addr, self.window_view[0:length], True)
 
     async def screensaver(self) -> None:
         """Turn on the screensaver"""
@@ -1,8 +1,20 @@
-from lib.ulogging import uLogger
+from asyncio import Event, sleep_ms
+from time import ticks_ms, ticks_diff
+from lib.ulogging import get_logger
 from lib.registry import driver_registry
+from lib.i2c_bus import PRIORITY_DISPLAY
 from lib.displays.LCD1602 import LCD1602 # Importing the module registers the driver - do not remove this  # noqa: F401
 from lib.displays.SSD1306 import SSD1306 # Importing the module registers the driver - do not remove this  # noqa: F401
-from config import DISPLAY_DRIVERS
+from config import DISPLAY_DRIVERS, DISPLAY_FRAME_MS
+
+ALL_SCREENS = -1
+COMMANDS = (
+    "add_hours", "add_minutes", "cancelling", "clear", "clear_busy_output",
+    "get_power_state", "power_on", "print_download_progress", "print_startup",
+    "print_update_startup", "print_update_status", "set_busy_output",
+    "update_alarm", "update_co2", "update_status",
+    )
+
 class Display:
     """
     Abstracted display capabilities for supported physical displays.
@@ -11,18 +23,39 @@ class Display:
     
     Example:
     If an LCD1602 driver is configured to load, then issuing the command Display.print_startup() will render startup information appropriately on the 2x16 display if connected.
+
+    The bound methods of each loaded screen are looked up once for every
+    command in COMMANDS, so running a command is a dictionary lookup and
+    direct calls. New commands must be added to COMMANDS.
+
+    Once async_compositor() is running, drawing commands are queued rather
+    than run, and the compositor redraws at most once every DISPLAY_FRAME_MS
+    inside a display priority I2C bus transaction. Each command and target
+    screen pair is a region holding only its latest arguments, and is moved
+    to the end of the queue when updated, so a burst of updates is drawn
+    once and regions are drawn in the order they were last updated. Before
+    the compositor starts, such as during startup and firmware updates,
+    commands are run immediately.
     """
     def __init__(self, i2c) -> None:
-        self.log = uLogger("Display")
+        self.log = get_logger("Display")
         self.drivers = DISPLAY_DRIVERS
         self.log.info("Init display")
         self.enabled = False
-        self.screen_name = "all"
+        self.target_screen = ALL_SCREENS
         self.i2c = i2c
         self.screens = []
+        self.screen_indexes = {}
+        self.command_table = {}
         self._load_configured_drivers()
+        self._build_command_table()
         self.state = "Unknown"
         self.errors = {}
+        self.frame_ms = DISPLAY_FRAME_MS
+        self.frame_event = Event()
+        self.pending = []
+        self.compositor_running = False
+        self.last_frame = ticks_ms()
         
     def _load_configured_drivers(self) -> None:
         for driver in self.drivers:
@@ -44,22 +77,85 @@ class Display:
             self.log.info("No screens configured successfully; Display functionality disabled.")
             self.enabled = False
 
+    def _build_command_table(self) -> None:
+        """
+        Map each command to the screen index, screen name and bound method of
+        every screen supporting it.
+        """
+        for index, screen in enumerate(self.screens):
+            screen_name = screen.__class__.__name__
+            self.screen_indexes[screen_name] = index
+            for command in COMMANDS:
+                method = getattr(screen, command, None)
+                if callable(method):
+                    self.command_table.setdefault(command, []).append((index, screen_name, method))
+        if self.log.enabled_info:
+            self.log.info("Display command table: %s", {command: [entry[1] for entry in entries] for command, entries in self.command_table.items()})
+
     def _execute_command(self, command: str, *args) -> dict:
         """Execute a command on specified screen, defaults to all screens."""
         results = {}
-        self.log.info(f"Executing command {command} on screen {self.screen_name}, with arguments: {args}")
-        for screen in self.screens:
-            screen_name = screen.__class__.__name__
-            self.log.info(f"Checking screen: {screen_name} against {self.screen_name}.")
-            if self.screen_name == "all" or self.screen_name == screen_name:
-                if hasattr(screen, command):
-                    method = getattr(screen, command)
-                    self.log.info(f"Executing command on screen: {screen.__class__.__name__}")
-                    if callable(method):
-                        results[screen_name] = method(*args)
-        self.screen_name = "all"
+        target_screen = self.target_screen
+        self.target_screen = ALL_SCREENS
+        for index, screen_name, method in self.command_table.get(command, ()):
+            if target_screen == ALL_SCREENS or target_screen == index:
+                results[screen_name] = method(*args)
         
         return results
+
+    def _queue_command(self, command: str, *args) -> None:
+        """
+        Queue a drawing command for the next frame, replacing any queued
+        update of the same region. Runs the command immediately if the
+        compositor is not running.
+        """
+        if not self.compositor_running:
+            self._execute_command(command, *args)
+            return
+
+        region = (command, self.target_screen)
+        self.target_screen = ALL_SCREENS
+        for index, queued in enumerate(self.pending):
+            if queued[0] == region:
+                del self.pending[index]
+                break
+        self.pending.append((region, args))
+        self.frame_event.set()
+
+    async def async_compositor(self) -> None:
+        """
+        Draw queued display updates, at most once every frame_ms.
+        """
+        self.log.info("Starting display compositor with a minimum frame time of %s ms", self.frame_ms)
+        self.compositor_running = True
+        if self.pending:
+            self.frame_event.set()
+        try:
+            while True:
+                await self.frame_event.wait()
+                self.frame_event.clear()
+                wait_ms = self.frame_ms - ticks_diff(ticks_ms(), self.last_frame)
+                if wait_ms > 0:
+                    await sleep_ms(wait_ms)
+                await self._async_draw_frame()
+        finally:
+            self.compositor_running = False
+
+    async def _async_draw_frame(self) -> None:
+        """
+        Run the latest queued command for each region while holding the I2C
+        bus.
+        """
+        frame = self.pending
+        self.pending = []
+        async with self.i2c.transaction(PRIORITY_DISPLAY):
+            for region, args in frame:
+                command, self.target_screen = region
+                try:
+                    self._execute_command(command, *args)
+                except Exception as e:
+                    self.log.error("Display command %s failed: %s", command, e)
+        self.last_frame = ticks_ms()
     
     def set_screen_for_next_command(self, screen_name: str) -> bool:
         """
@@ -67,39 +163,39 @@ class Display:
         Returns True if the screen was found and set, False if not.
         """
         self.log.info(f"Setting screen for next command to {screen_name}")
-        if any(screen.__class__.__name__ == screen_name for screen in self.screens):
+        if screen_name in self.screen_indexes:
             self.log.info(f"Screen {screen_name} found, setting for next command.")
-            self.screen_name = screen_name
+            self.target_screen = self.screen_indexes[screen_name]
             return True
         else:
             self.log.warn(f"Screen {screen_name} not found, retaining all screens and returning screen missing error.")
-            self.screen_name = "all"
+            self.target_screen = ALL_SCREENS
             return False
 
     def clear(self) -> None:
         """Clear all screens."""
-        self._execute_command("clear")
+        self._queue_command("clear")
     
     def print_update_startup(self) -> None:
         """Display update startup information on all screens."""
-        self._execute_command("print_update_startup")
+        self._queue_command("print_update_startup")
 
     def print_download_progress(self, current: int, total: int) -> None:
         """Display download progress information on all screens."""
-        self._execute_command("print_download_progress", current, total)
+        self._queue_command("print_download_progress", current, total)
     
     def print_update_status(self, status: str) -> None:
         """Display update status information on all screens."""
-        self._execute_command("print_update_status", status)
+        self._queue_command("print_update_status", status)
     
     def print_startup(self, version: str) -> None:
         """Display startup information on all screens."""
-        self._execute_command("print_startup", version)
+        self._queue_command("print_startup", version)
 
     def _update_status(self) -> None:
         """Update state and error information on all screens."""
         self.log.info("Updating status on all screens")
-        self._execute_command("update_status", {"state": self.state, "errors": self.errors})
+        self._queue_command("update_status", {"state": self.state, "errors": self.errors})
 
     def update_state(self, state: str) -> None:
         self.state = state
@@ -112,37 +208,37 @@ class Display:
     def set_busy_output(self) -> None:
         """Set all screens to busy output."""
         self.log.info("Setting all screens to busy output")
-        self._execute_command("set_busy_output")
+        self._queue_command("set_busy_output")
     
     def clear_busy_output(self) -> None:
         """Clear all screens from busy output."""
         self.log.info("Clearing all screens of busy output")
-        self._execute_command("clear_busy_output")
+        self._queue_command("clear_busy_output")
 
     def add_hours(self, open_for_hours: int) -> None:
         """Display a screen for adding open for hours information."""
         self.log.info("Adding hours screen")
-        self._execute_command("add_hours", open_for_hours)
+        self._queue_command("add_hours", open_for_hours)
 
     def add_minutes(self, closed_for_minutes: int) -> None:
         """Display a screen for adding closed for minutes information."""
         self.log.info("Adding minutes screen")
-        self._execute_command("add_minutes", closed_for_minutes)
+        self._queue_command("add_minutes", closed_for_minutes)
     
     def cancelling(self) -> None:
         """Display cancelling text."""
         self.log.info("Cancelling")
-        self._execute_command("cancelling")
+        self._queue_command("cancelling")
     
     def update_co2(self, co2: str) -> None:
         """Update CO2 information on all screens."""
-        self.log.info(f"Updating CO2 information: {co2}")
-        self._execute_command("update_co2", co2)
+        self.log.info("Updating CO2 information: %s", co2)
+        self._queue_command("update_co2", co2)
 
     def update_alarm(self, alarm: str) -> None:
         """Update alarm information on all screens."""
-        self.log.info(f"Updating alarm information: {alarm}")
-        self._execute_command("update_alarm", alarm)
+        self.log.info("Updating alarm information: %s", alarm)
+        self._queue_command("update_alarm", alarm)
     
     def get_power_state(self) -> dict:
         """Get power state information on all screens."""
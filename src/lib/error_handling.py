@@ -1,5 +1,5 @@
 from lib.displays.display import Display
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 
 class ErrorHandler:
     """
@@ -31,7 +31,7 @@ class ErrorHandler:
 
     def __init__(self, module_name: str) -> None:
         """Creates a new error handler instance for a module and registers it with the error handler registry."""
-        self.log = uLogger(f"ErrorHandling - {module_name}")
+        self.log = get_logger(f"ErrorHandling - {module_name}")
         self.errors = {}
         self.register_error_handler(module_name, self)
         
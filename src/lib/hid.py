@@ -1,19 +1,21 @@
-from lib.ulogging import uLogger
-from asyncio import get_event_loop, Event, create_task, sleep
-from time import ticks_ms, ticks_diff
+from lib.ulogging import get_logger, get_handler, async_flush_log_file
+from asyncio import get_event_loop, Event
 from lib.space_state import SpaceState, NoneState, OpenState, ClosedState
 from lib.error_handling import ErrorHandler
 from lib.module_config import ModuleConfig
 from lib.displays.display import Display
 from lib.networking import WirelessNetwork
 from lib.rfid.reader import RFIDReader
-from config import RFID_ENABLED, CLOCK_FREQUENCY, SDA_PIN, SCL_PIN, I2C_ID, I2C_FREQ
+from config import RFID_ENABLED, CLOCK_FREQUENCY, SDA_PIN, SCL_PIN, I2C_ID, I2C_FREQ, LOOP_MONITOR_INTERVAL_MS, LOG_HANDLERS
 from lib.uistate import UIState
 from lib.ui_log import UILog
 from smibhid_http.website import WebApp
 from lib.pinger import Pinger
 from machine import freq, I2C
 from lib.sensors import Sensors
+from lib.i2c_bus import I2CBus
+from lib.loop_monitor import monitor as loop_monitor
+from lib.supervisor import supervisor
 
 class HID:
     
@@ -22,13 +24,13 @@ class HID:
         Human Interface Device for event spaces providing buttons and status LEDs for space open state.
         Create HID instance and then run startup() to start services for button monitoring and LED output.
         """
-        self.log = uLogger("HID")
+        self.log = get_logger("HID")
         self.log.warn("SMIBHID has been restarted")
         self.version = "2.2.0"
         self.log.info("Setting CPU frequency to: " + str(CLOCK_FREQUENCY / 1000000) + "MHz")
         freq(CLOCK_FREQUENCY)
         self.loop_running = False
-        self.i2c = I2C(I2C_ID, sda = SDA_PIN, scl = SCL_PIN, freq = I2C_FREQ)
+        self.i2c = I2CBus(I2C(I2C_ID, sda = SDA_PIN, scl = SCL_PIN, freq = I2C_FREQ))
         self.moduleConfig = ModuleConfig()
         self.moduleConfig.register_display(Display(self.i2c))
         self.moduleConfig.register_wifi(WirelessNetwork())
@@ -49,16 +51,6 @@ class HID:
         self.ui_state_instance = StartUIState(self, self.space_state)
         self.ui_state_instance.on_enter()
 
-    async def async_timing_check(self) -> None:
-        current_time = ticks_ms()
-        while True:
-            old_time = current_time
-            await sleep(0.001)
-            current_time = ticks_ms()
-            diff = ticks_diff(current_time, old_time)
-            if diff > 50:
-                self.log.warn(f"Delay detected: {diff} ms")
-    
     def set_ui_state(self, state):
         self.ui_state_instance = state
     
@@ -72,7 +64,14 @@ class HID:
         self.log.info("--------Starting SMIBHID--------")
         self.log.info(f"SMIBHID firmware version: {self.version}")
 
-        self.timing_task = create_task(self.async_timing_check())
+        if LOOP_MONITOR_INTERVAL_MS > 0:
+            self.loop_monitor_task = supervisor.start("loop_monitor", loop_monitor.async_run)
+        if "File" in LOG_HANDLERS:
+            supervisor.start("log_flush", async_flush_log_file)
+        if "Syslog" in LOG_HANDLERS and get_handler("Syslog").enabled:
+            supervisor.start("syslog", get_handler("Syslog").async_run)
+        if self.display.enabled:
+            supervisor.start("display_compositor", self.display.async_compositor)
 
         self.wifi.startup()
         self.space_state.startup()
@@ -109,7 +108,7 @@ class HID:
     
 class StartUIState(UIState):
     
-    def __init__(self, hid: HID, space_state: SpaceState) -> None:
+    def __init__(self, hid: 'HID', space_state: 'SpaceState') -> None:
         super().__init__(hid, space_state)
         self.display = self.hid.display
         self.version = self.hid.version
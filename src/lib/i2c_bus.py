@@ -0,0 +1,170 @@
+from asyncio import Event
+from time import ticks_us, ticks_diff
+from lib.ulogging import get_logger
+
+PRIORITY_ALARM = 0
+PRIORITY_SENSOR = 1
+PRIORITY_DISPLAY = 2
+
+class I2CBus:
+    """
+    Shared I2C bus manager wrapping a machine.I2C instance.
+    Drivers use it exactly like machine.I2C, while every transfer is timed
+    and counted per device address.
+    Multi step transactions that await between transfers, such as a sensor
+    command followed by a conversion delay and a read, should hold the bus
+    with "async with bus.transaction(priority):" so other async users queue
+    behind them. Waiters are served lowest priority value first, then in
+    arrival order, so alarm reads rank above sensor polls and display
+    updates.
+    Plain synchronous calls cannot be interleaved by the cooperative
+    scheduler, so code that can't await may use try_acquire() to avoid
+    splitting an async transaction that is in progress.
+    """
+    def __init__(self, i2c) -> None:
+        self.log = get_logger("I2CBus")
+        self.i2c = i2c
+        self._locked = False
+        self._waiters = []
+        self._sequence = 0
+        self.device_stats = {}
+        self.transactions = 0
+        self.contended = 0
+
+    def locked(self) -> bool:
+        """
+        Return True if a transaction currently holds the bus.
+        """
+        return self._locked
+
+    def transaction(self, priority: int = PRIORITY_SENSOR) -> "_Transaction":
+        """
+        Return an async context manager holding the bus for a transaction
+        at the given priority.
+        """
+        return _Transaction(self, priority)
+
+    async def acquire(self, priority: int = PRIORITY_SENSOR) -> None:
+        """
+        Wait until the bus is free and all higher priority waiters have been
+        served, then take ownership of the bus.
+        """
+        self.transactions += 1
+        if not self._locked and not self._waiters:
+            self._locked = True
+            return
+
+        self.contended += 1
+        event = Event()
+        self._sequence += 1
+        waiter = (priority, self._sequence, event)
+        index = len(self._waiters)
+        for i, queued in enumerate(self._waiters):
+            if waiter[:2] < queued[:2]:
+                index = i
+                break
+        self._waiters.insert(index, waiter)
+        try:
+            await event.wait()
+        except BaseException:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif event.is_set():
+                self.release()
+            raise
+
+    def try_acquire(self) -> bool:
+        """
+        Take ownership of the bus without waiting, returning False if it is
+        held or has async waiters queued.
+        """
+        if self._locked or self._waiters:
+            return False
+        self.transactions += 1
+        self._locked = True
+        return True
+
+    def release(self) -> None:
+        """
+        Release the bus, handing it straight to the next waiter in priority
+        order if there is one.
+        """
+        if not self._locked:
+            self.log.error("I2C bus released while not held")
+            raise RuntimeError("I2C bus released while not held")
+        if self._waiters:
+            _, _, event = self._waiters.pop(0)
+            event.set()
+        else:
+            self._locked = False
+
+    def get_stats(self) -> dict:
+        """
+        Return transaction counters and per device address transfer counters,
+        keyed by hex device address.
+        """
+        return {
+            "transactions": self.transactions,
+            "contended": self.contended,
+            "waiting": len(self._waiters),
+            "devices": {hex(addr): stats for addr, stats in self.device_stats.items()}
+            }
+
+    def _record(self, addr: int, start_us: int, error: bool) -> None:
+        elapsed_us = ticks_diff(ticks_us(), start_us)
+        stats = self.device_stats.get(addr)
+        if stats is None:
+            stats = {"transfers": 0, "errors": 0, "total_us": 0, "max_us": 0}
+            self.device_stats[addr] = stats
+        stats["transfers"] += 1
+        stats["total_us"] += elapsed_us
+        if elapsed_us > stats["max_us"]:
+            stats["max_us"] = elapsed_us
+        if error:
+            stats["errors"] += 1
+
+    def _transfer(self, addr: int, method, *args, **kwargs):
+        start_us = ticks_us()
+        try:
+            result = method(addr, *args, **kwargs)
+        except Exception:
+            self._record(addr, start_us, True)
+            raise
+        self._record(addr, start_us, False)
+        return result
+
+    def scan(self) -> list:
+        return self.i2c.scan()
+
+    def writeto(self, addr: int, buf, stop: bool = True):
+        return self._transfer(addr, self.i2c.writeto, buf, stop)
+
+    def readfrom(self, addr: int, nbytes: int, stop: bool = True):
+        return self._transfer(addr, self.i2c.readfrom, nbytes, stop)
+
+    def readfrom_into(self, addr: int, buf, stop: bool = True):
+        return self._transfer(addr, self.i2c.readfrom_into, buf, stop)
+
+    def writeto_mem(self, addr: int, memaddr: int, buf, *, addrsize: int = 8):
+        return self._transfer(addr, self.i2c.writeto_mem, memaddr, buf, addrsize=addrsize)
+
+    def readfrom_mem(self, addr: int, memaddr: int, nbytes: int, *, addrsize: int = 8):
+        return self._transfer(addr, self.i2c.readfrom_mem, memaddr, nbytes, addrsize=addrsize)
+
+    def readfrom_mem_into(self, addr: int, memaddr: int, buf, *, addrsize: int = 8):
+        return self._transfer(addr, self.i2c.readfrom_mem_into, memaddr, buf, addrsize=addrsize)
+
+class _Transaction:
+    """
+    Async context manager returned by I2CBus.transaction().
+    """
+    def __init__(self, bus: I2CBus, priority: int) -> None:
+        self.bus = bus
+        self.priority = priority
+
+    async def __aenter__(self) -> I2CBus:
+        await self.bus.acquire(self.priority)
+        return self.bus
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.bus.release()
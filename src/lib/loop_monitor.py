@@ -0,0 +1,191 @@
+from asyncio import sleep_ms
+import asyncio
+from time import ticks_ms, ticks_us, ticks_diff
+from lib.ulogging import get_logger
+from config import LOOP_MONITOR_INTERVAL_MS, LOOP_MONITOR_STALL_MS
+
+LAG_BUCKETS_MS = (5, 10, 20, 50, 100, 200, 500, 1000)
+MAX_OFFENDERS = 10
+
+class TaskStats:
+    """
+    Run counters for a named task, updated each time the task is resumed.
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.steps = 0
+        self.total_us = 0
+        self.max_us = 0
+        self.stalls = 0
+
+    def record(self, elapsed_us: int, stall_us: int) -> bool:
+        """
+        Record one resume of the task, returning True if it held the loop for
+        longer than stall_us.
+        """
+        self.steps += 1
+        self.total_us += elapsed_us
+        if elapsed_us > self.max_us:
+            self.max_us = elapsed_us
+        if elapsed_us > stall_us:
+            self.stalls += 1
+            return True
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "steps": self.steps,
+            "total_ms": self.total_us // 1000,
+            "max_ms": self.max_us // 1000,
+            "stalls": self.stalls,
+            }
+
+class InstrumentedCoroutine:
+    """
+    Coroutine wrapper that times each resume of the wrapped coroutine, so
+    any stall is attributed to the task that caused it. The scheduler drives
+    it exactly like the coroutine it wraps.
+    """
+    def __init__(self, monitor: "LoopMonitor", stats: TaskStats, coro) -> None:
+        self.monitor = monitor
+        self.stats = stats
+        self.coro = coro
+
+    def __iter__(self):
+        return self
+
+    def __await__(self):
+        return self
+
+    def __next__(self):
+        return self.send(None)
+
+    def send(self, value):
+        return self._step(self.coro.send, value)
+
+    def throw(self, *args):
+        return self._step(self.coro.throw, *args)
+
+    def close(self):
+        return self.coro.close()
+
+    def _step(self, resume, *args):
+        start = ticks_us()
+        try:
+            return resume(*args)
+        finally:
+            elapsed_us = ticks_diff(ticks_us(), start)
+            if self.stats.record(elapsed_us, self.monitor.stall_us):
+                self.monitor.record_stall(self.stats.name, elapsed_us)
+
+class LoopMonitor:
+    """
+    Event loop health profiler.
+    Samples loop lag every interval_ms by measuring how late a sleep wakes
+    up and keeps a histogram of the lag. Tasks started through
+    create_task() are named and instrumented so the time each resume holds
+    the loop is counted per task, and resumes longer than stall_ms are
+    logged and ranked as top offenders. Lag over stall_ms with no
+    instrumented task stalling is counted as unattributed, coming from
+    tasks not started through the monitor such as web requests.
+    """
+    def __init__(self, interval_ms: int = LOOP_MONITOR_INTERVAL_MS, stall_ms: int = LOOP_MONITOR_STALL_MS) -> None:
+        self.log = get_logger("LoopMonitor")
+        self.interval_ms = interval_ms
+        self.stall_us = stall_ms * 1000
+        self.histogram = [0] * (len(LAG_BUCKETS_MS) + 1)
+        self.samples = 0
+        self.max_lag_ms = 0
+        self.tasks = {}
+        self.stall_count = 0
+        self.unattributed_stalls = 0
+        self.last_stall = None
+
+    def get_task_stats(self, name: str) -> TaskStats:
+        """
+        Return the run counters for a named task, creating them if needed.
+        """
+        stats = self.tasks.get(name)
+        if stats is None:
+            stats = TaskStats(name)
+            self.tasks[name] = stats
+        return stats
+
+    def create_task(self, coro, name: str):
+        """
+        Start a coroutine as a named, instrumented task.
+        """
+        return asyncio.create_task(InstrumentedCoroutine(self, self.get_task_stats(name), coro))
+
+    def record_stall(self, name: str, elapsed_us: int) -> None:
+        self.stall_count += 1
+        self.last_stall = (name, elapsed_us // 1000)
+        self.log.warn(f"Task {name} held the event loop for {elapsed_us // 1000} ms")
+
+    def record_lag(self, lag_ms: int) -> None:
+        """
+        Add a loop lag sample to the histogram.
+        """
+        self.samples += 1
+        if lag_ms > self.max_lag_ms:
+            self.max_lag_ms = lag_ms
+        for index, limit in enumerate(LAG_BUCKETS_MS):
+            if lag_ms < limit:
+                self.histogram[index] += 1
+                return
+        self.histogram[-1] += 1
+
+    async def async_run(self) -> None:
+        """
+        Sample loop lag every interval_ms.
+        """
+        self.log.info(f"Sampling event loop lag every {self.interval_ms} ms")
+        while True:
+            start = ticks_ms()
+            stall_count = self.stall_count
+            await sleep_ms(self.interval_ms)
+            lag_ms = ticks_diff(ticks_ms(), start) - self.interval_ms
+            self.record_lag(lag_ms if lag_ms > 0 else 0)
+            if lag_ms * 1000 > self.stall_us and self.stall_count == stall_count:
+                self.unattributed_stalls += 1
+                self.log.warn(f"Event loop lag of {lag_ms} ms from an uninstrumented task")
+
+    def get_histogram(self) -> dict:
+        histogram = {}
+        lower = 0
+        for index, limit in enumerate(LAG_BUCKETS_MS):
+            histogram[f"{lower}-{limit}"] = self.histogram[index]
+            lower = limit
+        histogram[f"{lower}+"] = self.histogram[-1]
+        return histogram
+
+    def get_top_offenders(self, count: int = MAX_OFFENDERS) -> list:
+        """
+        Return the tasks with the longest single resumes, longest first.
+        """
+        offenders = []
+        for stats in sorted(self.tasks.values(), key=lambda stats: stats.max_us, reverse=True)[0:count]:
+            offender = stats.to_dict()
+            offender["name"] = stats.name
+            offenders.append(offender)
+        return offenders
+
+    def get_stats(self) -> dict:
+        return {
+            "interval_ms": self.interval_ms,
+            "stall_ms": self.stall_us // 1000,
+            "samples": self.samples,
+            "max_lag_ms": self.max_lag_ms,
+            "unattributed_stalls": self.unattributed_stalls,
+            "lag_histogram_ms": self.get_histogram(),
+            "last_stall": None if self.last_stall is None else {"task": self.last_stall[0], "ms": self.last_stall[1]},
+            "top_offenders": self.get_top_offenders(),
+            }
+
+monitor = LoopMonitor()
+
+def create_named_task(coro, name: str):
+    """
+    Start a coroutine as a named task instrumented by the loop monitor.
+    """
+    return monitor.create_task(coro, name)
@@ -1,4 +1,4 @@
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 from config import RFID_ENABLED
 
 try:
@@ -26,7 +26,7 @@ class ModuleConfig:
     Dependency injection to ensure we are managing module configurations in a single place without the use of singletons.
     """
     def __init__(self) -> None:
-        self.log = uLogger("ModuleConfig")
+        self.log = get_logger("ModuleConfig")
         self.display: Optional['Display'] = None
         self.wifi: Optional['WirelessNetwork'] = None
         self.reader: Optional['RFIDReader'] = None
@@ -39,7 +39,7 @@ class ModuleConfig:
     def register_wifi(self, wifi: 'WirelessNetwork') -> None:
         self.wifi = wifi
 
-    def register_rfid(self, reader: Optional['RFIDReader']) -> None:
+    def register_rfid(self, reader: 'Optional[RFIDReader]') -> None:
         self.reader = reader
 
     def register_ui_log(self, ui_log: 'UILog') -> None:
@@ -60,7 +60,7 @@ class ModuleConfig:
             raise ModuleNotRegisteredError("WiFi")
         return self.wifi
 
-    def get_rfid(self) -> Optional['RFIDReader']:
+    def get_rfid(self) -> 'Optional[RFIDReader]':
         if not self.reader and RFID_ENABLED:
             self.log.warn("RFID module not registered")
             raise ModuleNotRegisteredError("RFID")
@@ -4,9 +4,10 @@ import rp2
 import network
 from ubinascii import hexlify
 import config
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 from lib.utils import StatusLED
-from asyncio import sleep, create_task
+from asyncio import sleep
+from lib.supervisor import supervisor
 from lib.error_handling import ErrorHandler
 from machine import RTC
 from socket import getaddrinfo, socket, AF_INET, SOCK_DGRAM
@@ -15,7 +16,7 @@ import struct
 class WirelessNetwork:
 
     def __init__(self) -> None:
-        self.log = uLogger("WIFI")
+        self.log = get_logger("WIFI")
         self.status_led = StatusLED()
         self.wifi_ssid = config.WIFI_SSID
         self.wifi_password = config.WIFI_PASSWORD
@@ -84,7 +85,7 @@ class WirelessNetwork:
 
     def startup(self) -> None:
         self.log.info("Starting wifi network monitor")
-        create_task(self.network_monitor())
+        supervisor.start("network_monitor", self.network_monitor)
 
     def configure_error_handling(self) -> None:
         self.error_handler = ErrorHandler("Wifi")
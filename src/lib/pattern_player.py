@@ -0,0 +1,126 @@
+from machine import Pin, PWM, Timer
+from asyncio import ThreadSafeFlag
+from lib.ulogging import get_logger
+
+DUTY_MAX = 65535
+
+class PatternPlayer:
+    """
+    Play on/off or PWM duty patterns on an output pin from a one shot
+    hardware timer, so blinking and beeping take no event loop time and keep
+    their timing however busy the loop is.
+    A pattern is a tuple of (duty, duration_ms) steps, where duty is 0 to 1.
+    Pins are switched fully on for any duty above 0, while a PWM output
+    (when pwm_freq is given) sets its duty cycle from the duty, so a passive
+    buzzer needs a duty of about 0.5 to sound a tone. Patterns are
+    repeated a given number of times, or until stopped if repeat is 0, and
+    the output is left off when a pattern ends or is stopped.
+    """
+    def __init__(self, pin: Pin, pwm_freq: int = 0, name: str = "") -> None:
+        self.log = get_logger("PatternPlayer")
+        self.name = name
+        self.pin = pin
+        self.pwm = None
+        if pwm_freq:
+            self.pwm = PWM(pin)
+            self.pwm.freq(pwm_freq)
+            self.pwm.duty_u16(0)
+        self.timer = Timer()
+        self.pattern = ()
+        self.index = 0
+        self.remaining = 0
+        self.playing = False
+        self.done_flag = ThreadSafeFlag()
+        self._step_callback = self._step
+
+    @staticmethod
+    def flash(hz: float, duty: float = 1) -> tuple:
+        """
+        Return a pattern of one off then on flash cycle at a given frequency.
+        """
+        half_period_ms = max(1, int(500 / hz))
+        return ((0, half_period_ms), (duty, half_period_ms))
+
+    def _output_level(self, duty: float) -> int:
+        """
+        Return the duty_u16 value for a PWM output, or the pin value, for a
+        duty from 0 to 1.
+        """
+        if self.pwm is not None:
+            return int(duty * DUTY_MAX)
+        return 1 if duty > 0 else 0
+
+    def _set_output(self, level: int) -> None:
+        if self.pwm is not None:
+            self.pwm.duty_u16(level)
+        else:
+            self.pin.value(level)
+
+    def play(self, pattern: tuple, repeat: int = 0) -> None:
+        """
+        Start playing a pattern, replacing any pattern already playing.
+        Duties are converted to output levels up front so the timer callback
+        only indexes the converted pattern.
+        """
+        self.timer.deinit()
+        self.log.info(f"{self.name}: playing pattern {pattern} {'until stopped' if repeat == 0 else f'{repeat} times'}")
+        self.pattern = tuple((self._output_level(duty), duration_ms) for duty, duration_ms in pattern)
+        self.index = 0
+        self.remaining = repeat
+        self.playing = True
+        self._step()
+
+    def _step(self, timer: Timer | None = None) -> None:
+        """
+        Timer callback moving on to the next pattern step. Only indexes
+        prebuilt tuples so it does not allocate.
+        """
+        if not self.playing:
+            return
+        if self.index >= len(self.pattern):
+            self.index = 0
+            if self.remaining > 0:
+                self.remaining -= 1
+                if self.remaining == 0:
+                    self._finish()
+                    return
+        level, duration_ms = self.pattern[self.index]
+        self.index += 1
+        self._set_output(level)
+        self.timer.init(mode=Timer.ONE_SHOT, period=duration_ms, callback=self._step_callback)
+
+    def _finish(self) -> None:
+        self.timer.deinit()
+        self.playing = False
+        self._set_output(0)
+        self.done_flag.set()
+
+    def stop(self) -> None:
+        """
+        Stop the pattern and turn the output off.
+        """
+        if not self.playing:
+            return
+        self.log.info(f"{self.name}: stopping pattern")
+        self._finish()
+
+    def is_playing(self) -> bool:
+        return self.playing
+
+    async def async_wait(self) -> None:
+        """
+        Wait until the pattern finishes or is stopped.
+        """
+        while self.playing:
+            await self.done_flag.wait()
+
+    async def async_play(self, pattern: tuple, repeat: int = 0) -> None:
+        """
+        Play a pattern and wait until it finishes, stopping it if the waiting
+        task is cancelled.
+        """
+        self.play(pattern, repeat)
+        try:
+            await self.async_wait()
+        finally:
+            self.stop()
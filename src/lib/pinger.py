@@ -1,14 +1,15 @@
 #Adapted from https://gist.github.com/shawwwn/91cc8979e33e82af6d99ec34c38195fb
 
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 from lib.module_config import ModuleConfig
 from config import PINGER_WATCHDOG_IP, PINGER_WATCHDOG_INTERVAL_SECONDS, PINGER_WATCHDOG_RETRY_COUNT, PINGER_WATCHDOG_RELAY_PIN, PINGER_WATCHDOG_RELAY_ACTIVE_HIGH, PINGER_WATCHDOG_TOGGLE_DURATION_MS
-from asyncio import sleep_ms, get_event_loop
+from asyncio import sleep_ms
+from lib.supervisor import supervisor
 from machine import Pin
 
 class Pinger:
     def __init__(self, module_config: ModuleConfig, hid: object):
-        self.log = uLogger("Pinger")
+        self.log = get_logger("Pinger")
         if PINGER_WATCHDOG_IP:
             self.relay = Pin(PINGER_WATCHDOG_RELAY_PIN, Pin.OUT)
             self.relay_active_high = PINGER_WATCHDOG_RELAY_ACTIVE_HIGH
@@ -21,9 +22,8 @@ class Pinger:
             self.ip = PINGER_WATCHDOG_IP
             self.retries = 0
             self.relay_toggle_duration_ms = PINGER_WATCHDOG_TOGGLE_DURATION_MS
-            self.loop = get_event_loop()
             self.log.info("Pinger initialised")
-            self.loop.create_task(self.watchdog())
+            supervisor.start("pinger_watchdog", self.watchdog)
             self.relay_off = not self.relay_active_high
             self.relay_on = self.relay_active_high
 
@@ -1,7 +1,8 @@
 from lib.rfid.mfrc522 import MFRC522
 from lib.rfid.users import user_tag_mapping
-from asyncio import create_task, Event
-from lib.ulogging import uLogger
+from asyncio import Event
+from lib.supervisor import supervisor
+from lib.ulogging import get_logger
 from config import RFID_SCK, RFID_MOSI, RFID_MISO, RFID_RST, RFID_CS
 from lib.error_handling import ErrorHandler
 
@@ -13,7 +14,7 @@ class RFIDReader:
         Call get_last_tag_id() to get the last tag ID read.
         Call get_last_tag_user() to get the user associated with the last tag read based on the user_tag_mapping file.
         """
-        self.log = uLogger("RFIDReader")
+        self.log = get_logger("RFIDReader")
         self.error_handler = ErrorHandler("RFIDReader")
         self.rfid_sck = rfid_sck
         self.rfid_mosi = rfid_mosi
@@ -44,7 +45,7 @@ class RFIDReader:
     def startup(self) -> None:
         """Init RFID reader startup methods."""
         self.log.info("Starting RFID reader")
-        create_task(self.async_poll())
+        supervisor.start("rfid_poll", self.async_poll)
     
     async def async_poll(self) -> None:
         """Poll the RFID reader for tags, store the tag value and signal the tag_read_event when a tag detected."""
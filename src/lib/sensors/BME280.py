@@ -41,6 +41,7 @@
 #
 
 import time
+from asyncio import sleep
 from ustruct import unpack
 from array import array
 from micropython import const
@@ -131,22 +132,56 @@ class BME280(SensorModule):
                 None
         """
 
-        self._l1_barray[0] = self._mode_hum
-        self.i2c.writeto_mem(self.address, BME280_REGISTER_CONTROL_HUM,
-                             self._l1_barray)
-        self._l1_barray[0] = self._mode_temp << 5 | self._mode_press << 2 | MODE_FORCED
-        self.i2c.writeto_mem(self.address, BME280_REGISTER_CONTROL,
-                             self._l1_barray)
+        self._start_forced_conversion()
 
         # Wait for conversion to complete
         for _ in range(BME280_TIMEOUT):
-            if self.i2c.readfrom_mem(self.address, BME280_REGISTER_STATUS, 1)[0] & 0x08:
+            if self._conversion_busy():
                 time.sleep_ms(10)  # still busy
             else:
                 break  # Sensor ready
         else:
             raise RuntimeError("Sensor BME280 not ready")
 
+        self._read_raw_result(result)
+
+    async def async_read_raw_data(self, result):
+        """ Reads the raw (uncompensated) data from the sensor, awaiting
+            rather than blocking while the conversion completes.
+
+            Args:
+                result: array of length 3 or alike where the result will be
+                stored, in temperature, pressure, humidity order
+            Returns:
+                None
+        """
+        self._start_forced_conversion()
+
+        for _ in range(BME280_TIMEOUT):
+            if self._conversion_busy():
+                await sleep(0.01)
+            else:
+                break
+        else:
+            raise RuntimeError("Sensor BME280 not ready")
+
+        self._read_raw_result(result)
+
+    def _start_forced_conversion(self):
+        """ Trigger a single forced mode conversion. """
+        self._l1_barray[0] = self._mode_hum
+        self.i2c.writeto_mem(self.address, BME280_REGISTER_CONTROL_HUM,
+                             self._l1_barray)
+        self._l1_barray[0] = self._mode_temp << 5 | self._mode_press << 2 | MODE_FORCED
+        self.i2c.writeto_mem(self.address, BME280_REGISTER_CONTROL,
+                             self._l1_barray)
+
+    def _conversion_busy(self) -> bool:
+        """ Return True while the sensor is still measuring. """
+        return bool(self.i2c.readfrom_mem(self.address, BME280_REGISTER_STATUS, 1)[0] & 0x08)
+
+    def _read_raw_result(self, result):
+        """ Burst read the completed conversion into result. """
         # burst readout from 0xF7 to 0xFE, recommended by datasheet
         self.i2c.readfrom_mem_into(self.address, 0xF7, self._l8_barray)
         readout = self._l8_barray
@@ -174,6 +209,17 @@ class BME280(SensorModule):
                 from the result parameter if not None
         """
         self.read_raw_data(self._l3_resultarray)
+        return self._compensate(result)
+
+    async def async_read_compensated_data(self, result=None):
+        """ Reads the data from the sensor, awaiting the conversion, and
+            returns the compensated data. See read_compensated_data.
+        """
+        await self.async_read_raw_data(self._l3_resultarray)
+        return self._compensate(result)
+
+    def _compensate(self, result=None):
+        """ Compensate the raw data held in the internal result array. """
         raw_temp, raw_press, raw_hum = self._l3_resultarray
         # temperature
         var1 = (raw_temp/16384.0 - self.dig_T1/1024.0) * self.dig_T2
@@ -269,7 +315,12 @@ class BME280(SensorModule):
                 "{:.2f}".format(h))
     
     def get_reading(self) -> dict[str, float]:
-        data = self.read_compensated_data()
+        return self._format_reading(self.read_compensated_data())
+
+    async def async_get_reading(self) -> dict[str, float]:
+        return self._format_reading(await self.async_read_compensated_data())
+
+    def _format_reading(self, data) -> dict[str, float]:
         reading = {
             "temperature": round(data[0], 2),
             "pressure": round((data[1] / 100), 1),
@@ -1,6 +1,7 @@
 from machine import I2C
 import utime
 import struct
+from asyncio import sleep
 from lib.sensors.sensor_module import SensorModule
 from math import isnan
 
@@ -25,6 +26,8 @@ class SCD30(SensorModule):
     SOFT_RESET = 0xd304
 
     CLOCK_TIME_US = 10
+    READY_POLL_INTERVAL_S = 0.1
+    READY_TIMEOUT_POLLS = 30
 
     # Generated using
     # crc_table = []
@@ -82,7 +85,12 @@ class SCD30(SensorModule):
         return struct.unpack('BB', ver)
 
     def read_measurement(self):
-        measurement = self.__read_bytes(self.READ_MEASUREMENT, 18)
+        return self.__unpack_measurement(self.__read_bytes(self.READ_MEASUREMENT, 18))
+
+    async def async_read_measurement(self):
+        return self.__unpack_measurement(await self.__async_read_bytes(self.READ_MEASUREMENT, 18))
+
+    def __unpack_measurement(self, measurement):
         for i in range(0, len(measurement), 3):
             self.__check_crc(measurement[i:i+3])
 
@@ -99,6 +107,22 @@ class SCD30(SensorModule):
         self.__check_crc(ready)
         return struct.unpack('>H', ready)[0]
 
+    async def async_get_status_ready(self):
+        ready = await self.__async_read_bytes(self.GET_STATUS_READY, 3)
+        self.__check_crc(ready)
+        return struct.unpack('>H', ready)[0]
+
+    async def async_wait_for_status_ready(self) -> bool:
+        """
+        Poll the data ready status, awaiting between checks, and return True
+        once a measurement is available or False on timeout.
+        """
+        for unused in range(self.READY_TIMEOUT_POLLS):
+            if await self.async_get_status_ready():
+                return True
+            await sleep(self.READY_POLL_INTERVAL_S)
+        return False
+
     def get_measurement_interval(self):
         bint = self.__read_bytes(self.SET_MEASURE_INTERVAL, 3)
         self.__check_crc(bint)
@@ -163,6 +187,11 @@ class SCD30(SensorModule):
         utime.sleep_us(self.pause)
         return self.i2c.readfrom(self.addr, count)
 
+    async def __async_read_bytes(self, cmd, count):
+        self.__write_command(cmd)
+        await sleep(self.pause / 1000000)
+        return self.i2c.readfrom(self.addr, count)
+
     def __check_crc(self, arr):
         assert (len(arr) == 3)
         if self.__crc(arr[0], arr[1]) != arr[2]:
@@ -178,7 +207,10 @@ class SCD30(SensorModule):
         return crc
 
     def get_formatted_reading(self) -> tuple[float|None, float|None, float|None]:
-        co2, temperature, relative_humidity = self.read_measurement()
+        return self.format_measurement(self.read_measurement())
+
+    def format_measurement(self, measurement: tuple) -> tuple[float|None, float|None, float|None]:
+        co2, temperature, relative_humidity = measurement
         if isnan(co2) or isnan(temperature) or isnan(relative_humidity):
             self.log.warn("SCD30 sensor returning NaN as not collecting samples, dropping reading")
             return (None, None, None)
@@ -187,3 +219,11 @@ class SCD30(SensorModule):
     def get_reading(self) -> dict[str, float|None]:
         co2, temperature, relative_humidity = self.get_formatted_reading()
         return {"co2": co2, "temperature": temperature, "relative_humidity": relative_humidity}
+
+    async def async_get_reading(self) -> dict[str, float|None]:
+        if not await self.async_wait_for_status_ready():
+            self.log.warn("SCD30 measurement not ready, dropping reading")
+            return {"co2": None, "temperature": None, "relative_humidity": None}
+        co2, temperature, relative_humidity = self.format_measurement(await self.async_read_measurement())
+        return {"co2": co2, "temperature": temperature, "relative_humidity": relative_humidity}
+
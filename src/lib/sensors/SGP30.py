@@ -43,6 +43,7 @@ Implementation Notes
 """
 import math
 import time
+from asyncio import sleep
 from micropython import const
 from lib.sensors.sensor_module import SensorModule
 
@@ -116,6 +117,11 @@ class SGP30(SensorModule):
         # name, command, signals, delay
         return self._run_profile(["iaq_measure", [0x20, 0x08], 2, 0.05])
 
+    async def async_iaq_measure(self):
+        """Measure the CO2eq and TVOC, awaiting the measurement delay"""
+        # name, command, signals, delay
+        return await self._async_run_profile(["iaq_measure", [0x20, 0x08], 2, 0.05])
+
     def get_iaq_baseline(self):
         """Retreive the IAQ algorithm baseline for CO2eq and TVOC"""
         # name, command, signals, delay
@@ -162,11 +168,27 @@ class SGP30(SensorModule):
         #   (name, ["0x%02x" % i for i in command], signals, delay))
         return self._i2c_read_words_from_cmd(command, delay, signals)
 
+    async def _async_run_profile(self, profile):
+        """Run an SGP 'profile', awaiting the command delay instead of blocking"""
+        # pylint: disable=unused-variable
+        name, command, signals, delay = profile
+        # pylint: enable=unused-variable
+        return await self._async_i2c_read_words_from_cmd(command, delay, signals)
 
     def _i2c_read_words_from_cmd(self, command, delay, reply_size):
         """Run an SGP command query, get a reply and CRC results if necessary"""
         self._i2c.writeto(self._addr, bytes(command))
         time.sleep(delay)
+        return self._i2c_read_words(reply_size)
+
+    async def _async_i2c_read_words_from_cmd(self, command, delay, reply_size):
+        """Run an SGP command query, awaiting the command delay, get a reply and CRC results if necessary"""
+        self._i2c.writeto(self._addr, bytes(command))
+        await sleep(delay)
+        return self._i2c_read_words(reply_size)
+
+    def _i2c_read_words(self, reply_size):
+        """Read a reply of reply_size words and check the CRC of each word"""
         if not reply_size:
             return None
         crc_result = bytearray(reply_size * (_SGP30_WORD_LEN +1))
@@ -207,3 +229,8 @@ class SGP30(SensorModule):
             "tvoc": reading[1]
         }
         return data
+
+    async def async_get_reading(self) -> dict[str, float]:
+        co2eq, tvoc = await self.async_iaq_measure()
+        return {"co2eq": float(co2eq), "tvoc": float(tvoc)}
+
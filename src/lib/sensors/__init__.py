@@ -1,23 +1,28 @@
-from asyncio import create_task, sleep, run
-from machine import I2C
-from config import SENSOR_MODULES, SENSOR_LOGGING_ENABLED, SENSOR_LOG_CACHE_ENABLED, CO2_ALARM_THRESHOLD_PPM
-from lib.ulogging import uLogger
+from asyncio import sleep, run, Event
+from lib.supervisor import supervisor
+from config import SENSOR_MODULES, SENSOR_LOGGING_ENABLED, SENSOR_LOG_CACHE_ENABLED, SENSOR_POLL_INTERVALS_S, SENSOR_UPLOAD_QUEUE_MAX_SIZE, SENSOR_UPLOAD_BATCH_SIZE, SENSOR_UPLOAD_COMPACT_FORMAT
+from lib.ulogging import get_logger
+from lib.i2c_bus import I2CBus, PRIORITY_ALARM, PRIORITY_SENSOR
 from lib.sensors.SGP30 import SGP30
 from lib.sensors.BME280 import BME280
 from lib.sensors.SCD30 import SCD30
 from lib.sensors.sensor_module import SensorModule
+from lib.sensors.snapshot import ReadingsSnapshot
+from lib.sensors.schema import SensorSchema
 from lib.sensors.file_logging import FileLogger
+from lib.sensors.upload_queue import UploadQueue
+from lib.sensors.compact_payload import CompactPayload
 from lib.sensors.alarm import Alarm
 from lib.displays.display import Display
 from lib.networking import WirelessNetwork
 from lib.space_state import SpaceState
 from lib.slack_api import Wrapper
 from json import dumps
-from time import time, localtime
+from time import time, localtime, ticks_ms, ticks_add, ticks_diff
 
 class Sensors:
-    def __init__(self, i2c: I2C, display: Display, wifi: WirelessNetwork, space_state: SpaceState) -> None:
-        self.log = uLogger("Sensors")
+    def __init__(self, i2c: I2CBus, display: Display, wifi: WirelessNetwork, space_state: SpaceState) -> None:
+        self.log = get_logger("Sensors")
         self.i2c = i2c
         self.display = display
         self.wifi = wifi
@@ -27,13 +32,28 @@ class Sensors:
         self.SENSOR_MODULES = SENSOR_MODULES
         self.available_modules: dict = {}
         self.configured_modules: dict = {}
+        self.schema = SensorSchema({})
+        self.latest_values: list = []
+        self.snapshot = ReadingsSnapshot()
+        self._refresh_event = None
+        self.push_period_s = 60
+        self.MAX_PUSH_BATCHES = 10
         self.file_logger = FileLogger(init_files=True)
+        self.upload_queue = UploadQueue("/data/sensors/upload_queue/", SENSOR_UPLOAD_QUEUE_MAX_SIZE)
+        try:
+            self.upload_queue.init()
+            self.migrate_smib_cache()
+        except Exception as e:
+            self.log.error(f"Failed to initialise sensor upload queue: {e}")
         self.load_modules(self.SENSOR_MODULES)
         self._configure_modules()
+        self.file_logger.configure_channels(self.get_channels())
+        self.compact_payload = CompactPayload(self.schema.channels, self.schema.units)
+        self.acknowledged_schema_id = None
         self.alarm = Alarm(self.display, self.space_state)
-        if CO2_ALARM_THRESHOLD_PPM > 0 and 'SCD30' in self.configured_modules:
+        if self.alarm.configure_rules(self.schema) > 0:
             self.alarm.enable()
-            self.log.info("SCD30 present and CO2_ALARM_THRESHOLD_PPM > 0, CO2 alarm enabled")
+            self.log.info(f"Alarm enabled with rules for {self.alarm.rules.modules()}")
 
     def load_modules(self, modules: list[str]) -> None:
         """
@@ -64,11 +84,15 @@ class Sensors:
             if sensor_module in self.available_modules:
                 self.log.info(f"Found driver for {sensor_module}")
                 self.configured_modules[sensor_module] = self.available_modules[sensor_module]
-                self.log.info(f"Configured {sensor_module} sensor module")
+                if sensor_module in SENSOR_POLL_INTERVALS_S:
+                    self.configured_modules[sensor_module].poll_interval_s = SENSOR_POLL_INTERVALS_S[sensor_module]
+                self.log.info(f"Configured {sensor_module} sensor module, polling every {self.configured_modules[sensor_module].poll_interval_s}s")
                 self.log.info(f"Available sensors: {self.get_sensors(sensor_module)}")
             else:
                 self.log.error(f"Driver not found for {sensor_module}")
 
+        self.schema = SensorSchema(self.configured_modules)
+        self.latest_values = self.schema.new_values()
         self.log.info(f"Configured modules: {self.get_modules()}")
 
     def startup(self) -> None:
@@ -88,7 +112,7 @@ class Sensors:
 
         if SENSOR_LOGGING_ENABLED:
             self.log.info(f"Starting sensors: {self.configured_modules}")
-            create_task(self._poll_sensors())
+            supervisor.start("sensor_poll", self._poll_sensors)
             self.log.info("Sensor polling started")
         else:
             self.log.info("Sensor log cache disabled, skipping sensor startup")
@@ -104,7 +128,7 @@ class Sensors:
         try:
             if payload:
                 result = await self.api_wrapper.async_slack_api_request("POST", "smibhid/log/sensor", dumps(payload))
-                self.log.info(f"Pushed sensor readings: {payload}, result: {result}")
+                self.log.info("Pushed sensor readings: %s, result: %s", payload, result)
             else:
                 self.log.warn("No sensor readings to push")
         except Exception as e:
@@ -124,178 +148,267 @@ class Sensors:
                 }
         return timestamped_readings
 
-    def update_display_and_log_cache(self, readings: dict) -> None:
+    def get_units(self) -> dict:
         """
-        Update the display with sensor readings and log them to cache if caching enabled.
+        Return a dictionary of units by module and sensor name for all
+        configured modules.
         """
-        if readings.get("SCD30"):
-                self.display.update_co2(readings["SCD30"]["co2"])
-                
-        if SENSOR_LOG_CACHE_ENABLED:
-            self.file_logger.log_minute_entry(readings)
-    
+        return self.schema.units
+
+    def create_readings_payload(self, readings_list: list) -> dict:
+        """
+        Return the payload for a list of readings, in the compact columnar
+        format if SENSOR_UPLOAD_COMPACT_FORMAT is enabled, sending the schema
+        until SMIB has acknowledged its schema id.
+        """
+        if SENSOR_UPLOAD_COMPACT_FORMAT:
+            include_schema = self.acknowledged_schema_id != self.compact_payload.schema_id
+            self.log.info("Creating compact payload for sensor readings, including schema: %s", include_schema)
+            return self.compact_payload.encode(readings_list, include_schema)
+
+        return self.create_unit_encapsulated_readings_payload(readings_list)
+
+    def process_push_result(self, result: dict) -> None:
+        """
+        Record the schema id acknowledged by SMIB in a push response so later
+        compact payloads can omit the channel names and units. A response
+        without our schema id means SMIB needs the schema sent again.
+        """
+        schema_id = result.get("schema_id") if isinstance(result, dict) else None
+        if schema_id != self.acknowledged_schema_id:
+            self.log.info(f"SMIB acknowledged sensor schema: {schema_id}")
+        self.acknowledged_schema_id = schema_id
+
     def create_unit_encapsulated_readings_payload(self, readings_list: list) -> dict:
         """
         Return a dictionary with the readings_list encapsulated in a 'readings' key and a 'unit' key
         containing the corresponding reading units.
         """
         self.log.info("Creating payload for sensor readings")
-        units = {}
-        modules = self.get_modules()
-        self.log.info(f"Configured modules: {modules}")
-        for module in modules:
-            units[module] = {}
-            sensors = self.get_sensors(module)
-            for sensor in sensors:
-                self.log.info(f"Adding sensor {sensor['name']} with unit {sensor['unit']}")
-                units[module][sensor["name"]] = sensor["unit"]
-
         payload = {
-            "units": units,
+            "units": self.get_units(),
             "readings": readings_list            
         }
 
-        self.log.info(f"Created payload for sensor readings: {payload}")
+        self.log.info("Created payload for sensor readings: %s", payload)
         
         return payload
     
-    async def async_push_all_readings(self, readings_list: list) -> None:
+    async def async_push_all_readings(self) -> None:
         """
-        Asynchronously push all sensor readings to the API, including any cached readings.
-        Cache any failed pushes to the file cache for later retry.
+        Asynchronously push queued sensor readings to the API in batches of
+        up to SENSOR_UPLOAD_BATCH_SIZE, acknowledging each batch in the
+        upload queue once pushed. Stop at the first failure, leaving the rest
+        queued for the next push, and after MAX_PUSH_BATCHES batches so a long
+        backlog drains over several push periods.
         """
-        failed_push_list = []
-        payload = self.create_unit_encapsulated_readings_payload(readings_list)
-        try:
-            self.log.info(f"Pushing sensor readings: {payload}")
-            await self.async_push_sensor_readings_payload(payload)
-            self.log.info("Sensor readings pushed successfully.")
+        for _ in range(self.MAX_PUSH_BATCHES):
+            readings_list, cursor = self.upload_queue.read_batch(SENSOR_UPLOAD_BATCH_SIZE)
+            if not readings_list:
+                if self.upload_queue.pending():
+                    self.upload_queue.commit(cursor)
+                    continue
+                self.log.info("All sensor readings pushed successfully")
+                return
 
-        except Exception as e:
-            self.log.error(f"Error pushing sensor reading: {e}")
-            failed_push_list.extend(readings_list)
+            payload = self.create_readings_payload(readings_list)
+            try:
+                self.log.info("Pushing %s sensor readings", len(readings_list))
+                result = await self.async_push_sensor_readings_payload(payload)
+            except Exception as e:
+                self.log.error(f"Error pushing sensor readings, {len(readings_list)} readings remain queued: {e}")
+                return
 
-        if self.file_logger.check_for_smib_cache():
-            self.file_logger.delete_smib_cache()
+            self.upload_queue.commit(cursor)
+            self.process_push_result(result)
+            self.log.info("Pushed %s sensor readings", len(readings_list))
 
-        if failed_push_list:
-            self.log.error(f"Failed to push sensor readings: {failed_push_list}")
-            self.file_logger.write_smib_cache_list(failed_push_list)
-        else:
-            self.log.info("All sensor readings pushed successfully")
-    
-    def collect_cached_readings(self, readings_list: list) -> list:
+        self.log.info("Sensor reading backlog remaining, continuing at next push")
+
+    def migrate_smib_cache(self) -> None:
         """
-        Check for previous failed readings in cache and append them to the readings list.
+        Move readings from the legacy smib_cache.txt file into the upload
+        queue.
         """
         if self.file_logger.check_for_smib_cache():
-            self.log.info("SMIB cache file found, reading cached sensor readings")
-            cached_readings = self.file_logger.read_smib_cache_list()
-            readings_list.extend(cached_readings)
-            self.log.info(f"Readings from cache: {cached_readings}")
-            self.log.info(f"Total readings to push: {len(readings_list)}")
-            
-        else:
-            self.log.info("No cached readings found, pushing current readings only")
+            self.log.info("Migrating smib_cache.txt readings to upload queue")
+            try:
+                imported = self.upload_queue.import_lines(self.file_logger.smib_cache_file)
+                self.log.info(f"Migrated {imported} cached readings to upload queue")
+                self.file_logger.delete_smib_cache()
+            except Exception as e:
+                self.log.error(f"Failed to migrate smib_cache.txt: {e}")
 
-        return readings_list
-    
     async def async_gather_and_push_all_readings(self, readings: dict) -> None:
         """
-        Gather all previously cached sensor readings that failed to push,
-        append a timestamp to the current readings and add to the cached
-        readings to push them to the API. Create a new cache for any failed
-        pushes.
+        Append the current readings with a timestamp to the upload queue,
+        then push the queue including any readings that previously failed to
+        push.
         """
-        readings_list = []
-        readings_list.append(self.generate_timestamped_readings(readings))
-        readings_list = self.collect_cached_readings(readings_list)
-        await self.async_push_all_readings(readings_list)
+        try:
+            self.upload_queue.append(self.generate_timestamped_readings(readings))
+        except Exception as e:
+            self.log.error(f"Failed to queue sensor readings: {e}")
 
-        return
+        await self.async_push_all_readings()
 
     async def _poll_sensors(self) -> None:
         """
-        Asynchronously poll sensors and log readings every 60 seconds.
+        Asynchronously poll each sensor module on its own interval and push
+        the latest readings from all modules every push period.
+        Sleeps until the next module or push is due, so a slow module never
+        holds up the rest of the event loop.
         """
         self.log.info("Starting sensor polling")
-        
+        now = ticks_ms()
+        next_poll_ms = {name: now for name in self.configured_modules}
+        next_push_ms = now
+
         while True:
-            try:
-                readings = self.get_readings()
-                self.log.info(f"Sensor readings: {readings}")
-                
-                if len(readings) > 0:
-                    if self.alarm.enabled:
-                        self.alarm.assess_co2_alarm(readings)
-
-                    self.update_display_and_log_cache(readings)
-                    await self.async_gather_and_push_all_readings(readings)
-                
-                else:
-                    self.log.error("No sensor readings available")
-            
-            except Exception as e:
-                self.log.error(f"Error in sensor polling cycle: {e}")
-            
-            await sleep(60)
-    
+            for name, module in self.configured_modules.items():
+                if ticks_diff(next_poll_ms[name], ticks_ms()) <= 0:
+                    await self._async_poll_module(name, module)
+                    next_poll_ms[name] = ticks_add(ticks_ms(), module.poll_interval_s * 1000)
+
+            if ticks_diff(next_push_ms, ticks_ms()) <= 0:
+                await self._async_push_latest_readings()
+                next_push_ms = ticks_add(ticks_ms(), self.push_period_s * 1000)
+
+            next_due_ms = next_push_ms
+            for due_ms in next_poll_ms.values():
+                if ticks_diff(due_ms, next_due_ms) < 0:
+                    next_due_ms = due_ms
+
+            wait_ms = ticks_diff(next_due_ms, ticks_ms())
+            if wait_ms > 0:
+                await sleep(wait_ms / 1000)
+
+    async def _async_poll_module(self, name: str, module: SensorModule) -> None:
+        """
+        Asynchronously read a single sensor module, store its values in the
+        module's slice of the latest values and publish a new snapshot.
+        """
+        try:
+            async with self.i2c.transaction(self._bus_priority(name)):
+                reading = await module.async_get_reading()
+        except Exception as e:
+            self.log.error(f"Error polling {name} sensor module: {e}")
+            reading = {}
+
+        if self.schema.set_module_values(self.latest_values, name, reading) == 0:
+            self.log.warn(f"Module {name} has no valid readings")
+
+        self.snapshot = ReadingsSnapshot.capture(self.schema, self.latest_values)
+        self.process_snapshot(name)
+
+    def _bus_priority(self, name: str) -> int:
+        """
+        Return the I2C bus priority for polling a module, ranking reads for
+        modules with alarm rules above other sensor polls.
+        """
+        if self.alarm.enabled and name in self.alarm.rules.rules_by_module:
+            return PRIORITY_ALARM
+        return PRIORITY_SENSOR
+
+    def process_snapshot(self, name: str) -> None:
+        """
+        Update the display when a new SCD30 reading arrives and evaluate the
+        alarm rules for the module that was read.
+        """
+        if name == "SCD30":
+            co2 = self.snapshot.get_value("SCD30", "co2")
+            if co2 is not None:
+                self.display.update_co2(co2)
+        if self.alarm.enabled:
+            self.alarm.assess(self.snapshot, name)
+
+    def get_snapshot(self) -> ReadingsSnapshot:
+        """
+        Return the latest readings snapshot without touching the hardware.
+        """
+        return self.snapshot
+
+    async def async_refresh_snapshot(self) -> ReadingsSnapshot:
+        """
+        Asynchronously poll every configured module and return the new
+        snapshot. Concurrent callers wait on the refresh already in progress
+        rather than starting another round of hardware reads.
+        """
+        if self._refresh_event is not None:
+            await self._refresh_event.wait()
+            return self.snapshot
+
+        self._refresh_event = Event()
+        try:
+            for name, module in self.configured_modules.items():
+                await self._async_poll_module(name, module)
+        finally:
+            refresh_event = self._refresh_event
+            self._refresh_event = None
+            refresh_event.set()
+
+        return self.snapshot
+
+    async def _async_push_latest_readings(self) -> None:
+        """
+        Log and push the readings from the latest snapshot.
+        """
+        readings = self.snapshot.readings
+        self.log.info("Sensor readings: %s", readings)
+
+        if len(readings) == 0:
+            self.log.error("No sensor readings available")
+            return
+
+        try:
+            if SENSOR_LOG_CACHE_ENABLED:
+                self.file_logger.log_minute_entry(readings)
+            await self.async_gather_and_push_all_readings(readings)
+
+        except Exception as e:
+            self.log.error(f"Error in sensor push cycle: {e}")
+
     def get_modules(self) -> list:
         """
         Return a dictionary of configured sensor modules.
         """
         return list(self.configured_modules.keys())
 
+    def get_channels(self) -> list:
+        """
+        Return a list of (module, sensor) name tuples for all configured
+        modules in configuration order.
+        """
+        return self.schema.channels
+
     def get_sensors(self, module: str) -> list:
         """
         Return list of sensors for a specific module name.
         """
         module_object = self.configured_modules[module]
         sensors = module_object.get_sensors()
-        self.log.info(f"Available sensors for {module}: {sensors}")
+        self.log.info("Available sensors for %s: %s", module, sensors)
         return sensors
 
-    def clean_readings(self, readings: dict) -> dict:
-        """
-        Remove None values from sensor readings and empty modules.
-        
-        Args:
-            readings: Raw sensor readings dictionary
-            
-        Returns:
-            Cleaned readings dictionary with None values and empty modules removed
-        """
-        self.log.info("Cleaning sensor readings of None values")
-        self.log.info(f"Raw sensor readings: {readings}")
-        
-        cleaned_readings = {}
-        for reading in readings:
-            cleaned_module_data = {}
-            for module in readings[reading]:
-                if readings[reading][module] is not None:
-                    cleaned_module_data[module] = readings[reading][module]
-                else:
-                    self.log.warn(f"Sensor {reading} from module {module} returned None, removing from reading data")
-
-            if cleaned_module_data:
-                cleaned_readings[reading] = cleaned_module_data
-            else:
-                self.log.warn(f"Module {reading} has no valid readings, removing entire module from reading data")
-        
-        self.log.info(f"Cleaned sensor readings: {cleaned_readings}")
-        return cleaned_readings
-
     def get_readings(self, module: str = "") -> dict:
         """
         Return readings from a specific module by passing it's name as a
         string, or all modules if none specified.
         Remove any readings that return None to avoid logging invalid data.
+        This reads the hardware directly, use get_snapshot() unless a live
+        synchronous read is needed. If a poll currently holds the I2C bus,
+        return the latest snapshot readings rather than splitting its
+        transaction.
         """
-        readings = {}
-        if module:
-            readings[module] = self.configured_modules[module].get_reading()
-        else:
-            for name, instance in self.configured_modules.items():
-                readings[name] = instance.get_reading()
+        if not self.i2c.try_acquire():
+            self.log.warn("I2C bus busy, returning latest snapshot readings")
+            return self.snapshot.get_readings(module)
+
+        values = self.schema.new_values()
+        try:
+            for name in ([module] if module else self.get_modules()):
+                self.schema.set_module_values(values, name, self.configured_modules[name].get_reading())
+        finally:
+            self.i2c.release()
 
-        return self.clean_readings(readings)
+        return self.schema.to_dict(values, module)
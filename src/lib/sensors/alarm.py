@@ -1,30 +1,50 @@
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 from config import (
     CO2_ALARM_THRESHOLD_PPM,
     CO2_ALARM_RESET_THRESHOLD_PPM,
     CO2_ALARM_SNOOZE_DURATION_S,
     CO2_ALARM_LED_PIN,
     CO2_ALARM_BUZZER_PIN,
+    CO2_ALARM_BUZZER_PWM_FREQ,
     CO2_ALARM_SNOOZE_BUTTON_PIN,
     CO2_ALARM_SILENCE_WINDOW_START_HOUR,
-    CO2_ALARM_SILENCE_WINDOW_END_HOUR
+    CO2_ALARM_SILENCE_WINDOW_END_HOUR,
+    ALARM_RULES
     )
 from machine import Pin
-from asyncio import create_task, sleep, Event, CancelledError
+from asyncio import create_task, Event, CancelledError
+from lib.loop_monitor import create_named_task
+from lib.supervisor import supervisor
 from lib.button import Button
-from time import time, localtime
+from lib.pattern_player import PatternPlayer
+from time import time
 from lib.displays.display import Display
 from lib.space_state import SpaceState
-from lib.utils import DateTimeUtils
+from lib.sensors.alarm_rules import AlarmRule, AlarmRules, SilenceWindow
+
+try:
+    from typing import TYPE_CHECKING
+except ImportError:
+    TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from lib.sensors.schema import SensorSchema
+    from lib.sensors.snapshot import ReadingsSnapshot
+
+# Half duty so a passive buzzer driven with PWM sounds a tone, active buzzers are switched fully on
+ALARM_BUZZER_TONE_DUTY = 0.5
+ALARM_BUZZER_PATTERN = ((ALARM_BUZZER_TONE_DUTY, 500), (0, 500))
+ALARM_BUZZER_TEST_PATTERN = ((ALARM_BUZZER_TONE_DUTY, 500),)
 
 class Alarm:
     """
     Alarm class to handle sensor alarms.
     """
     def __init__(self, display: Display, space_state: SpaceState) -> None:
-        self.log = uLogger("Alarm")
+        self.log = get_logger("Alarm")
         self.log.info("Alarm module initialized")
-        self.date_time_utils = DateTimeUtils()
+        self.rules = AlarmRules()
+        self.silence_window = SilenceWindow(CO2_ALARM_SILENCE_WINDOW_START_HOUR, CO2_ALARM_SILENCE_WINDOW_END_HOUR)
         self.display = display
         self.space_state = space_state
         self.enabled = False
@@ -36,6 +56,22 @@ class Alarm:
             3: "Silenced"
         }
 
+    def configure_rules(self, schema: 'SensorSchema') -> int:
+        """
+        Add the CO2 alarm rule, if CO2_ALARM_THRESHOLD_PPM is set, and any
+        ALARM_RULES for channels in the schema. Return the number of rules.
+        """
+        if CO2_ALARM_THRESHOLD_PPM > 0:
+            self.rules.add(AlarmRule("CO2", "SCD30", "co2", CO2_ALARM_THRESHOLD_PPM, CO2_ALARM_RESET_THRESHOLD_PPM, ignore_zero=True), schema)
+
+        for rule in ALARM_RULES:
+            try:
+                self.rules.add(AlarmRule.from_dict(rule), schema)
+            except (KeyError, ValueError) as e:
+                self.log.error(f"Invalid alarm rule {rule}: {e}")
+
+        return len(self.rules.rules)
+
     def enable(self, ) -> None:
         """
         Enable the CO2 alarm.
@@ -43,13 +79,14 @@ class Alarm:
         self.log.info("Enabling CO2 alarm")
         self.enabled = True
         self.co2_alarm_buzzer = Pin(CO2_ALARM_BUZZER_PIN, Pin.OUT)
+        self.co2_alarm_buzzer_player = PatternPlayer(self.co2_alarm_buzzer, CO2_ALARM_BUZZER_PWM_FREQ, "CO2 alarm buzzer")
         self.co2_alarm_led = Pin(CO2_ALARM_LED_PIN, Pin.OUT)
         self.co2_alarm_snooze_event = Event()
         self.co2_alarm_snooze_button = Button(CO2_ALARM_SNOOZE_BUTTON_PIN, "CO2 alarm snooze", self.co2_alarm_snooze_event)
         self.co2_alarm_buzzer_snooze_set_time = None
         self.alarm_task = None
-        create_task(self.co2_alarm_snooze_button.wait_for_press())
-        create_task(self.async_co2_alarm_button_press_watcher())
+        supervisor.start("co2_alarm_snooze_button", self.co2_alarm_snooze_button.wait_for_press)
+        supervisor.start("co2_alarm_snooze_watcher", self.async_co2_alarm_button_press_watcher)
 
     async def async_test_co2_alarm(self) -> None:
         """
@@ -57,11 +94,9 @@ class Alarm:
         """
         self.log.info("Testing CO2 alarm")
         self.display.update_alarm("Testing")
-        self.co2_alarm_buzzer.on()
         self.co2_alarm_led.on()
-        await sleep(0.5)
+        await self.co2_alarm_buzzer_player.async_play(ALARM_BUZZER_TEST_PATTERN, 1)
         self.display.update_alarm("Clear")
-        self.co2_alarm_buzzer.off()
         self.co2_alarm_led.off()
     
     async def async_start_alarm(self) -> None:
@@ -73,18 +108,16 @@ class Alarm:
             self.log.error("CO2 alarm task already running, method should not have been called.")
             return
 
-        self.alarm_task = create_task(self.async_alarm_buzzer_loop())
+        self.alarm_task = create_named_task(self.async_alarm_buzzer_loop(), "co2_alarm_buzzer")
 
     async def async_alarm_buzzer_loop(self) -> None:
         """
-        Asynchronously loop to sound the CO2 alarm buzzer with a pause instead of continuously.
+        Asynchronously sound the CO2 alarm buzzer with a pause instead of
+        continuously until cancelled. The buzzer is switched by a hardware
+        timer, so the task only waits for cancellation.
         """
         try:
-            while True:
-                self.co2_alarm_buzzer.on()
-                await sleep(0.5)
-                self.co2_alarm_buzzer.off()
-                await sleep(0.5)
+            await self.co2_alarm_buzzer_player.async_play(ALARM_BUZZER_PATTERN)
         
         except CancelledError:
             self.log.info("CO2 alarm task was canceled")
@@ -103,7 +136,7 @@ class Alarm:
                 self.log.info("CO2 alarm task cancellation confirmed")
         
         self.alarm_task = None
-        self.co2_alarm_buzzer.off()
+        self.co2_alarm_buzzer_player.stop()
     
     async def async_co2_alarm_button_press_watcher(self) -> None:
         """
@@ -138,23 +171,19 @@ class Alarm:
         self.log.info("No displays with power control are powered off; returning True")
         return True
 
-    def assess_co2_alarm(self, readings: dict) -> None:
-        """
-        Assess the CO2 alarm state based on readings from the SCD30 sensor.
-        """
-        if "SCD30" in readings and "co2" in readings["SCD30"] and readings["SCD30"]["co2"] != 0:
-            self.log.info("Assessing CO2 alarm state")
-            co2_ppm = readings["SCD30"]["co2"]
-            if co2_ppm >= CO2_ALARM_THRESHOLD_PPM:
-                self.log.info(f"CO2 of {co2_ppm} ppm above alarm threshold of ({CO2_ALARM_THRESHOLD_PPM} ppm), setting alarm")
-                self.set_co2_alarm()
-                
-            elif co2_ppm <= CO2_ALARM_RESET_THRESHOLD_PPM:
-                self.log.info(f"CO2 of {co2_ppm} ppm below alarm reset threshold of ({CO2_ALARM_RESET_THRESHOLD_PPM} ppm), resetting alarm")
-                self.unset_co2_alarm()
-                self.status = 0
-        else: 
-            self.log.error("SCD30 sensor data not found in readings, unable to assess CO2 alarm state")
+    def assess(self, snapshot: 'ReadingsSnapshot', module: str) -> None:
+        """
+        Evaluate the alarm rules for a module against a new snapshot, setting
+        the alarm while any rule is active and unsetting it when the last
+        active rule resets.
+        """
+        changed = self.rules.evaluate(snapshot, module)
+        if self.rules.any_active():
+            self.set_co2_alarm()
+        elif changed:
+            self.log.info("All alarm rules reset, resetting alarm")
+            self.unset_co2_alarm()
+            self.status = 0
     
     def set_co2_alarm(self) -> None:
         """
@@ -203,34 +232,7 @@ class Alarm:
         Check if the current time is within the CO2 alarm silence window.
         Handles cases where the silence window spans across midnight (e.g., 22:00 to 08:00).
         """
-        self.log.info("Checking if current time is within CO2 alarm silence window")
-        current_hour = localtime()[3]
-
-        try:
-            if self.date_time_utils.uk_bst():
-                current_hour += 1
-        except ValueError as e:
-            self.log.error(f"Error checking UK BST: {e}, time may be incorrect for BST")
-
-        self.log.info(f"Current hour: {current_hour}")
-        self.log.info(f"CO2 alarm silence window start hour: {CO2_ALARM_SILENCE_WINDOW_START_HOUR}, end hour: {CO2_ALARM_SILENCE_WINDOW_END_HOUR}")
-        if (CO2_ALARM_SILENCE_WINDOW_START_HOUR is not None and
-                CO2_ALARM_SILENCE_WINDOW_END_HOUR is not None):
-            
-            start_hour = CO2_ALARM_SILENCE_WINDOW_START_HOUR
-            end_hour = CO2_ALARM_SILENCE_WINDOW_END_HOUR
-            
-            if start_hour < end_hour:
-                if start_hour <= current_hour < end_hour:
-                    self.log.info("Current time is within CO2 alarm silence window")
-                    return True
-            else:
-                if current_hour >= start_hour or current_hour <= end_hour:
-                    self.log.info("Current time is within CO2 alarm silence window (crosses midnight)")
-                    return True
-        
-        self.log.info("Current time is outside CO2 alarm silence window")
-        return False
+        return self.silence_window.active(time())
 
     def set_co2_alarm_buzzer(self) -> None:
         """
@@ -269,7 +271,7 @@ class Alarm:
         """
         self.log.info("Getting CO2 alarm status.")
         data = {"status": self.status, "status_text": self.status_lookup.get(self.status, "Unknown")}
-        self.log.info(f"Current status value: {data}")
+        self.log.info("Current status value: %s", data)
         return data
     
     def get_statuses(self) -> dict:
@@ -277,9 +279,15 @@ class Alarm:
         Get all possible CO2 alarm statuses.
         """
         self.log.info("Getting CO2 alarm statuses.")
-        self.log.info(f"Current CO2 alarm statuses: {self.status_lookup}")
+        self.log.info("Current CO2 alarm statuses: %s", self.status_lookup)
         return self.status_lookup.copy()
 
+    def get_rule_statuses(self) -> list:
+        """
+        Get the state of each alarm rule.
+        """
+        return self.rules.get_statuses()
+
     def get_alarm_trigger_threshold(self) -> int:
         """
         Get the CO2 alarm trigger threshold in ppm.
@@ -0,0 +1,209 @@
+from lib.ulogging import get_logger
+from lib.timezone import TimeZone
+
+try:
+    from typing import TYPE_CHECKING
+except ImportError:
+    TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from lib.sensors.schema import SensorSchema
+    from lib.sensors.snapshot import ReadingsSnapshot
+
+RULE_CLEAR = 0
+RULE_PENDING = 1
+RULE_ACTIVE = 2
+
+class AlarmRule:
+    """
+    Threshold alarm rule for a single sensor channel.
+    The rule triggers when the value reaches threshold or rises faster than
+    rate_per_min units per minute, and that condition has held for
+    sustain_s seconds. Once active it stays active until the value falls to
+    reset_threshold or below and is no longer rising too fast, giving
+    hysteresis between the trigger and reset levels. Either threshold or
+    rate_per_min may be None to use only the other condition. Sensors that
+    report 0 before their first measurement can set ignore_zero.
+    """
+    def __init__(self, name: str, module: str, sensor: str, threshold: float | None = None, reset_threshold: float | None = None, rate_per_min: float | None = None, sustain_s: int = 0, ignore_zero: bool = False) -> None:
+        if threshold is None and rate_per_min is None:
+            raise ValueError(f"Alarm rule {name} needs a threshold or rate_per_min")
+        self.name = name
+        self.module = module
+        self.sensor = sensor
+        self.threshold = threshold
+        self.reset_threshold = threshold if reset_threshold is None else reset_threshold
+        self.rate_per_min = rate_per_min
+        self.sustain_s = sustain_s
+        self.ignore_zero = ignore_zero
+        self.state = RULE_CLEAR
+        self.pending_since = None
+        self.last_value = None
+        self.last_timestamp = None
+        self.rate = None
+
+    @classmethod
+    def from_dict(cls, rule: dict) -> "AlarmRule":
+        """
+        Create a rule from a config dictionary, e.g. {"name": "co2", "module":
+        "SCD30", "sensor": "co2", "threshold": 1000, "reset_threshold": 800}.
+        """
+        return cls(rule.get("name", f"{rule['module']} {rule['sensor']}"), rule["module"], rule["sensor"],
+                   rule.get("threshold"), rule.get("reset_threshold"), rule.get("rate_per_min"), rule.get("sustain_s", 0), rule.get("ignore_zero", False))
+
+    @property
+    def active(self) -> bool:
+        return self.state == RULE_ACTIVE
+
+    def evaluate(self, value: float | None, timestamp: int) -> bool:
+        """
+        Update the rule state from a new value and return True if the state
+        changed between active and not active. Missing values, ignored zero
+        values and repeated timestamps leave the state unchanged.
+        """
+        if value is None or timestamp == self.last_timestamp or (self.ignore_zero and value == 0):
+            return False
+
+        self.rate = None
+        if self.last_timestamp is not None and timestamp > self.last_timestamp:
+            self.rate = (value - self.last_value) * 60 / (timestamp - self.last_timestamp)
+        self.last_value = value
+        self.last_timestamp = timestamp
+
+        rising_fast = self.rate_per_min is not None and self.rate is not None and self.rate >= self.rate_per_min
+
+        if self.state == RULE_ACTIVE:
+            if rising_fast or (self.threshold is not None and value > self.reset_threshold):
+                return False
+            self.state = RULE_CLEAR
+            return True
+
+        if not (rising_fast or (self.threshold is not None and value >= self.threshold)):
+            self.state = RULE_CLEAR
+            self.pending_since = None
+            return False
+
+        if self.state == RULE_CLEAR:
+            self.pending_since = timestamp
+        if timestamp - self.pending_since >= self.sustain_s:
+            self.state = RULE_ACTIVE
+            self.pending_since = None
+            return True
+        self.state = RULE_PENDING
+        return False
+
+    def get_status(self) -> dict:
+        return {
+            "name": self.name,
+            "module": self.module,
+            "sensor": self.sensor,
+            "state": ["Clear", "Pending", "Active"][self.state],
+            "value": self.last_value,
+            "rate_per_min": None if self.rate is None else round(self.rate, 2),
+            "threshold": self.threshold,
+            "reset_threshold": self.reset_threshold,
+            }
+
+class SilenceWindow:
+    """
+    Daily local time window, in whole hours, when alarms should not sound.
+    Whether the window is active is worked out once along with the unix
+    timestamp of its next change, so checking it is a single comparison
+    until that time. Changes are also recalculated when the clocks change,
+    so the window follows local time.
+    """
+    def __init__(self, start_hour: int | None, end_hour: int | None) -> None:
+        self.log = get_logger("SilenceWindow")
+        self.timezone = TimeZone()
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.enabled = start_hour is not None and end_hour is not None
+        self._active = False
+        self.next_transition = 0
+
+    def _hour_in_window(self, hour: int) -> bool:
+        if self.start_hour < self.end_hour:
+            return self.start_hour <= hour < self.end_hour
+        return hour >= self.start_hour or hour <= self.end_hour
+
+    def _utc_offset_s(self, now: int) -> int:
+        return self.timezone.utc_offset_s(now)
+
+    def compile(self, now: int) -> None:
+        """
+        Work out if the window is active at now and when that next changes.
+        """
+        offset = self._utc_offset_s(now)
+        local = now + offset
+        hour_start = local - local % 3600
+        hour = (local % 86400) // 3600
+        self._active = self._hour_in_window(hour)
+
+        next_transition = None
+        for hours_ahead in range(1, 25):
+            if self._hour_in_window((hour + hours_ahead) % 24) != self._active:
+                next_transition = hour_start + hours_ahead * 3600 - offset
+                break
+
+        clock_change = self.timezone.next_transition(now)
+        if next_transition is None or clock_change < next_transition:
+            next_transition = clock_change
+        self.next_transition = next_transition
+        self.log.info(f"Silence window {'active' if self._active else 'inactive'} until {self.next_transition}")
+
+    def active(self, now: int) -> bool:
+        """
+        Return True if now is within the silence window.
+        """
+        if not self.enabled:
+            return False
+        if now >= self.next_transition:
+            self.compile(now)
+        return self._active
+
+class AlarmRules:
+    """
+    Set of alarm rules evaluated against readings snapshots. Rules are
+    indexed by module so each new module reading only evaluates the rules
+    for its own channels.
+    """
+    def __init__(self) -> None:
+        self.log = get_logger("AlarmRules")
+        self.rules = []
+        self.rules_by_module = {}
+
+    def add(self, rule: AlarmRule, schema: 'SensorSchema') -> bool:
+        """
+        Add a rule if its channel is in the schema, returning True if added.
+        """
+        if (rule.module, rule.sensor) not in schema.index:
+            self.log.warn(f"Ignoring alarm rule {rule.name}, {rule.module} {rule.sensor} is not configured")
+            return False
+        self.rules.append(rule)
+        self.rules_by_module.setdefault(rule.module, []).append(rule)
+        self.log.info(f"Added alarm rule {rule.name} on {rule.module} {rule.sensor}")
+        return True
+
+    def modules(self) -> list:
+        return list(self.rules_by_module.keys())
+
+    def evaluate(self, snapshot: 'ReadingsSnapshot', module: str) -> bool:
+        """
+        Evaluate the rules for a module against a snapshot and return True if
+        any rule changed between active and not active.
+        """
+        changed = False
+        for rule in self.rules_by_module.get(module, ()):
+            if rule.evaluate(snapshot.get_value(rule.module, rule.sensor), snapshot.timestamp):
+                changed = True
+                self.log.info(f"Alarm rule {rule.name} {'triggered' if rule.active else 'reset'} at {rule.last_value}")
+        return changed
+
+    def any_active(self) -> bool:
+        for rule in self.rules:
+            if rule.active:
+                return True
+        return False
+
+    def get_statuses(self) -> list:
+        return [rule.get_status() for rule in self.rules]
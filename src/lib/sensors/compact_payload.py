@@ -0,0 +1,158 @@
+from ubinascii import crc32
+from json import dumps
+
+FORMAT_NAME = "columnar-v1"
+
+MAX_DECIMALS = 4
+
+class CompactPayload:
+    """
+    Encoder and decoder for the compact columnar sensor readings payload.
+    Channel names are dictionary coded as [module, sensor] pairs indexed by
+    position. Timestamps are sent as the first timestamp and run length
+    encoded [delta, count] pairs. Values are sent as one column per channel
+    of integers scaled by 10 ** decimals, each the difference from the
+    previous value in the column, with null for missing readings. The
+    channel list and units are identified by a schema id and only need
+    sending until the server echoes that schema id back in a push response.
+
+    Example payload:
+    {"format": "columnar-v1", "schema_id": "5e1f0c2a",
+     "channels": [["SCD30", "co2"], ["SCD30", "temperature"]],
+     "units": ["ppm", "C"],
+     "timestamps": {"start": 1718000000, "deltas": [[60, 2]]},
+     "values": [{"decimals": 1, "deltas": [6123, 57, null]},
+                {"decimals": 1, "deltas": [216, 1, 0]}]}
+    """
+    def __init__(self, channels: list, units: dict) -> None:
+        self.channels = [tuple(channel) for channel in channels]
+        self.units = [units.get(module, {}).get(sensor) for module, sensor in self.channels]
+        self.index = {}
+        for position, channel in enumerate(self.channels):
+            self.index[channel] = position
+        self.schema_id = "{:08x}".format(crc32(dumps([self.channels, self.units]).encode()) & 0xffffffff)
+
+    def encode(self, readings_list: list, include_schema: bool = True) -> dict:
+        """
+        Encode a list of {"timestamp": ..., "data": {module: {sensor: value}}}
+        readings, oldest first, as a columnar payload. Readings for channels
+        not in the schema are dropped.
+        """
+        columns = [[] for _ in self.channels]
+        for reading in readings_list:
+            row = [None] * len(self.channels)
+            for module, sensors in reading["data"].items():
+                for sensor, value in sensors.items():
+                    position = self.index.get((module, sensor))
+                    if position is not None:
+                        row[position] = value
+            for position, value in enumerate(row):
+                columns[position].append(value)
+
+        payload = {"format": FORMAT_NAME, "schema_id": self.schema_id}
+        if include_schema:
+            payload["channels"] = [list(channel) for channel in self.channels]
+            payload["units"] = self.units
+        payload["timestamps"] = self._encode_timestamps(readings_list)
+        payload["values"] = [self._encode_column(column) for column in columns]
+        return payload
+
+    def _encode_timestamps(self, readings_list: list) -> dict:
+        runs = []
+        previous_timestamp = None
+        for reading in readings_list:
+            timestamp = reading["timestamp"]
+            if previous_timestamp is not None:
+                delta = timestamp - previous_timestamp
+                if runs and runs[-1][0] == delta:
+                    runs[-1][1] += 1
+                else:
+                    runs.append([delta, 1])
+            previous_timestamp = timestamp
+        return {"start": readings_list[0]["timestamp"] if readings_list else None, "deltas": runs}
+
+    def _column_decimals(self, column: list) -> int:
+        """
+        Return the fewest decimal places, up to MAX_DECIMALS, that represent
+        every value in the column exactly.
+        """
+        decimals = 0
+        for value in column:
+            if value is None:
+                continue
+            while decimals < MAX_DECIMALS:
+                scaled = value * 10 ** decimals
+                if abs(scaled - round(scaled)) <= 1e-6 * max(1, abs(scaled)):
+                    break
+                decimals += 1
+        return decimals
+
+    def _encode_column(self, column: list) -> dict:
+        decimals = self._column_decimals(column)
+        scale = 10 ** decimals
+        deltas = []
+        previous = 0
+        for value in column:
+            if value is None:
+                deltas.append(None)
+                continue
+            scaled = round(value * scale)
+            deltas.append(scaled - previous)
+            previous = scaled
+        return {"decimals": decimals, "deltas": deltas}
+
+    def decode(self, payload: dict) -> dict:
+        """
+        Decode a columnar payload back to the unit encapsulated readings
+        format. Payloads without a schema use this encoder's channels and
+        units, which must match the payload schema id.
+        """
+        if payload.get("format") != FORMAT_NAME:
+            raise ValueError(f"Unsupported payload format: {payload.get('format')}")
+
+        if "channels" in payload:
+            channels = [tuple(channel) for channel in payload["channels"]]
+            channel_units = payload["units"]
+        elif payload["schema_id"] == self.schema_id:
+            channels = self.channels
+            channel_units = self.units
+        else:
+            raise ValueError(f"Unknown schema id: {payload['schema_id']}")
+
+        units = {}
+        for (module, sensor), unit in zip(channels, channel_units):
+            units.setdefault(module, {})[sensor] = unit
+
+        timestamps = []
+        if payload["timestamps"]["start"] is not None:
+            timestamp = payload["timestamps"]["start"]
+            timestamps.append(timestamp)
+            for delta, count in payload["timestamps"]["deltas"]:
+                for _ in range(count):
+                    timestamp += delta
+                    timestamps.append(timestamp)
+
+        columns = [self._decode_column(column) for column in payload["values"]]
+
+        readings = []
+        for row, timestamp in enumerate(timestamps):
+            data = {}
+            for position, (module, sensor) in enumerate(channels):
+                value = columns[position][row]
+                if value is not None:
+                    data.setdefault(module, {})[sensor] = value
+            readings.append({"timestamp": timestamp, "data": data})
+
+        return {"units": units, "readings": readings}
+
+    def _decode_column(self, column: dict) -> list:
+        scale = 10 ** column["decimals"]
+        values = []
+        previous = 0
+        for delta in column["deltas"]:
+            if delta is None:
+                values.append(None)
+                continue
+            previous += delta
+            values.append(previous / scale)
+        return values
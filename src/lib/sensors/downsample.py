@@ -0,0 +1,125 @@
+class Downsampler:
+    """
+    Streaming downsampler for a time ordered series of (timestamp, value)
+    records read from a sensor log, reducing it to at most resolution
+    points in a single pass without holding the series in memory.
+    Records with a value of None are skipped.
+    """
+    def __init__(self, resolution: int) -> None:
+        self.resolution = max(1, resolution)
+
+    def buckets(self, records, start: int, end: int):
+        """
+        Generator splitting start to end into equal time buckets and
+        yielding [bucket_start, min, avg, max] for each bucket with values.
+        Only the current bucket's aggregates are held in memory.
+        """
+        width = max(1, (end - start + self.resolution) // self.resolution)
+        bucket = None
+        count = 0
+        total = 0.0
+        minimum = None
+        maximum = None
+
+        for timestamp, value in records:
+            if value is None or timestamp < start or timestamp > end:
+                continue
+            index = (timestamp - start) // width
+            if index != bucket:
+                if count:
+                    yield [start + bucket * width, minimum, round(total / count, 2), maximum]
+                bucket = index
+                count = 0
+                total = 0.0
+                minimum = value
+                maximum = value
+            count += 1
+            total += value
+            if value < minimum:
+                minimum = value
+            if value > maximum:
+                maximum = value
+
+        if count:
+            yield [start + bucket * width, minimum, round(total / count, 2), maximum]
+
+    def lttb(self, records, count: int):
+        """
+        Generator yielding [timestamp, value] points chosen by Largest
+        Triangle Three Buckets from a stream of up to count records, always
+        keeping the first and last points.
+        Points are selected one bucket behind the stream, so only the
+        current bucket's points and the next bucket's points are held.
+        """
+        if self.resolution < 3 or count <= self.resolution:
+            for timestamp, value in records:
+                if value is not None:
+                    yield [timestamp, value]
+            return
+
+        bucket_size = (count - 2) / (self.resolution - 2)
+        last_bucket = self.resolution - 3
+        selected = None
+        pending = None
+        current = []
+        current_bucket = 0
+        following = []
+        following_bucket = 0
+        position = 0
+
+        for timestamp, value in records:
+            if value is None:
+                continue
+            point = (timestamp, value)
+            if selected is None:
+                selected = point
+                yield [timestamp, value]
+                continue
+            if pending is not None:
+                bucket = min(int(position / bucket_size), last_bucket)
+                position += 1
+                if not current or bucket == current_bucket:
+                    current_bucket = bucket
+                    current.append(pending)
+                else:
+                    if following and bucket != following_bucket:
+                        selected = self._select_point(selected, current, self._average(following))
+                        yield [selected[0], selected[1]]
+                        current = following
+                        current_bucket = following_bucket
+                        following = []
+                    following_bucket = bucket
+                    following.append(pending)
+            pending = point
+
+        if pending is None:
+            return
+        if current:
+            selected = self._select_point(selected, current, self._average(following) if following else pending)
+            yield [selected[0], selected[1]]
+        if following:
+            selected = self._select_point(selected, following, pending)
+            yield [selected[0], selected[1]]
+        yield [pending[0], pending[1]]
+
+    def _average(self, points: list) -> tuple:
+        total_time = 0
+        total_value = 0.0
+        for timestamp, value in points:
+            total_time += timestamp
+            total_value += value
+        return (total_time / len(points), total_value / len(points))
+
+    def _select_point(self, previous: tuple, points: list, following: tuple) -> tuple:
+        """
+        Return the point forming the largest triangle with the previously
+        selected point and the following point or bucket average.
+        """
+        best = points[0]
+        best_area = -1.0
+        for point in points:
+            area = abs((previous[0] - following[0]) * (point[1] - previous[1]) - (previous[0] - point[0]) * (following[1] - previous[1]))
+            if area > best_area:
+                best_area = area
+                best = point
+        return best
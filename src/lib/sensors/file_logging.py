@@ -1,27 +1,110 @@
-from lib.ulogging import uLogger
-from os import listdir, mkdir, stat, remove, rename
+from lib.ulogging import get_logger
+from os import listdir, mkdir, remove
 from time import time, localtime
 from json import dumps, loads
 from config import SENSOR_LOG_FILE_MAX_SIZE, SENSOR_LOG_CACHE_ENABLED
+from lib.sensors.ring_log import RingLog
+from lib.sensors.running_stats import RunningStats
+from lib.sensors.downsample import Downsampler
+
+MINUTE_FIELDS = ["value"]
+HOUR_FIELDS = ["avg", "max", "min"]
+QUERY_METHODS = ["buckets", "lttb"]
+# JSON line logs from before the binary ring logs, oldest first
+LEGACY_MINUTE_LOG_FILES = ["minute_log2.txt", "minute_log.txt"]
+LEGACY_HOUR_LOG_FILES = ["hour_log2.txt", "hour_log.txt"]
 
 class FileLogger:
     def __init__(self, init_files: bool = False) -> None:
-        self.log = uLogger("file_logger")
+        self.log = get_logger("file_logger")
         self.enabled = SENSOR_LOG_CACHE_ENABLED
         if init_files is True:
             self.init_file_structure()
         self.last_hour_log_timestamp = None
-        self.minute_log_file = "/data/sensors/minute_log.txt"
-        self.hour_log_file = "/data/sensors/hour_log.txt"
+        self.minute_log_file = "/data/sensors/minute_log.bin"
+        self.hour_log_file = "/data/sensors/hour_log.bin"
+        self.minute_log = RingLog(self.minute_log_file)
+        self.hour_log = RingLog(self.hour_log_file)
+        self.hour_stats = {}
+        self.smib_cache_file = "/data/sensors/smib_cache.txt"
         self.LOG_FILE_MAX_SIZE = SENSOR_LOG_FILE_MAX_SIZE
     
     def init_file_structure(self) -> None:
         self.check_and_create_folder("/", "data")
         self.check_and_create_folder("/data/", "sensors")
-        self.check_and_create_file("/data/sensors/", "minute_log.txt")
-        self.check_and_create_file("/data/sensors/", "minute_log2.txt")
-        self.check_and_create_file("/data/sensors/", "hour_log.txt")
-        self.check_and_create_file("/data/sensors/", "hour_log2.txt")
+
+    def configure_channels(self, channels: list) -> None:
+        """
+        Open the minute and hour ring logs for a list of (module, sensor)
+        channels, recreating them if the configured sensors have changed.
+        """
+        if self.enabled is False:
+            self.log.info("Sensor log cache is disabled, skipping ring log setup")
+            return
+
+        try:
+            self.minute_log.open(channels, MINUTE_FIELDS, self.LOG_FILE_MAX_SIZE)
+            self.hour_log.open(channels, HOUR_FIELDS, self.LOG_FILE_MAX_SIZE)
+        except Exception as e:
+            self.log.error(f"Failed to open sensor ring logs: {e}")
+            return
+
+        self.migrate_legacy_logs("/data/sensors/")
+
+    def migrate_legacy_logs(self, path: str) -> None:
+        """
+        Import the JSON line minute and hour logs replaced by the binary ring
+        logs into the open ring logs, then remove them to free up flash.
+        Path should be a string with a closing slash.
+        """
+        try:
+            existing_files = listdir(path[0:-1])
+        except Exception as e:
+            self.log.error(f"Failed to list {path}: {e}")
+            return
+
+        self.migrate_legacy_log(path, [file for file in LEGACY_MINUTE_LOG_FILES if file in existing_files], self.minute_log)
+        self.migrate_legacy_log(path, [file for file in LEGACY_HOUR_LOG_FILES if file in existing_files], self.hour_log)
+
+    def migrate_legacy_log(self, path: str, files: list, ring_log: RingLog) -> None:
+        """
+        Append the entries of legacy log files, oldest file first, to a ring
+        log. The files are only removed once every line has been read, so a
+        failed import is retried on the next boot.
+        """
+        if not files:
+            return
+
+        if not ring_log.channels:
+            self.log.error(f"Ring log {ring_log.path} is not open, keeping legacy log files {files}")
+            return
+
+        imported = 0
+        skipped = 0
+        try:
+            for file in files:
+                self.log.info(f"Importing legacy log file {path + file} into {ring_log.path}")
+                with open(path + file, "r") as f:
+                    for line in f:
+                        try:
+                            entry = loads(line)
+                            timestamp = entry["timestamp"]
+                            values = self.channel_values(ring_log, entry["data"])
+                        except (ValueError, KeyError, TypeError, AttributeError):
+                            skipped += 1
+                            continue
+                        if ring_log.append(timestamp, values):
+                            imported += 1
+        except Exception as e:
+            self.log.error(f"Failed to import legacy log files {files}: {e}")
+            return
+
+        self.log.info(f"Imported {imported} legacy log entries into {ring_log.path}, skipped {skipped} unreadable lines")
+        for file in files:
+            try:
+                remove(path + file)
+            except Exception as e:
+                self.log.error(f"Failed to remove legacy log file {path + file}: {e}")
     
     def check_and_create_folder(self, path: str, folder: str) -> bool:
         """
@@ -91,64 +174,35 @@ class FileLogger:
             self.log.info("smib_cache.txt does not exist in /data/")
             return False
         
-    def read_smib_cache_list(self) -> list:
-        """
-        Read the smib_cache.txt file and return its contents as a list.
-        """
-        self.log.info("Reading smib_cache.txt")
-        try:
-            with open("/data/sensors/smib_cache.txt", "r") as f:
-                data = f.readlines()
-            self.log.info(f"Read {len(data)} lines from smib_cache.txt")
-            return [loads(line) for line in data]
-        except Exception as e:
-            self.log.error(f"Failed to read smib_cache.txt: {e}")
-            return []
-        
-    def write_smib_cache_list(self, data: list) -> None:
-        """
-        Write a list of sensor readings to the smib_cache.txt file.
-        """
-        self.log.info("Writing to smib_cache.txt")
-        try:
-            with open("/data/sensors/smib_cache.txt", "w") as f:
-                for entry in data:
-                    f.write(dumps(entry) + "\n")
-            self.log.info(f"Wrote {len(data)} entries to smib_cache.txt")
-        except Exception as e:
-            self.log.error(f"Failed to write to smib_cache.txt: {e}")
-
     def delete_smib_cache(self) -> None:
         """
         Delete the smib_cache.txt file.
         """
         self.log.info("Deleting smib_cache.txt")
         try:
-            remove("/data/sensors/smib_cache.txt")
+            remove(self.smib_cache_file)
             self.log.info("smib_cache.txt deleted")
         except Exception as e:
             self.log.error(f"Failed to delete smib_cache.txt: {e}")
     
     def log_minute_entry(self, data: dict) -> None:
         """
-        Add a unixtime and tuple timestamp to the provided minute log entries in and append to the minute_log.txt file.
+        Append the provided minute readings to the minute ring log with a
+        unix timestamp.
         """
         if self.check_for_minute_log_issues(data):
             self.log.info("Minute log entry issues detected, skipping logging")
             return
                 
-        self.log.info(f"Logging minute entry {data}")
-
-        self.check_for_log_rotate(self.minute_log_file)
-
-        entry = self.create_minute_timestamped_entry(data)
+        self.log.info("Logging minute entry %s", data)
 
         try:
-            with open("/data/sensors/minute_log.txt", "a") as f:
-                f.write(entry)
-            self.log.info(f"Minute entry logged {entry}")
+            self.minute_log.append(time(), self.channel_values(self.minute_log, data))
+            self.log.info("Minute entry logged")
         except Exception as e:
             self.log.error(f"Failed to log minute entry: {e}")
+
+        self.update_hour_stats(data)
         
         if self.is_it_time_to_generate_hour_log():
             try:
@@ -173,19 +227,53 @@ class FileLogger:
         if len(data) == 0:
             self.log.info("No data to log for minute entry")
             return True
+
+        if not self.minute_log.channels:
+            self.log.error("Minute log has no channels configured")
+            return True
         
         return False
-    
-    def create_minute_timestamped_entry(self, data: dict) -> str:
-        """
-        Create a timestamped entry for the minute log file.
-        """
-        timestamp = time()
-        human_timestamp = self.localtime_to_iso8601(localtime(timestamp))
-        entry = dumps({"timestamp": timestamp, "human_timestamp": human_timestamp, "data": data}) + "\n"
-        self.log.info(f"Minute entry: {entry}")
 
-        return entry
+    def channel_values(self, ring_log: RingLog, data: dict) -> list:
+        """
+        Flatten a {module: {sensor: value}} dictionary, or {module: {sensor:
+        {field: value}}} for multi field logs, into ring log schema order with
+        None for missing values.
+        """
+        values = []
+        single_field = len(ring_log.fields) == 1
+        for module, sensor in ring_log.channels:
+            value = data.get(module, {}).get(sensor)
+            if single_field:
+                values.append(value)
+            else:
+                for field in ring_log.fields:
+                    values.append(value.get(field) if value else None)
+        return values
+
+    def create_timestamped_entry(self, ring_log: RingLog, timestamp: int, values: tuple) -> dict:
+        """
+        Create a log entry dictionary from a ring log record in the same
+        shape as the readings pushed to SMIB.
+        """
+        data = {}
+        field_count = len(ring_log.fields)
+        index = 0
+        for module, sensor in ring_log.channels:
+            if field_count == 1:
+                value = values[index]
+                if value is not None:
+                    data.setdefault(module, {})[sensor] = round(value, 2)
+            else:
+                fields = {}
+                for offset, field in enumerate(ring_log.fields):
+                    if values[index + offset] is not None:
+                        fields[field] = round(values[index + offset], 2)
+                if fields:
+                    data.setdefault(module, {})[sensor] = fields
+            index += field_count
+
+        return {"timestamp": timestamp, "human_timestamp": self.localtime_to_iso8601(localtime(timestamp)), "data": data}
     
     def is_it_time_to_generate_hour_log(self) -> bool:
         """
@@ -199,65 +287,58 @@ class FileLogger:
         if time() > self.last_hour_log_timestamp + 3600:
             self.log.info("It's time to generate the hour log")
             self.last_hour_log_timestamp = time()
-            self.log.info(f"Last hour log timestamp updated to {self.last_hour_log_timestamp}")
+            self.log.info("Last hour log timestamp updated to %s", self.last_hour_log_timestamp)
             return True
         else:
             seconds_since_last_hour_log = time() - self.last_hour_log_timestamp
-            self.log.info(f"Seconds since last hour log: {seconds_since_last_hour_log}")
+            self.log.info("Seconds since last hour log: %s", seconds_since_last_hour_log)
             return False
     
+    def update_hour_stats(self, data: dict) -> None:
+        """
+        Add minute readings to the running aggregates for the current hour.
+        """
+        for module, sensors in data.items():
+            for sensor, value in sensors.items():
+                if value is None:
+                    continue
+                key = (module, sensor)
+                stats = self.hour_stats.get(key)
+                if stats is None:
+                    stats = RunningStats()
+                    self.hour_stats[key] = stats
+                stats.add(value)
+
+    def summarise_hour_stats(self) -> dict:
+        """
+        Return min, max and average values for each sensor from the running
+        aggregates in the same format as process_hour_data_values.
+        """
+        processed_data = {}
+        for (module, sensor), stats in self.hour_stats.items():
+            summary = stats.summary()
+            if summary is not None:
+                processed_data.setdefault(module, {})[sensor] = summary
+
+        return processed_data
+
     def process_hour_log(self) -> None:
         """
-        Create min, max and average values for each sensor in the minute log and append to the hour log.
-        Truncate the minute log to last 60 minutes.
+        Append the min, max and average values for each sensor over the last
+        hour to the hour log and start aggregating the next hour.
         """
-        
-        minute_log: list = self.get_specific_log(self.minute_log_file)
-        
-        new_minute_log, hour_data = self.process_minute_log(minute_log)
-        self.log.info(f"New minute log: {new_minute_log}")
-        self.log.info(f"Hour data: {hour_data}")
+        hour_log_data = self.summarise_hour_stats()
+        self.log.info("Hour log data: %s", hour_log_data)
 
-        hour_log_data = self.process_hour_data_values(hour_data)
-        self.log.info(f"Hour log data: {hour_log_data}")
+        for stats in self.hour_stats.values():
+            stats.reset()
 
-        hour_log = {"timestamp": time(), "human_timestamp": self.localtime_to_iso8601(localtime(time())), "data": hour_log_data}
-        
-        self.write_out_logs(new_minute_log, hour_log)
-    
-    def process_minute_log(self, minute_log: list) -> tuple[list, dict]:
-        """
-        Process the minute log to return lists of results by sensor and return
-        a truncated minute log to the last 60 minutes.
-        """
-        new_minute_log = []
-        hour_data = {}
-
-        try: 
-            for minute in minute_log:
-                if minute["timestamp"] > time() - 3600:
-                    new_minute_log.append(minute)
-                for module, data in minute["data"].items():
-                    if module not in hour_data:
-                        hour_data[module] = {}
-                    self.log.info(f"Module: {module}")
-                    self.log.info(f"Data: {data}")
-                    for sensor, value in data.items():
-                        if sensor not in hour_data[module]:
-                            hour_data[module][sensor] = []
-                        self.log.info(f"Sensor: {sensor}")
-                        self.log.info(f"Value: {value}")
-                        hour_data[module][sensor].append(value)
-        
-        except Exception as e:
-            self.log.error(f"Failed to process minute log: {e}")
-            return minute_log, {}
-        
-        return new_minute_log, hour_data
+        self.hour_log.append(time(), self.channel_values(self.hour_log, hour_log_data))
     
     def process_hour_data_values(self, data: dict) -> dict:
         """
-        Process the min, max and average values for each sensor in the hour log.
+        Process the min, max and average values for lists of values for each
+        sensor in the hour log format.
         """
         processed_data = {}
 
@@ -271,86 +352,131 @@ class FileLogger:
 
         return processed_data
     
-    def write_out_logs(self, new_minute_log: list, hour_log: dict) -> None:
+    def get_log(self, log_type: str) -> list:
         """
-        Write out the hour log rotating as necessary.
-        Write out the new minute log.
+        Return the requested log as a list of entries.
         """
-        try:
-            with open("/data/sensors/hour_log.txt", "a") as f:
-                f.write(dumps(hour_log) + "\n")
-            
-            self.check_for_log_rotate(self.hour_log_file)
-            
-            with open("/data/sensors/minute_log.txt", "w") as f:
-                f.write("")
-            with open("/data/sensors/minute_log.txt", "a") as f:
-                for entry in new_minute_log:
-                    f.write(dumps(entry) + "\n")
+        return list(self.iter_log(log_type))
 
-        except Exception as e:
-            self.log.error(f"Failed to write out logs: {e}")
-            self.check_for_log_rotate(self.hour_log_file)
-            self.check_for_log_rotate(self.minute_log_file)
-    
-    def get_log(self, log_type: str) -> list:
+    def iter_log(self, log_type: str):
         """
-        Return the requested log as a JSON string.
+        Generator yielding the last hour of the minute log or the whole hour
+        log one entry at a time, reading a single record into memory at once.
         """
         if self.enabled is False:
             self.log.info("Sensor log cache is disabled - No log data to return")
-            return ["Sensor log cache is disabled"]
+            yield "Sensor log cache is disabled"
+            return
 
         if log_type == "minute":
-            return self.get_specific_log(self.minute_log_file)
+            ring_log = self.minute_log
+            start = time() - 3600
         elif log_type == "hour":
-            return self.get_specific_log(self.hour_log_file)
+            ring_log = self.hour_log
+            start = None
         else:
-            return ["Invalid log type"]
-    
-    def get_specific_log(self, log_file: str) -> list[dict]:
+            yield "Invalid log type"
+            return
+
+        if not ring_log.channels and not ring_log.load():
+            self.log.error(f"Failed to load {log_type} log")
+            return
+
+        for timestamp, values in ring_log.read(start):
+            yield self.create_timestamped_entry(ring_log, timestamp, values)
+
+    def iter_log_json(self, log_type: str):
         """
-        Return the requested log file (fullly qualified path) as a list of dictionaries.
+        Generator yielding the requested log as chunks of a JSON array for a
+        chunked HTTP response.
         """
-        self.log.info(f"Getting log file contents: {log_file}")
+        yield "["
+        separator = ""
         try:
-            data = []
-            with open(log_file, "r") as f:
-                for line in f:
-                    self.log.info(f"Log line: {line}")
-                    data.append(loads(line))
-            second_log_file = log_file.replace(".txt", "2.txt")
-            with open(second_log_file, "r") as f:
-                for line in f:
-                    self.log.info(f"Second log line: {line}")
-                    data.append(loads(line))
-            self.log.info(f"Log data: {data}")
-            return data
-
+            for entry in self.iter_log(log_type):
+                yield separator + dumps(entry)
+                separator = ","
         except Exception as e:
-            self.log.error(f"Failed to get {log_file} log: {e}")
-            return [{}]
-    
-    def check_for_log_rotate(self, log_file: str) -> None:
-        try:
-            log_file_size = stat(log_file)[6]
-            if log_file_size > self.LOG_FILE_MAX_SIZE:
-                new_log_file = log_file.replace(".txt", "2.txt")
-                self.rotate_file(log_file, new_log_file)
-        
-        except Exception as e:
-            self.log.error(f"Failed to check for and execute log rotation: {e}")
+            self.log.error(f"Failed to read {log_type} log: {e}")
+        yield "]"
 
-    def rotate_file(self, log_file: str, new_log_file: str) -> None:
-        try:
-            self.log.info(f"Rotating {log_file} to {new_log_file}")
-            remove(new_log_file)
-        except OSError:
-            print(f"{new_log_file} did not exist to be deleted.")
-        
+    def iter_channel(self, ring_log: RingLog, module: str, sensor: str, start: int | None, end: int | None):
+        """
+        Generator yielding (timestamp, value) for a single channel of a ring
+        log between start and end, using the avg field of multi field logs.
+        """
+        position = ring_log.channels.index((module, sensor)) * len(ring_log.fields)
+        if "avg" in ring_log.fields:
+            position += ring_log.fields.index("avg")
+        for timestamp, values in ring_log.read(start, end):
+            yield timestamp, values[position]
+
+    def query(self, log_type: str, module: str, sensor: str, start: int | None = None, end: int | None = None, resolution: int = 100, method: str = "buckets"):
+        """
+        Return a generator of a downsampled series for one sensor from the
+        minute or hour log, computed in a single streaming pass.
+        The buckets method yields [timestamp, min, avg, max] per equal time
+        bucket and lttb yields [timestamp, value] points chosen by Largest
+        Triangle Three Buckets. Start defaults to the oldest record and end to
+        the newest. Raises ValueError for an unknown log type, method or
+        channel before any records are read.
+        """
+        if log_type == "minute":
+            ring_log = self.minute_log
+        elif log_type == "hour":
+            ring_log = self.hour_log
+        else:
+            raise ValueError(f"Invalid log type: {log_type}")
+
+        if method not in QUERY_METHODS:
+            raise ValueError(f"Invalid method: {method}")
+
+        if self.enabled is False:
+            raise ValueError("Sensor log cache is disabled")
+
+        if not ring_log.channels and not ring_log.load():
+            raise ValueError(f"Failed to load {log_type} log")
+
+        if (module, sensor) not in ring_log.channels:
+            raise ValueError(f"No {log_type} log for {module} {sensor}")
+
+        return self._query_points(ring_log, module, sensor, start, end, Downsampler(resolution), method)
+
+    def _query_points(self, ring_log: RingLog, module: str, sensor: str, start: int | None, end: int | None, downsampler: Downsampler, method: str):
+        time_range = ring_log.time_range()
+        if time_range is None:
+            return
+        start = time_range[0] if start is None else start
+        end = time_range[1] if end is None else end
+        if start > end:
+            return
+
+        records = self.iter_channel(ring_log, module, sensor, start, end)
+        if method == "lttb":
+            points = downsampler.lttb(records, ring_log.count_range(start, end))
+        else:
+            points = downsampler.buckets(records, start, end)
+
+        for point in points:
+            yield [point[0]] + [round(value, 2) for value in point[1:]]
+
+    def query_json(self, log_type: str, module: str, sensor: str, start: int | None = None, end: int | None = None, resolution: int = 100, method: str = "buckets"):
+        """
+        Return a generator of a downsampled sensor series as chunks of a JSON
+        object for a chunked HTTP response. Raises ValueError as query does.
+        """
+        points = self.query(log_type, module, sensor, start, end, resolution, method)
+        fields = ["timestamp", "min", "avg", "max"] if method == "buckets" else ["timestamp", "value"]
+        header = {"module": module, "sensor": sensor, "log": log_type, "method": method, "fields": fields}
+        return self._query_json_chunks(header, points)
+
+    def _query_json_chunks(self, header: dict, points):
+        yield dumps(header)[0:-1] + ', "points": ['
+        separator = ""
         try:
-            rename(log_file, new_log_file)
-            with open(log_file, "w") as f:
-                f.write("")
+            for point in points:
+                yield separator + dumps(point)
+                separator = ","
         except Exception as e:
-            self.log.error(f"Failed to rotate {log_file} to {new_log_file}: {e}")
+            self.log.error(f"Failed to query {header['log']} log: {e}")
+        yield "]}"
@@ -0,0 +1,240 @@
+from lib.ulogging import get_logger
+from struct import pack, pack_into, unpack, unpack_from, calcsize
+from json import dumps, loads
+from os import stat
+
+MAGIC = b"SRLG"
+VERSION = 1
+HEADER_FORMAT = "<4sBBHIII"
+HEADER_SIZE = calcsize(HEADER_FORMAT)
+POSITION_OFFSET = 12
+POSITION_FORMAT = "<II"
+SCHEMA_LENGTH_FORMAT = "<H"
+TIMESTAMP_FORMAT = "<I"
+TIMESTAMP_SIZE = calcsize(TIMESTAMP_FORMAT)
+NAN = float("nan")
+CREATE_BLOCK_SIZE = 512
+
+class RingLog:
+    """
+    Fixed record binary ring buffer on flash for timestamped sensor values.
+    The file holds a header (magic, version, field count, record size,
+    capacity, head and count), a JSON schema listing the [module, sensor]
+    channel names and value fields, then capacity fixed size records.
+    Each record is a little endian uint32 unix timestamp followed by one
+    float32 per channel per field, with NaN marking a missing value.
+    Appending writes one record and the head and count in place, so the
+    file never grows past its initial size or needs renaming, and memory
+    use is constant. Record n is found by offset arithmetic, so time range
+    reads binary search timestamps with a handful of small reads rather
+    than parsing the whole log. The search needs timestamps in order, so a
+    record timestamped before the newest record, such as one logged before
+    NTP has set the RTC after a reboot, is dropped rather than stored.
+    """
+    def __init__(self, path: str) -> None:
+        self.log = get_logger("RingLog")
+        self.path = path
+        self.channels = []
+        self.fields = []
+        self.capacity = 0
+        self.head = 0
+        self.count = 0
+        self.record_size = 0
+        self.data_offset = 0
+        self.value_count = 0
+        self.record_format = ""
+        self._record = bytearray(0)
+        self.newest_timestamp = None
+
+    def _set_layout(self, channels: list, fields: list, schema_length: int) -> None:
+        self.channels = channels
+        self.fields = fields
+        self.value_count = len(channels) * len(fields)
+        self.record_format = "<I" + "f" * self.value_count
+        self.record_size = calcsize(self.record_format)
+        self.data_offset = HEADER_SIZE + calcsize(SCHEMA_LENGTH_FORMAT) + schema_length
+        self._record = bytearray(self.record_size)
+
+    def load(self) -> bool:
+        """
+        Read the header and schema from an existing log file. Return False
+        if the file is missing or not a valid ring log.
+        """
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(HEADER_SIZE)
+                magic, version, field_count, record_size, capacity, head, count = unpack(HEADER_FORMAT, header)
+                if magic != MAGIC or version != VERSION:
+                    self.log.warn(f"{self.path} is not a version {VERSION} ring log")
+                    return False
+                schema_length = unpack(SCHEMA_LENGTH_FORMAT, f.read(calcsize(SCHEMA_LENGTH_FORMAT)))[0]
+                schema = loads(f.read(schema_length).decode())
+        except Exception as e:
+            self.log.info(f"Unable to load ring log {self.path}: {e}")
+            return False
+
+        channels = [tuple(channel) for channel in schema["channels"]]
+        self._set_layout(channels, schema["fields"], schema_length)
+        if self.record_size != record_size or len(self.fields) != field_count:
+            self.log.warn(f"{self.path} header does not match its schema")
+            return False
+        self.capacity = capacity
+        self.head = head
+        self.count = count
+        self.newest_timestamp = None
+        return True
+
+    def create(self, channels: list, fields: list, max_size: int) -> None:
+        """
+        Create a new empty log file for the given [module, sensor] channels
+        and value fields, sized to hold as many records as fit in max_size
+        bytes.
+        """
+        schema = dumps({"channels": [list(channel) for channel in channels], "fields": list(fields)}).encode()
+        self._set_layout([tuple(channel) for channel in channels], list(fields), len(schema))
+        self.capacity = self._capacity_for(max_size)
+        self.head = 0
+        self.count = 0
+        self.newest_timestamp = None
+        self.log.info(f"Creating ring log {self.path} with capacity for {self.capacity} records of {self.record_size} bytes")
+
+        with open(self.path, "wb") as f:
+            f.write(pack(HEADER_FORMAT, MAGIC, VERSION, len(self.fields), self.record_size, self.capacity, self.head, self.count))
+            f.write(pack(SCHEMA_LENGTH_FORMAT, len(schema)))
+            f.write(schema)
+            empty = bytearray(CREATE_BLOCK_SIZE)
+            remaining = self.capacity * self.record_size
+            while remaining > 0:
+                length = min(remaining, CREATE_BLOCK_SIZE)
+                f.write(empty if length == CREATE_BLOCK_SIZE else memoryview(empty)[0:length])
+                remaining -= length
+
+    def open(self, channels: list, fields: list, max_size: int) -> None:
+        """
+        Load the existing log file, or create a new one if it is missing or
+        its schema or size no longer match.
+        """
+        channels = [tuple(channel) for channel in channels]
+        if self.load():
+            expected_size = self.data_offset + self.capacity * self.record_size
+            same_schema = self.channels == channels and self.fields == list(fields)
+            if same_schema and self.capacity == self._capacity_for(max_size) and self._file_size() == expected_size:
+                self.log.info(f"Loaded ring log {self.path} with {self.count} records")
+                return
+            self.log.warn(f"Ring log {self.path} schema or size changed, recreating")
+        self.create(channels, fields, max_size)
+
+    def _capacity_for(self, max_size: int) -> int:
+        return max(1, (max_size - self.data_offset) // self.record_size)
+
+    def _file_size(self) -> int:
+        try:
+            return stat(self.path)[6]
+        except OSError:
+            return 0
+
+    def append(self, timestamp: int, values: list) -> bool:
+        """
+        Append a record overwriting the oldest once the log is full. Values
+        are given in schema order with None for missing values. Return False
+        if the record was dropped for being older than the newest record.
+        """
+        if len(values) != self.value_count:
+            raise ValueError(f"Expected {self.value_count} values, got {len(values)}")
+
+        timestamp = int(timestamp)
+        if self.newest_timestamp is None and self.count:
+            self.newest_timestamp = self.time_range()[1]
+        if self.newest_timestamp is not None and timestamp < self.newest_timestamp:
+            self.log.warn(f"Ring log {self.path} timestamp {timestamp} is before the newest record {self.newest_timestamp}, dropping record")
+            return False
+        self.newest_timestamp = timestamp
+
+        pack_into(TIMESTAMP_FORMAT, self._record, 0, timestamp)
+        offset = TIMESTAMP_SIZE
+        for value in values:
+            pack_into("<f", self._record, offset, NAN if value is None else value)
+            offset += 4
+
+        with open(self.path, "r+b") as f:
+            f.seek(self.data_offset + self.head * self.record_size)
+            f.write(self._record)
+            self.head = (self.head + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+            f.seek(POSITION_OFFSET)
+            f.write(pack(POSITION_FORMAT, self.head, self.count))
+        return True
+
+    def _record_offset(self, oldest: int, index: int) -> int:
+        """
+        Return the file offset of the record at logical index, counting from
+        the oldest record slot.
+        """
+        return self.data_offset + ((oldest + index) % self.capacity) * self.record_size
+
+    def _read_timestamp(self, f, oldest: int, index: int) -> int:
+        f.seek(self._record_offset(oldest, index))
+        return unpack(TIMESTAMP_FORMAT, f.read(TIMESTAMP_SIZE))[0]
+
+    def _find_index(self, f, oldest: int, count: int, timestamp: int) -> int:
+        """
+        Return the logical index of the first record at or after timestamp.
+        """
+        low = 0
+        high = count
+        while low < high:
+            middle = (low + high) // 2
+            if self._read_timestamp(f, oldest, middle) < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def time_range(self) -> tuple | None:
+        """
+        Return the (oldest, newest) record timestamps, or None if the log is
+        empty.
+        """
+        if self.count == 0:
+            return None
+        oldest = (self.head - self.count) % self.capacity
+        with open(self.path, "rb") as f:
+            return self._read_timestamp(f, oldest, 0), self._read_timestamp(f, oldest, self.count - 1)
+
+    def count_range(self, start: int | None = None, end: int | None = None) -> int:
+        """
+        Return the number of records with start <= timestamp <= end, found
+        by binary search without reading the records.
+        """
+        count = self.count
+        if count == 0:
+            return 0
+        oldest = (self.head - count) % self.capacity
+        with open(self.path, "rb") as f:
+            first = 0 if start is None else self._find_index(f, oldest, count, start)
+            last = count if end is None else self._find_index(f, oldest, count, end + 1)
+        return max(0, last - first)
+
+    def read(self, start: int | None = None, end: int | None = None):
+        """
+        Generator yielding (timestamp, values) tuples oldest first for records
+        with start <= timestamp <= end. Missing values are returned as None.
+        """
+        count = self.count
+        if count == 0:
+            return
+        oldest = (self.head - count) % self.capacity
+        buffer = bytearray(self.record_size)
+
+        with open(self.path, "rb") as f:
+            index = 0 if start is None else self._find_index(f, oldest, count, start)
+            while index < count:
+                f.seek(self._record_offset(oldest, index))
+                f.readinto(buffer)
+                record = unpack_from(self.record_format, buffer)
+                timestamp = record[0]
+                if end is not None and timestamp > end:
+                    return
+                yield timestamp, tuple(None if value != value else value for value in record[1:])
+                index += 1
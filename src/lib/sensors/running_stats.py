@@ -0,0 +1,49 @@
+class RunningStats:
+    """
+    Online aggregate of a stream of values, keeping count, sum, min, max and
+    Welford running mean and variance in constant memory.
+    """
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Clear all aggregates ready for a new period.
+        """
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """
+        Add a value to the aggregates.
+        """
+        self.count += 1
+        self.total += value
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def variance(self) -> float | None:
+        """
+        Return the sample variance, or None with fewer than two values.
+        """
+        if self.count < 2:
+            return None
+        return self._m2 / (self.count - 1)
+
+    def summary(self) -> dict | None:
+        """
+        Return the average (rounded to 2 decimal places), max and min in the
+        hour log format, or None if no values have been added.
+        """
+        if self.count == 0:
+            return None
+        return {"avg": round(self.total / self.count, 2), "max": self.maximum, "min": self.minimum}
@@ -0,0 +1,84 @@
+class SensorSchema:
+    """
+    Fixed description of the configured sensor channels, built once after
+    the sensor modules are configured.
+    Holds the ordered (module, sensor) channel list with a channel index,
+    the units and sensor name tables and each module's slice of the
+    channel list, so readings can be kept as a flat list of values in
+    channel order and only turned into nested dictionaries when JSON is
+    needed.
+    """
+    def __init__(self, modules: dict) -> None:
+        self.modules = []
+        self.channels = []
+        self.index = {}
+        self.units = {}
+        self.sensor_names = {}
+        self.module_slices = {}
+
+        for module, instance in modules.items():
+            start = len(self.channels)
+            self.modules.append(module)
+            self.units[module] = {}
+            self.sensor_names[module] = []
+            for sensor in instance.get_sensors():
+                name = sensor["name"]
+                self.index[(module, name)] = len(self.channels)
+                self.channels.append((module, name))
+                self.units[module][name] = sensor["unit"]
+                self.sensor_names[module].append(name)
+            self.module_slices[module] = (start, len(self.channels))
+
+    def new_values(self) -> list:
+        """
+        Return a list of None values, one per channel.
+        """
+        return [None] * len(self.channels)
+
+    def set_module_values(self, values: list, module: str, reading: dict) -> int:
+        """
+        Copy a module's {sensor: value} reading into its slice of a values
+        list, setting None for sensors missing from the reading. Return the
+        number of sensors with a value.
+        """
+        start, end = self.module_slices[module]
+        names = self.sensor_names[module]
+        count = 0
+        for position in range(start, end):
+            value = reading.get(names[position - start])
+            values[position] = value
+            if value is not None:
+                count += 1
+        return count
+
+    def to_dict(self, values, module: str = "") -> dict:
+        """
+        Return {module: {sensor: value}} for a values list, omitting None
+        values and modules without values, for one module or all modules if
+        none specified.
+        """
+        readings = {}
+        for name in ([module] if module else self.modules):
+            if name not in self.module_slices:
+                continue
+            start, end = self.module_slices[name]
+            sensors = {}
+            for position in range(start, end):
+                if values[position] is not None:
+                    sensors[self.channels[position][1]] = values[position]
+            if sensors:
+                readings[name] = sensors
+        return readings
+
+    def from_dict(self, readings: dict) -> list:
+        """
+        Return a values list in channel order from {module: {sensor: value}}
+        readings, ignoring channels not in the schema.
+        """
+        values = self.new_values()
+        for module, sensors in readings.items():
+            for sensor, value in sensors.items():
+                position = self.index.get((module, sensor))
+                if position is not None:
+                    values[position] = value
+        return values
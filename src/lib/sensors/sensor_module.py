@@ -1,21 +1,30 @@
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 
 class SensorModule:
     """
     Base class for sensor modules.
     """
-    def __init__(self, sensors: list) -> None:
-        self.log = uLogger("SensorModule")
+    def __init__(self, sensors: list, poll_interval_s: int = 60) -> None:
+        self.log = get_logger("SensorModule")
         self.sensors = sensors
-    
+        self.poll_interval_s = poll_interval_s
+
     def get_sensors(self) -> list:
         """
         Return list of sensors for a specific module.
         """
         return self.sensors
-    
+
     def get_reading(self) -> dict[str, float]:
         """
         Return a dictionary of sensor name and value pairs
         """
-        raise NotImplementedError("Subclasses must implement this method")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement this method")
+
+    async def async_get_reading(self) -> dict[str, float]:
+        """
+        Asynchronously return a dictionary of sensor name and value pairs.
+        Drivers that wait on conversions should override this to await
+        instead of blocking the event loop.
+        """
+        return self.get_reading()
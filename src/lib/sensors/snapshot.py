@@ -0,0 +1,83 @@
+from time import time, ticks_ms, ticks_diff
+
+try:
+    from typing import TYPE_CHECKING
+except ImportError:
+    TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from lib.sensors.schema import SensorSchema
+
+class ReadingsSnapshot:
+    """
+    Immutable snapshot of the latest readings from all sensor modules, held
+    as a tuple of values in schema channel order, with the unix timestamp
+    and tick count of when it was taken.
+    A new snapshot replaces the old one on every update, so consumers can
+    hold a reference without it changing underneath them. The readings
+    dictionary is only built the first time it is needed and should be
+    treated as read only.
+    """
+    def __init__(self, schema: 'SensorSchema | None' = None, values: list | None = None, timestamp: int | None = None, ticks: int | None = None) -> None:
+        self._schema = schema
+        self._values = tuple(values) if values else ()
+        self._readings = None if values else {}
+        self._timestamp = timestamp
+        self._ticks = ticks
+
+    @classmethod
+    def capture(cls, schema: 'SensorSchema', values: list) -> "ReadingsSnapshot":
+        """
+        Create a snapshot of a values list stamped with the current time.
+        """
+        return cls(schema, values, time(), ticks_ms())
+
+    @property
+    def values(self) -> tuple:
+        return self._values
+
+    @property
+    def readings(self) -> dict:
+        if self._readings is None:
+            self._readings = self._schema.to_dict(self._values)
+        return self._readings
+
+    @property
+    def timestamp(self) -> int | None:
+        return self._timestamp
+
+    def get_value(self, module: str, sensor: str) -> float | None:
+        """
+        Return a single sensor value without building the readings
+        dictionary, or None if there is no value.
+        """
+        if self._schema is None:
+            return None
+        position = self._schema.index.get((module, sensor))
+        if position is None:
+            return None
+        return self._values[position]
+
+    def get_readings(self, module: str = "") -> dict:
+        """
+        Return readings for a specific module name, or all modules if none
+        specified.
+        """
+        readings = self.readings
+        if not module:
+            return readings
+        if module in readings:
+            return {module: readings[module]}
+        return {}
+
+    def age_s(self) -> float | None:
+        """
+        Return the age of the snapshot in seconds, or None if no readings
+        have been taken yet.
+        """
+        if self._ticks is None:
+            return None
+        return ticks_diff(ticks_ms(), self._ticks) / 1000
+
+    def is_empty(self) -> bool:
+        return len(self.readings) == 0
@@ -0,0 +1,206 @@
+from lib.ulogging import get_logger
+from os import listdir, mkdir, remove, rename, stat
+from json import dumps, loads
+
+SEGMENT_SUFFIX = ".seg"
+CURSOR_FILE = "cursor.json"
+CURSOR_TEMP_FILE = "cursor.tmp"
+
+class UploadQueue:
+    """
+    Durable append only queue of timestamped readings waiting to be pushed
+    to SMIB, stored as JSON lines in numbered segment files.
+    A cursor file records the segment and byte offset of the first entry
+    not yet acknowledged by the server. It is committed by writing a temp
+    file and renaming it over the old cursor, so a crash part way through
+    a push resends at most one batch and never loses or rewrites entries.
+    Fully acknowledged segments are deleted, and the oldest segments are
+    dropped if the queue grows past its size budget during a long outage.
+    """
+    def __init__(self, path: str, max_size: int) -> None:
+        self.log = get_logger("UploadQueue")
+        self.path = path
+        self.max_size = max_size
+        self.segment_size = max(1024, max_size // 8)
+        self.segments = []
+        self.segment_sizes = {}
+        self.cursor_segment = 0
+        self.cursor_offset = 0
+
+    def init(self) -> None:
+        """
+        Create the queue folder if needed and load the segments and cursor.
+        """
+        parent, folder = self.path[0:-1].rsplit("/", 1)
+        if folder not in listdir(parent or "/"):
+            mkdir(self.path[0:-1])
+
+        for file in listdir(self.path[0:-1]):
+            if file.endswith(SEGMENT_SUFFIX):
+                segment = int(file[0:-len(SEGMENT_SUFFIX)])
+                self.segments.append(segment)
+                self.segment_sizes[segment] = stat(self._segment_file(segment))[6]
+        self.segments.sort()
+
+        self._load_cursor()
+        self._terminate_partial_line()
+        self.log.info(f"Upload queue loaded with {len(self.segments)} segments, {self.size()} bytes")
+
+    def _segment_file(self, segment: int) -> str:
+        return f"{self.path}{segment:08d}{SEGMENT_SUFFIX}"
+
+    def _load_cursor(self) -> None:
+        try:
+            with open(self.path + CURSOR_FILE, "r") as f:
+                cursor = loads(f.read())
+            self.cursor_segment = cursor["segment"]
+            self.cursor_offset = cursor["offset"]
+        except Exception as e:
+            self.log.info(f"No valid upload queue cursor, starting from oldest segment: {e}")
+            self.cursor_segment = self.segments[0] if self.segments else 0
+            self.cursor_offset = 0
+
+        for segment in [segment for segment in self.segments if segment < self.cursor_segment]:
+            self._remove_segment(segment)
+
+        if self.cursor_segment not in self.segment_sizes and (self.cursor_offset or self.segments):
+            self._commit_cursor(self.segments[0] if self.segments else self.cursor_segment, 0)
+
+    def _terminate_partial_line(self) -> None:
+        """
+        Terminate a line left incomplete by a reset mid write so the next
+        entry starts on its own line.
+        """
+        if not self.segments or self.segment_sizes[self.segments[-1]] == 0:
+            return
+        segment = self.segments[-1]
+        with open(self._segment_file(segment), "rb") as f:
+            f.seek(self.segment_sizes[segment] - 1)
+            last_byte = f.read(1)
+        if last_byte != b"\n":
+            self.log.warn(f"Terminating partial entry in upload queue segment {segment}")
+            self._write(segment, b"\n")
+
+    def _write(self, segment: int, data: bytes) -> None:
+        with open(self._segment_file(segment), "ab") as f:
+            f.write(data)
+        self.segment_sizes[segment] = self.segment_sizes.get(segment, 0) + len(data)
+
+    def size(self) -> int:
+        """
+        Return the total bytes held in queue segments.
+        """
+        return sum(self.segment_sizes.values())
+
+    def pending(self) -> bool:
+        """
+        Return True if there are entries not yet acknowledged.
+        """
+        if not self.segments:
+            return False
+        last_segment = self.segments[-1]
+        return self.cursor_segment < last_segment or self.cursor_offset < self.segment_sizes[last_segment]
+
+    def append(self, entry: dict) -> None:
+        """
+        Append an entry to the newest segment, starting a new segment when it
+        is full and dropping the oldest segments when over budget.
+        """
+        if not self.segments or self.segment_sizes[self.segments[-1]] >= self.segment_size:
+            segment = self.segments[-1] + 1 if self.segments else self.cursor_segment
+            self.segments.append(segment)
+            self.segment_sizes[segment] = 0
+        self._write(self.segments[-1], (dumps(entry) + "\n").encode())
+        self._enforce_budget()
+
+    def _enforce_budget(self) -> None:
+        while self.size() > self.max_size and len(self.segments) > 1:
+            segment = self.segments[0]
+            self.log.warn(f"Upload queue over {self.max_size} bytes, dropping oldest segment {segment} of {self.segment_sizes[segment]} bytes")
+            self._remove_segment(segment)
+            if self.cursor_segment <= segment:
+                self._commit_cursor(self.segments[0], 0)
+
+    def _remove_segment(self, segment: int) -> None:
+        try:
+            remove(self._segment_file(segment))
+        except OSError as e:
+            self.log.error(f"Failed to remove upload queue segment {segment}: {e}")
+        self.segments.remove(segment)
+        self.segment_sizes.pop(segment, None)
+
+    def read_batch(self, max_entries: int) -> tuple[list, tuple]:
+        """
+        Return up to max_entries unacknowledged entries from the cursor
+        onwards, and the cursor to commit once they have been pushed.
+        """
+        entries = []
+        segment = self.cursor_segment
+        offset = self.cursor_offset
+
+        while len(entries) < max_entries and segment in self.segment_sizes:
+            size = self.segment_sizes[segment]
+            if offset >= size:
+                index = self.segments.index(segment) + 1
+                if index >= len(self.segments):
+                    break
+                segment = self.segments[index]
+                offset = 0
+                continue
+
+            with open(self._segment_file(segment), "rb") as f:
+                f.seek(offset)
+                while len(entries) < max_entries and offset < size:
+                    line = f.readline()
+                    if not line:
+                        offset = size
+                        break
+                    offset += len(line)
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entries.append(loads(line.decode()))
+                    except ValueError as e:
+                        self.log.error(f"Skipping corrupt upload queue entry in segment {segment}: {e}")
+
+        return entries, (segment, offset)
+
+    def commit(self, cursor: tuple) -> None:
+        """
+        Acknowledge all entries before cursor, deleting fully acknowledged
+        segments.
+        """
+        segment, offset = cursor
+        self._commit_cursor(segment, offset)
+        while self.segments and self.segments[0] < segment:
+            self._remove_segment(self.segments[0])
+
+    def _commit_cursor(self, segment: int, offset: int) -> None:
+        self.cursor_segment = segment
+        self.cursor_offset = offset
+        with open(self.path + CURSOR_TEMP_FILE, "w") as f:
+            f.write(dumps({"segment": segment, "offset": offset}))
+        try:
+            rename(self.path + CURSOR_TEMP_FILE, self.path + CURSOR_FILE)
+        except OSError:
+            remove(self.path + CURSOR_FILE)
+            rename(self.path + CURSOR_TEMP_FILE, self.path + CURSOR_FILE)
+
+    def import_lines(self, file: str) -> int:
+        """
+        Append JSON line entries from a file one line at a time, returning the
+        number of entries imported.
+        """
+        imported = 0
+        with open(file, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    self.append(loads(line))
+                    imported += 1
+                except ValueError as e:
+                    self.log.error(f"Skipping corrupt entry in {file}: {e}")
+        return imported
@@ -1,4 +1,4 @@
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 import lib.uaiohttpclient as httpclient
 from lib.networking import WirelessNetwork
 from config import WEBSERVER_HOST, WEBSERVER_PORT
@@ -10,7 +10,7 @@ class Wrapper:
     API wrapper for the REST API accepting comands to pass to the local slack server socket.
     """
     def __init__(self, network: WirelessNetwork) -> None:
-        self.log = uLogger("Slack API")
+        self.log = get_logger("Slack API")
         self.wifi = network
         self.event_api_base_url = "http://" + WEBSERVER_HOST + ":" + WEBSERVER_PORT + "/api/"
 
@@ -27,7 +27,7 @@ class Wrapper:
     async def async_get_space_state(self) -> bool | None:
         """Call space_state and return boolean: True = Open, False = closed."""
         response = await self.async_slack_api_request("GET", "space/state")
-        self.log.info(f"Request result: {response}")
+        self.log.info("Request result: %s", response)
         try:
             state = response['open']
             if state not in [True, False, None]:
@@ -47,7 +47,7 @@ class Wrapper:
         Make a request to the S.M.I.B. SLACK API, provide the URL suffix to event api url, e.g. 'space_open'.
         Returns the response data as a dict, throws an exception if the return status code is not 200.
         """
-        self.log.info(f"Calling slack API: {url_suffix} with method: {method} and data: {json_data}")
+        self.log.info("Calling slack API: %s with method: %s and data: %s", url_suffix, method, json_data)
         url = self.event_api_base_url + url_suffix
         result = await self._async_api_request(method, url, json_data)
         return result
@@ -70,7 +70,7 @@ class Wrapper:
         """
         gc.collect()
 
-        self.log.info(f"Calling URL: {url}, with method: {method}")
+        self.log.info("Calling URL: %s, with method: %s", url, method)
 
         try:
             await self.wifi.check_network_access()
@@ -81,13 +81,13 @@ class Wrapper:
                 "Content-Length" : str(len(json_data))
             }
             request = await httpclient.request(method, url, headers=headers, json_data=json_data)
-            self.log.info(f"Request: {request}")
+            self.log.info("Request: %s", request)
             response = await request.read()
-            self.log.info(f"Response data: {response}")
+            self.log.info("Response data: %s", response)
             data = {}
             if response:
                 data = loads(response)
-                self.log.info(f"JSON data: {data}")
+                self.log.info("JSON data: %s", data)
 
             if request.status >= 200 and request.status < 300:
                 self.log.info("Request processed successfully by SMIB API")
@@ -3,6 +3,7 @@ Classes related to space state management.
 """
 
 from asyncio import Event, create_task, sleep, wait_for, CancelledError, Task
+from lib.supervisor import supervisor
 
 try:
     from typing import TYPE_CHECKING, Optional, Literal
@@ -18,7 +19,7 @@ from lib.constants import CLOSED, OPEN
 from lib.error_handling import ErrorHandler
 from lib.module_config import ModuleConfig
 from lib.slack_api import Wrapper
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 from lib.utils import StatusLED
 from lib.uistate import UIState
 from time import ticks_ms
@@ -43,7 +44,7 @@ class SpaceState:
         HID is used to call the appropriate UI state functions when the space
         open and closed buttons are pressed as HID hosts the UI state.
         """
-        self.log = uLogger("SpaceState")
+        self.log = get_logger("SpaceState")
         self.hid = hid
         self.display = module_config.get_display()
         self.wifi = module_config.get_wifi()
@@ -117,7 +118,7 @@ class SpaceState:
         if self.space_state_poll_period > 0:
             if self.space_state_poll_task is None or self.space_state_poll_task.done():
                 self.log.info("Starting space state poller task")
-                self.space_state_poll_task = create_task(self.async_space_state_watcher(delay_start_s))
+                self.space_state_poll_task = supervisor.start("space_state_poll", lambda: self.async_space_state_watcher(delay_start_s))
             else:
                 self.log.info("Space state poller task already running")
         else:
@@ -148,17 +149,17 @@ class SpaceState:
         watchers, the space state poller, and setting the initial space state.
         """
         self.log.info(f"Starting {self.open_button.get_name()} button watcher")
-        create_task(self.open_button.wait_for_press())
+        supervisor.start("open_button", self.open_button.wait_for_press)
         self.log.info(f"Starting {self.closed_button.get_name()} button watcher")
-        create_task(self.closed_button.wait_for_press())
+        supervisor.start("closed_button", self.closed_button.wait_for_press)
         self.log.info(
             f"Starting {self.open_button.get_name()} button pressed event catcher"
         )
-        create_task(self.async_space_open_button_watcher())
+        supervisor.start("open_button_watcher", self.async_space_open_button_watcher)
         self.log.info(
             f"Starting {self.closed_button.get_name()} button pressed event catcher"
         )
-        create_task(self.async_space_close_button_watcher())
+        supervisor.start("close_button_watcher", self.async_space_close_button_watcher)
 
         self.start_space_state_poller()
 
@@ -385,7 +386,7 @@ class SpaceStateUIState(UIState):
     """
     Base class for space state UI state.
     """
-    def __init__(self, hid: HID, space_state: SpaceState) -> None:
+    def __init__(self, hid: 'HID', space_state: 'SpaceState') -> None:
         super().__init__(hid, space_state)
         self.open_for_hours = 0
         self.closed_for_minutes = 0
@@ -441,7 +442,7 @@ class OpenState(UIState):
     """
     UI state for open space state.
     """
-    def __init__(self, hid: HID, space_state: SpaceState) -> None:
+    def __init__(self, hid: 'HID', space_state: 'SpaceState') -> None:
         super().__init__(hid, space_state)
 
     async def async_on_space_closed_button(self) -> None:
@@ -456,7 +457,7 @@ class ClosedState(UIState):
     """
     UI state for closed space state.
     """
-    def __init__(self, hid: HID, space_state: SpaceState) -> None:
+    def __init__(self, hid: 'HID', space_state: 'SpaceState') -> None:
         super().__init__(hid, space_state)
 
     async def async_on_space_closed_button(self) -> None:
@@ -470,7 +471,7 @@ class NoneState(UIState):
     """
     UI state for unknown space state.
     """
-    def __init__(self, hid: HID, space_state: SpaceState) -> None:
+    def __init__(self, hid: 'HID', space_state: 'SpaceState') -> None:
         super().__init__(hid, space_state)
     
     async def async_on_space_closed_button(self) -> None:
@@ -485,7 +486,7 @@ class AddingOpenHoursState(SpaceStateUIState):
     """
     UI state for adding hours to the open for hours counter.
     """
-    def __init__(self, hid: HID, space_state: SpaceState) -> None:
+    def __init__(self, hid: 'HID', space_state: 'SpaceState') -> None:
         super().__init__(hid, space_state)
 
     def on_enter(self) -> None:
@@ -528,7 +529,7 @@ class AddingClosedMinutesState(SpaceStateUIState):
     """
     UI state for adding minutes to the closed for minutes counter.
     """
-    def __init__(self, hid: HID, space_state: SpaceState) -> None:
+    def __init__(self, hid: 'HID', space_state: 'SpaceState') -> None:
         super().__init__(hid, space_state)
 
     def on_enter(self) -> None:
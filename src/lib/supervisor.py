@@ -0,0 +1,119 @@
+from asyncio import create_task, sleep, CancelledError
+from time import time, ticks_ms, ticks_diff
+from lib.ulogging import get_logger
+from lib.loop_monitor import LoopMonitor, InstrumentedCoroutine, TaskStats, monitor
+
+RESTART_NEVER = "never"
+RESTART_ON_FAILURE = "on_failure"
+RESTART_ALWAYS = "always"
+
+MIN_BACKOFF_S = 1
+MAX_BACKOFF_S = 300
+STABLE_RUN_MS = 60000
+
+class SupervisedTask:
+    """
+    State of a long running coroutine started by the supervisor.
+    """
+    def __init__(self, name: str, factory, policy: str, stats: TaskStats) -> None:
+        self.name = name
+        self.factory = factory
+        self.policy = policy
+        self.stats = stats
+        self.state = "starting"
+        self.restarts = 0
+        self.failures = 0
+        self.last_error = None
+        self.started = None
+        self.backoff_s = MIN_BACKOFF_S
+        self.task = None
+
+    def get_status(self) -> dict:
+        status = {
+            "state": self.state,
+            "policy": self.policy,
+            "restarts": self.restarts,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "started": self.started,
+            }
+        status.update(self.stats.to_dict())
+        return status
+
+class Supervisor:
+    """
+    Starts long running service coroutines by name and watches them.
+    Each coroutine is created from a factory so it can be restarted. A
+    coroutine that raises is restarted after a backoff that doubles on each
+    consecutive failure up to MAX_BACKOFF_S, and resets once it has run for
+    STABLE_RUN_MS. Coroutines with the always policy are also restarted if
+    they return, and those with the never policy are left failed. Run time
+    and wakeups are counted through the loop monitor instrumentation.
+    """
+    def __init__(self, loop_monitor: LoopMonitor) -> None:
+        self.log = get_logger("Supervisor")
+        self.loop_monitor = loop_monitor
+        self.tasks = {}
+
+    def start(self, name: str, factory, policy: str = RESTART_ON_FAILURE):
+        """
+        Start a named coroutine from a factory taking no arguments, replacing
+        any finished task of the same name. Returns the supervising asyncio
+        task, which can be cancelled to stop the coroutine. If a task of the
+        same name is still running, it is returned and no new task is started.
+        """
+        existing = self.tasks.get(name)
+        if existing is not None and existing.task is not None and not existing.task.done():
+            self.log.warn(f"Task {name} is already running, not starting another")
+            return existing.task
+        supervised = SupervisedTask(name, factory, policy, self.loop_monitor.get_task_stats(name))
+        self.tasks[name] = supervised
+        supervised.task = create_task(self._supervise(supervised))
+        return supervised.task
+
+    async def _supervise(self, supervised: SupervisedTask) -> None:
+        while True:
+            supervised.state = "running"
+            supervised.started = time()
+            run_start = ticks_ms()
+            try:
+                await InstrumentedCoroutine(self.loop_monitor, supervised.stats, supervised.factory())
+                if supervised.policy != RESTART_ALWAYS:
+                    supervised.state = "finished"
+                    return
+                self.log.warn(f"Task {supervised.name} returned, restarting")
+
+            except CancelledError:
+                supervised.state = "stopped"
+                raise
+
+            except Exception as e:
+                supervised.failures += 1
+                supervised.last_error = f"{type(e).__name__}: {e}"
+                self.log.error(f"Task {supervised.name} failed: {supervised.last_error}")
+                if supervised.policy == RESTART_NEVER:
+                    supervised.state = "failed"
+                    return
+
+            if ticks_diff(ticks_ms(), run_start) >= STABLE_RUN_MS:
+                supervised.backoff_s = MIN_BACKOFF_S
+            supervised.state = "backoff"
+            self.log.info(f"Restarting task {supervised.name} in {supervised.backoff_s}s")
+            try:
+                await sleep(supervised.backoff_s)
+            except CancelledError:
+                supervised.state = "stopped"
+                raise
+            supervised.backoff_s = min(supervised.backoff_s * 2, MAX_BACKOFF_S)
+            supervised.restarts += 1
+
+    def get_statuses(self) -> dict:
+        """
+        Return the status, restart counts and run counters of each task.
+        """
+        statuses = {}
+        for name, supervised in self.tasks.items():
+            statuses[name] = supervised.get_status()
+        return statuses
+
+supervisor = Supervisor(monitor)
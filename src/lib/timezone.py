@@ -0,0 +1,96 @@
+from time import gmtime
+
+DAY_S = 86400
+HOUR_S = 3600
+
+class TimeZone:
+    """
+    Local time zone following the EU/UK daylight saving rules, where clocks
+    go forward at 01:00 UTC on the last Sunday of March and back at 01:00
+    UTC on the last Sunday of October. Defaults to UK time (GMT/BST).
+    Transitions are calculated from the date rather than looked up, and the
+    current offset is cached with the instants it is valid between, so
+    repeated calls are a couple of comparisons until the next clock change.
+    """
+    def __init__(self, standard_offset_s: int = 0, dst_offset_s: int = HOUR_S) -> None:
+        self.standard_offset_s = standard_offset_s
+        self.dst_offset_s = dst_offset_s
+        self._offset_s = standard_offset_s
+        self._valid_from = 0
+        self._valid_until = 0
+
+    def _days_from_civil(self, year: int, month: int, day: int) -> int:
+        """
+        Return the number of days since 1970-01-01 for a proleptic Gregorian
+        date.
+        """
+        if month <= 2:
+            year -= 1
+        era = year // 400
+        year_of_era = year - era * 400
+        day_of_year = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+        day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+        return era * 146097 + day_of_era - 719468
+
+    def _last_sunday_0100_utc(self, year: int, month: int) -> int:
+        """
+        Return the unix timestamp of 01:00 UTC on the last Sunday of a month
+        with 31 days.
+        """
+        days = self._days_from_civil(year, month, 31)
+        days -= (days + 4) % 7
+        return days * DAY_S + HOUR_S
+
+    def dst_start(self, year: int) -> int:
+        return self._last_sunday_0100_utc(year, 3)
+
+    def dst_end(self, year: int) -> int:
+        return self._last_sunday_0100_utc(year, 10)
+
+    def _update(self, now: int) -> None:
+        year = gmtime(now)[0]
+        start = self.dst_start(year)
+        end = self.dst_end(year)
+        if now < start:
+            self._offset_s = self.standard_offset_s
+            self._valid_from = self.dst_end(year - 1)
+            self._valid_until = start
+        elif now < end:
+            self._offset_s = self.dst_offset_s
+            self._valid_from = start
+            self._valid_until = end
+        else:
+            self._offset_s = self.standard_offset_s
+            self._valid_from = end
+            self._valid_until = self.dst_start(year + 1)
+
+    def utc_offset_s(self, now: int) -> int:
+        """
+        Return the offset of local time from UTC in seconds at a unix
+        timestamp.
+        """
+        if not self._valid_from <= now < self._valid_until:
+            self._update(now)
+        return self._offset_s
+
+    def is_dst(self, now: int) -> bool:
+        return self.utc_offset_s(now) != self.standard_offset_s
+
+    def next_transition(self, now: int) -> int:
+        """
+        Return the unix timestamp of the next clock change after now.
+        """
+        self.utc_offset_s(now)
+        return self._valid_until
+
+    def local_hour(self, now: int) -> int:
+        """
+        Return the local hour of the day, 0 to 23, at a unix timestamp.
+        """
+        return ((int(now) + self.utc_offset_s(now)) % DAY_S) // HOUR_S
+
+    def localtime(self, now: int) -> tuple:
+        """
+        Return the local time tuple at a unix timestamp.
+        """
+        return gmtime(int(now) + self.utc_offset_s(now))
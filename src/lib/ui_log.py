@@ -1,7 +1,8 @@
 from time import time
 from lib.button import Button
-from lib.ulogging import uLogger
-from asyncio import create_task, sleep
+from lib.ulogging import get_logger
+from asyncio import sleep
+from lib.supervisor import supervisor
 from config import ENABLE_UI_LOGGING_UPLOAD
 from lib.error_handling import ErrorHandler
 from lib.slack_api import Wrapper
@@ -9,7 +10,7 @@ from lib.networking import WirelessNetwork
 
 class UILog:
     def __init__(self, wifi: WirelessNetwork) -> None:
-        self.log = uLogger("UI Log")
+        self.log = get_logger("UI Log")
         self.log.info("UI Log initialised")
         self.ui_log = []
         self.slack = Wrapper(wifi)
@@ -32,7 +33,7 @@ class UILog:
         Start the UI log uploader.
         """
         self.log.info("Starting UI log uploader")
-        create_task(self.async_ui_log_uploader())
+        supervisor.start("ui_log_uploader", self.async_ui_log_uploader)
     
     def log_button_press(self, button: Button) -> None:
         self.log.info(f"Button press logged: {button.get_name()}")
@@ -1,4 +1,4 @@
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 from asyncio import create_task, sleep
 from time import ticks_ms
 
@@ -15,7 +15,7 @@ class UIState:
     """
     State machine for the SMIBHID user interface.
     """
-    def __init__(self, hid: HID, space_state: SpaceState) -> None:
+    def __init__(self, hid: 'HID', space_state: 'SpaceState') -> None:
         """
         Pass HID instance for global UI state reference.
         Pass SpaceState instance to allow space open and closed buttons to work
@@ -23,7 +23,7 @@ class UIState:
         """
         self.hid = hid
         self.space_state = space_state
-        self.log = uLogger("UIState")
+        self.log = get_logger("UIState")
         self.state_change_API_timeout_s = 4
 
     def on_enter(self) -> None:
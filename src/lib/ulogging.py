@@ -1,6 +1,53 @@
 from gc import mem_free
-from os import stat, remove, rename
-from time import gmtime, time
+from os import stat, remove, rename, mkdir
+from json import dumps, loads
+from time import gmtime, time, ticks_ms, ticks_diff
+from asyncio import sleep_ms, Event
+import socket
+
+CRITICAL = 1
+ERROR = 2
+WARNING = 3
+INFO = 4
+
+LEVEL_NAMES = ("Disabled", "Critical", "Error", "Warning", "Info")
+MEM_SAMPLE_MS = 10000
+LOG_DIRECTORY = "logs"
+# Log files from before segmented logs, oldest first
+LEGACY_LOG_FILES = ["log2.txt", "log.txt"]
+SYSLOG_FACILITY = 16
+SYSLOG_SEVERITIES = (7, 2, 3, 4, 6)
+SYSLOG_RETRY_MS = 5000
+SYSLOG_LOOKUP_RETRY_MS = 60000
+
+class DecorationCache:
+    """
+    Timestamp and free memory text shared by every logger. The timestamp is
+    only formatted when the second changes, and free memory is sampled every
+    MEM_SAMPLE_MS or for warnings and above, as mem_free() walks the heap.
+    """
+    def __init__(self) -> None:
+        self.second = None
+        self.timestamp = ""
+        self.mem_sampled = None
+        self.mem = ""
+
+    def get_timestamp(self) -> str:
+        now = time()
+        if now != self.second:
+            time_str = gmtime(now)
+            self.timestamp = f"{time_str[0]}-{time_str[1]}-{time_str[2]} {time_str[3]}:{time_str[4]}:{time_str[5]}"
+            self.second = now
+        return self.timestamp
+
+    def get_mem(self, level: int) -> str:
+        now = ticks_ms()
+        if self.mem_sampled is None or level <= WARNING or ticks_diff(now, self.mem_sampled) >= MEM_SAMPLE_MS:
+            self.mem = f"{round(mem_free() / 1024)}kB free"
+            self.mem_sampled = now
+        return self.mem
+
+decoration_cache = DecorationCache()
 
 class uLogger:
     
@@ -10,131 +57,549 @@ class uLogger:
         Raise a debug message using the appropriate function for the severity
         Debug level 0-3: Each level adds more verbosity
         0 = Disabled, 1 = Critical, 2 = Error, 3 = Warning, 4 = Info
+        Messages are only formatted when their level is enabled, so pass a
+        format string and arguments, e.g. log.info("Readings: %s", readings),
+        or a callable returning the message rather than an f-string for
+        messages that are expensive to build. Hot paths can check the
+        enabled_info, enabled_warn, enabled_error and enabled_critical
+        flags to skip work done only for logging.
+        Use get_logger() rather than creating a uLogger per object, so
+        objects logging under the same name share one logger.
         """
         self.module_name = module_name
         self.configure_log_level(log_level)
         self.configure_handlers(handlers)
 
     def configure_log_level(self, log_level: int) -> None:
-        self.log_level = 0
-        
         if log_level > 0:
-            self.log_level = log_level
+            self.set_level(log_level)
         else:
-            try:
-                from config import LOG_LEVEL as config_log_level
-                self.log_level = config_log_level
-            except ImportError:
-                print("LOG_LEVEL not found in config.py not found. Using default log level.")
-            except Exception as e:
-                print(f"An unexpected error occurred: {e}. Using default log level.")
+            self.set_level(get_logging_config()[0])
+
+    def set_level(self, log_level: int) -> None:
+        """
+        Change the log level of this logger at runtime.
+        """
+        self.log_level = log_level
+        self.enabled_critical = self.log_level >= CRITICAL
+        self.enabled_error = self.log_level >= ERROR
+        self.enabled_warn = self.log_level >= WARNING
+        self.enabled_info = self.log_level >= INFO
 
     def configure_handlers(self, handlers: list) -> None:
-        self.handlers = []
-        self.handler_objects = []
-        
         if len(handlers) > 0:
             self.handlers = handlers
         else:
-            try:
-                from config import LOG_HANDLERS as config_log_handlers
-                self.handlers = config_log_handlers
-            except ImportError:
-                print("LOG_HANDLERS not found in config.py not found. Using default output handler.")
-            except Exception as e:
-                print(f"An unexpected error occurred: {e}. Using default output handler.")
+            self.handlers = get_logging_config()[1]
         
+        self.handler_objects = []
         for handler in self.handlers:
-            try:
-                handler_class = globals().get(handler)
-                
-                if handler_class is None:
-                    raise ValueError(f"Handler class '{handler}' not found.")
-                
-                handler = handler_class()
-                self.handler_objects.append(handler)
-            except Exception as e:
-                print(f"An error occurred while confguring handler '{handler}': {e}")
-                raise
+            self.handler_objects.append(get_handler(handler))
 
-    def decorate_message(self, message: str, level: str) -> str:
-        time_str = gmtime(time())
-        timestamp = f"{time_str[0]}-{time_str[1]}-{time_str[2]} {time_str[3]}:{time_str[4]}:{time_str[5]}"
-        decorated_message = f"[{timestamp}][Mem: {round(mem_free() / 1024)}kB free][{level}][{self.module_name}]: {message}"
-        return decorated_message
+    def decorate_message(self, message: str, level: int) -> str:
+        return f"[{decoration_cache.get_timestamp()}][Mem: {decoration_cache.get_mem(level)}][{LEVEL_NAMES[level]}][{self.module_name}]: {message}"
     
-    def process_handlers(self, message: str) -> None:
+    def process_handlers(self, message: str, level: int) -> None:
         for handler in self.handler_objects:
             try:
-                handler.emit(message)
+                handler.emit(message, level)
             except Exception as e:
                 print(f"An error occurred while processing handler '{handler}': {e}")
                 raise
     
-    def info(self, message: str) -> None:
-        if self.log_level > 3:
-            self.process_handlers(self.decorate_message(message, "Info"))
+    def format_message(self, message, args: tuple) -> str:
+        """
+        Build a message from a format string and arguments, or by calling it
+        if it is a callable.
+        """
+        if args:
+            return message % args
+        if callable(message):
+            return message()
+        return message
 
-    def warn(self, message: str) -> None:
-        if self.log_level > 2:
-            self.process_handlers(self.decorate_message(message, "Warning"))
+    def info(self, message, *args) -> None:
+        if self.enabled_info:
+            self.process_handlers(self.decorate_message(self.format_message(message, args), INFO), INFO)
 
-    def error(self, message: str) -> None:
-        if self.log_level > 1:
-            self.process_handlers(self.decorate_message(message, "Error"))
+    def warn(self, message, *args) -> None:
+        if self.enabled_warn:
+            self.process_handlers(self.decorate_message(self.format_message(message, args), WARNING), WARNING)
 
-    def critical(self, message: str) -> None:
-        if self.log_level > 0:
-            self.process_handlers(self.decorate_message(message, "Critical"))
+    def error(self, message, *args) -> None:
+        if self.enabled_error:
+            self.process_handlers(self.decorate_message(self.format_message(message, args), ERROR), ERROR)
+
+    def critical(self, message, *args) -> None:
+        if self.enabled_critical:
+            self.process_handlers(self.decorate_message(self.format_message(message, args), CRITICAL), CRITICAL)
+
+logging_config = None
+handler_instances = {}
+loggers = {}
+
+def get_logging_config() -> tuple:
+    """
+    Return the configured log level and handler names, read from config.py
+    once.
+    """
+    global logging_config
+    if logging_config is None:
+        log_level = 0
+        log_handlers = []
+        try:
+            from config import LOG_LEVEL as log_level
+        except ImportError:
+            print("LOG_LEVEL not found in config.py not found. Using default log level.")
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}. Using default log level.")
+        try:
+            from config import LOG_HANDLERS as log_handlers
+        except ImportError:
+            print("LOG_HANDLERS not found in config.py not found. Using default output handler.")
+        except Exception as e:
+            print(f"An unexpected error occurred: {e}. Using default output handler.")
+        logging_config = (log_level, log_handlers)
+    return logging_config
+
+def get_handler(name: str):
+    """
+    Return the shared instance of a named log handler class.
+    """
+    handler = handler_instances.get(name)
+    if handler is None:
+        try:
+            handler_class = globals().get(name)
+            
+            if handler_class is None:
+                raise ValueError(f"Handler class '{name}' not found.")
+            
+            handler = handler_class()
+            handler_instances[name] = handler
+        except Exception as e:
+            print(f"An error occurred while confguring handler '{name}': {e}")
+            raise
+    return handler
+
+def get_logger(module_name: str) -> uLogger:
+    """
+    Return the logger for a module name, creating it on first use. Loggers
+    are shared by every object using the same name, and all loggers share
+    the configured handler instances.
+    """
+    logger = loggers.get(module_name)
+    if logger is None:
+        logger = uLogger(module_name)
+        loggers[module_name] = logger
+    return logger
+
+def get_log_levels() -> dict:
+    """
+    Return the current log level of each registered logger.
+    """
+    levels = {}
+    for name, logger in loggers.items():
+        levels[name] = logger.log_level
+    return levels
+
+def set_log_level(log_level: int, module_name: str = "") -> list:
+    """
+    Set the log level of one registered logger, or all of them if no module
+    name is given, returning the names of the loggers changed. Raises
+    ValueError for an unknown module or a level outside 0-4.
+    """
+    if log_level < 0 or log_level > INFO:
+        raise ValueError(f"Log level {log_level} is not between 0 and {INFO}")
+    if module_name:
+        if module_name not in loggers:
+            raise ValueError(f"No logger named {module_name}")
+        names = [module_name]
+    else:
+        names = list(loggers.keys())
+    for name in names:
+        loggers[name].set_level(log_level)
+    return names
 
 class Console:
     def __init__(self) -> None:
         pass
     
-    def emit(self, message) -> None:
+    def emit(self, message, level: int = INFO) -> None:
         print(message)
 
+class LogSegments:
+    """
+    Log file stored as numbered segment files in a directory, with an index
+    file recording each segment number and the time of its first line.
+    When the current segment grows past segment_size a new one is started,
+    and the oldest segments are deleted to keep at most max_segments, so
+    rotation never copies or rewrites logged data. Readers can stream lines
+    from any segment, or tail the most recent bytes, without loading more
+    than a line at a time.
+    The directory is only created on the first write. Log files from before
+    segmented logs are then moved in as the first segments, with an unknown
+    start time, so their history is kept.
+    """
+    def __init__(self, directory: str, segment_size: int, max_segments: int, legacy_files: list = []) -> None:
+        self.directory = directory
+        self.index_file = f"{directory}/index.json"
+        self.segment_size = segment_size
+        self.max_segments = max(1, max_segments)
+        self.legacy_files = legacy_files
+        self.segments = []
+        self.current_size = 0
+        self.prepared = False
+        self.load_index()
+
+    def _prepare(self) -> None:
+        """
+        Create the directory and adopt any legacy log files ahead of the
+        first write.
+        """
+        self.prepared = True
+        try:
+            mkdir(self.directory)
+        except OSError:
+            pass
+        if self.segments:
+            return
+        for legacy_file in self.legacy_files:
+            try:
+                size = stat(legacy_file)[6]
+            except OSError:
+                continue
+            number = len(self.segments) + 1
+            rename(legacy_file, self.segment_path(number))
+            self.segments.append([number, None])
+            self.current_size = size
+        if self.segments:
+            self.save_index()
+
+    def segment_path(self, number: int) -> str:
+        return f"{self.directory}/{number}.txt"
+
+    def load_index(self) -> None:
+        try:
+            with open(self.index_file, "r") as index_file:
+                self.segments = [list(segment) for segment in loads(index_file.read())]
+        except (OSError, ValueError):
+            self.segments = []
+        if self.segments:
+            try:
+                self.current_size = stat(self.segment_path(self.segments[-1][0]))[6]
+            except OSError:
+                self.current_size = 0
+
+    def save_index(self) -> None:
+        temp_file = self.index_file + ".tmp"
+        with open(temp_file, "w") as index_file:
+            index_file.write(dumps(self.segments))
+        rename(temp_file, self.index_file)
+
+    def append(self, data) -> None:
+        """
+        Append data to the current segment, starting a new segment first if
+        there is none and rotating once the segment is full.
+        """
+        if not self.prepared:
+            self._prepare()
+        if not self.segments:
+            self.start_segment()
+        with open(self.segment_path(self.segments[-1][0]), "ab") as log_file:
+            log_file.write(data)
+        self.current_size += len(data)
+        if self.current_size > self.segment_size:
+            self.start_segment()
+
+    def start_segment(self) -> None:
+        if not self.prepared:
+            self._prepare()
+        number = self.segments[-1][0] + 1 if self.segments else 1
+        self.segments.append([number, time()])
+        self.current_size = 0
+        while len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            try:
+                remove(self.segment_path(oldest[0]))
+            except OSError:
+                pass
+        self.save_index()
+
+    def get_segments(self) -> list:
+        """
+        Return the number, start time and size of each segment, oldest first.
+        """
+        segments = []
+        for number, start in self.segments:
+            try:
+                size = stat(self.segment_path(number))[6]
+            except OSError:
+                size = 0
+            segments.append({"segment": number, "start": start, "size": size})
+        return segments
+
+    def read_lines(self, segment: int | None = None, tail_bytes: int = 0):
+        """
+        Generator of log lines, from all segments oldest first, a single
+        segment number, or only the lines in the last tail_bytes of the log.
+        """
+        if segment is not None:
+            yield from self._segment_lines(segment, 0)
+            return
+
+        first = 0
+        offset = 0
+        if tail_bytes > 0:
+            segments = self.get_segments()
+            remaining = tail_bytes
+            first = len(segments)
+            while first > 0 and remaining > 0:
+                first -= 1
+                remaining -= segments[first]["size"]
+            offset = -remaining if remaining < 0 else 0
+
+        for number, _ in self.segments[first:]:
+            yield from self._segment_lines(number, offset)
+            offset = 0
+
+    def _segment_lines(self, number: int, offset: int):
+        try:
+            with open(self.segment_path(number), "r") as log_file:
+                if offset > 0:
+                    log_file.seek(offset - 1)
+                    if log_file.read(1) != "\n":
+                        log_file.readline()
+                while True:
+                    line = log_file.readline()
+                    if not line:
+                        return
+                    yield line
+        except OSError:
+            return
+
+class LogFileBuffer:
+    """
+    Log file writer that collects lines in a preallocated buffer and appends
+    them to the log segments in one write, rather than opening the file for
+    every line. The buffer is flushed when it is full, when LOG_FILE_FLUSH_MS
+    has passed since the last flush, and straight away for critical
+    messages. The segment size is tracked from the bytes written so rotation
+    does not need a stat of the file on every flush.
+    """
+    def __init__(self, segments: LogSegments, buffer_size: int, flush_ms: int) -> None:
+        self.segments = segments
+        self.flush_ms = flush_ms
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.buffered = 0
+        self.last_flush = ticks_ms()
+
+    def write(self, message: str, level: int) -> None:
+        line = (message + "\n").encode()
+        length = len(line)
+        if self.buffered + length > len(self.buffer):
+            self.flush()
+        if length > len(self.buffer):
+            self.segments.append(line)
+        else:
+            self.buffer[self.buffered:self.buffered + length] = line
+            self.buffered += length
+        if level <= CRITICAL or ticks_diff(ticks_ms(), self.last_flush) >= self.flush_ms:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Append any buffered lines to the current log segment.
+        """
+        self.last_flush = ticks_ms()
+        if self.buffered == 0:
+            return
+        data = self.view[0:self.buffered]
+        self.buffered = 0
+        self.segments.append(data)
+
+log_file_buffer = None
+
+def get_log_file_buffer() -> LogFileBuffer:
+    """
+    Return the log file buffer shared by all File handlers, creating it on
+    first use, so lines from every module are written in order.
+    """
+    global log_file_buffer
+    if log_file_buffer is None:
+        from config import LOG_FILE_MAX_SIZE, LOG_FILE_SEGMENTS, LOG_FILE_BUFFER_SIZE, LOG_FILE_FLUSH_MS
+        segments = LogSegments(LOG_DIRECTORY, LOG_FILE_MAX_SIZE, LOG_FILE_SEGMENTS, LEGACY_LOG_FILES)
+        log_file_buffer = LogFileBuffer(segments, LOG_FILE_BUFFER_SIZE, LOG_FILE_FLUSH_MS)
+    return log_file_buffer
+
+def flush_log_file() -> None:
+    """
+    Write out any buffered log file lines, e.g. before a reset.
+    """
+    if log_file_buffer is not None:
+        log_file_buffer.flush()
+
+async def async_flush_log_file() -> None:
+    """
+    Flush buffered log file lines every LOG_FILE_FLUSH_MS so lines are
+    written while the device is quiet too.
+    """
+    buffer = get_log_file_buffer()
+    while True:
+        await sleep_ms(buffer.flush_ms)
+        if ticks_diff(ticks_ms(), buffer.last_flush) >= buffer.flush_ms:
+            buffer.flush()
+
 class File:
     def __init__(self) -> None:
-        self.log_file = "log.txt"
-        self.second_log_file = "log2.txt"
-        from config import LOG_FILE_MAX_SIZE
-        self.LOG_FILE_MAX_SIZE = LOG_FILE_MAX_SIZE
+        self.buffer = get_log_file_buffer()
+        self.segments = self.buffer.segments
     
-    def emit(self, message) -> None:
-        with open(self.log_file, "a") as log_file:
-            log_file.write(message + "\n")
-        self.check_for_rotate()
+    def emit(self, message, level: int = INFO) -> None:
+        self.buffer.write(message, level)
 
-    def check_for_rotate(self) -> None:
-        log_file_size = stat(self.log_file)[6]
-        if log_file_size > self.LOG_FILE_MAX_SIZE:
-            self.rotate_file()
+    def flush(self) -> None:
+        self.buffer.flush()
 
-    def rotate_file(self) -> None:
-        try:
-            remove(self.second_log_file)
-        except OSError:
-            print(f"{self.second_log_file} did not exist to be deleted.")
-        
-        rename(self.log_file, self.second_log_file)
+    def get_segments(self) -> list:
+        self.flush()
+        return self.segments.get_segments()
+
+    def read_lines(self, segment: int | None = None, tail_bytes: int = 0):
+        """
+        Generator of log lines, see LogSegments.read_lines().
+        """
+        self.flush()
+        return self.segments.read_lines(segment, tail_bytes)
     
     def read_logs(self) -> str:
         """ 
-        Read both log files and return their contents as a single string.
+        Read all log segments and return their contents as a single string.
+        Use read_lines() to stream or tail large logs.
         """
-        logs = ""
+        return "".join(self.read_lines())
+
+class Syslog:
+    """
+    Log handler streaming records over UDP to a syslog collector as RFC 5424
+    messages with the local0 facility. Records are held in a bounded queue
+    and sent by async_run(), so logging never waits on the network. When the
+    queue is full new records are dropped and counted, and the count is sent
+    as a warning once the collector is reachable again.
+    The collector address is looked up once Wi-Fi is connected and kept
+    across send failures, as getaddrinfo() blocks the event loop for the
+    whole DNS lookup. The handler is disabled if no host is configured.
+    """
+    def __init__(self, host: str | None = None, port: int = 0, queue_size: int = 0) -> None:
+        if host is None:
+            from config import LOG_SYSLOG_HOST, LOG_SYSLOG_PORT, LOG_SYSLOG_QUEUE_SIZE
+            host, port, queue_size = LOG_SYSLOG_HOST, LOG_SYSLOG_PORT, LOG_SYSLOG_QUEUE_SIZE
+        self.enabled = bool(host)
+        if not self.enabled:
+            print("Syslog handler disabled, LOG_SYSLOG_HOST is not set")
+        self.host = host
+        self.port = port
+        self.queue = [None] * queue_size
+        self.head = 0
+        self.count = 0
+        self.dropped = 0
+        self.sent = 0
+        self.hostname = "-"
+        self.address = None
+        self.sock = None
+        self.ready = Event()
+
+    def emit(self, message, level: int = INFO) -> None:
+        if not self.enabled:
+            return
+        if self.count == len(self.queue):
+            self.dropped += 1
+            return
+        self.queue[(self.head + self.count) % len(self.queue)] = (level, message)
+        self.count += 1
+        self.ready.set()
+
+    def format_record(self, level: int, message: str) -> bytes:
+        return f"<{SYSLOG_FACILITY * 8 + SYSLOG_SEVERITIES[level]}>1 - {self.hostname} smibhid - - - {message}".encode()
+
+    def network_connected(self) -> bool:
         try:
-            with open(self.second_log_file, "r") as log_file:
-                logs += log_file.read()
-        except OSError:
-            pass
-        
+            from network import WLAN, STA_IF
+            return WLAN(STA_IF).status() == 3
+        except Exception:
+            return False
+
+    def resolve(self) -> None:
+        """
+        Look up the collector address, raising OSError if the lookup fails.
+        """
+        self.address = socket.getaddrinfo(self.host, self.port, 0, socket.SOCK_DGRAM)[0][-1]
+
+    def connect(self) -> None:
         try:
-            with open(self.log_file, "r") as log_file:
-                logs += log_file.read()
-        except OSError:
+            from network import hostname
+            self.hostname = hostname() or "-"
+        except Exception:
             pass
-        
-        return logs
-    
\ No newline at end of file
+        if self.address is None:
+            self.resolve()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    def close(self) -> None:
+        """
+        Close the socket, keeping the resolved collector address.
+        """
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = None
+
+    def send_queued(self) -> None:
+        """
+        Send queued records, leaving any that could not be sent queued.
+        Raises OSError if the collector cannot be reached.
+        """
+        if self.sock is None:
+            self.connect()
+        if self.dropped:
+            self.sock.sendto(self.format_record(WARNING, f"Syslog queue full, dropped {self.dropped} log records"), self.address)
+            self.dropped = 0
+        while self.count:
+            level, message = self.queue[self.head]
+            self.sock.sendto(self.format_record(level, message), self.address)
+            self.queue[self.head] = None
+            self.head = (self.head + 1) % len(self.queue)
+            self.count -= 1
+            self.sent += 1
+
+    async def async_run(self) -> None:
+        """
+        Send queued records whenever new ones arrive, retrying every
+        SYSLOG_RETRY_MS while Wi-Fi is down or the collector cannot be
+        reached, and every SYSLOG_LOOKUP_RETRY_MS while the collector address
+        cannot be looked up.
+        """
+        if not self.enabled:
+            return
+        while True:
+            await self.ready.wait()
+            self.ready.clear()
+            if self.address is None:
+                if not self.network_connected():
+                    await sleep_ms(SYSLOG_RETRY_MS)
+                    self.ready.set()
+                    continue
+                try:
+                    self.resolve()
+                except OSError as e:
+                    print(f"Syslog lookup of {self.host} failed: {e}")
+                    await sleep_ms(SYSLOG_LOOKUP_RETRY_MS)
+                    self.ready.set()
+                    continue
+            try:
+                self.send_queued()
+            except OSError as e:
+                print(f"Syslog send to {self.host}:{self.port} failed: {e}")
+                self.close()
+                await sleep_ms(SYSLOG_RETRY_MS)
+                self.ready.set()
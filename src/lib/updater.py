@@ -1,4 +1,4 @@
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger, flush_log_file
 import os
 import machine
 import requests
@@ -10,7 +10,7 @@ from time import sleep
 
 class UpdateCore:
     def __init__(self) -> None:
-        self.log = uLogger("UpdateCore")
+        self.log = get_logger("UpdateCore")
         self.update_path = "/updates"
         self.check_for_updates_folder()
 
@@ -95,12 +95,13 @@ class UpdateCore:
         Restart the device.
         """
         self.log.info("Restarting device")
+        flush_log_file()
         machine.reset()
 
 class Updater(UpdateCore):
     def __init__(self, i2c) -> None:
         super().__init__()
-        self.log = uLogger("Updater")
+        self.log = get_logger("Updater")
         self.display = Display(i2c)
 
     def enter_update_mode(self) -> bool:
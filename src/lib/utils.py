@@ -1,55 +1,50 @@
-from time import sleep, mktime
+from time import sleep, mktime, time
 from machine import Pin, RTC
-import uasyncio
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
+from lib.timezone import TimeZone
+from lib.pattern_player import PatternPlayer
 
 class StatusLED:
     """
     Instantiate an LED on a GPIO pin or leave pin unset for onboard LED.
     Info log level output of state changes.
     Supports sync and async flash functions taking count and frequency arguments.
+    Async flashing is timed by a hardware timer, so it takes no event loop time.
     """
     def __init__(self, gpio_pin: int = -1) -> None:
-        self.logger = uLogger("Status_LED")
+        self.logger = get_logger("Status_LED")
         if gpio_pin > -1:
             self.status_led = Pin(gpio_pin, Pin.OUT)
             self.pin_id = gpio_pin
         else:
             self.status_led = Pin("LED", Pin.OUT)
             self.pin_id = "LED"
+        self.player = PatternPlayer(self.status_led, name=f"Pin {self.pin_id} LED")
     
     def on(self) -> None:
         """"Turn the LED on"""
         self.logger.info(f"Pin {self.pin_id}: LED on")
+        self.player.stop()
         self.status_led.on()
 
     def off(self) -> None:
         """"Turn the LED off"""
         self.logger.info(f"Pin {self.pin_id}: LED off")
+        self.player.stop()
         self.status_led.off()
 
     async def async_flash(self, count: int, hz: float) -> None:
-        """Flash the LED a number of times at a given frequency using async awaits on the sleep function."""
-        self.off()
-        sleep_duration = (1 / hz) / 2
-        for unused in range(count):
-            await uasyncio.sleep(sleep_duration)
-            self.on()
-            await uasyncio.sleep(sleep_duration)
-            self.off()
+        """Flash the LED a number of times at a given frequency, waiting until the flashes are complete."""
+        if int(count) < 1:
+            return
+        await self.player.async_play(PatternPlayer.flash(hz), int(count))
     
     async def async_constant_flash(self, hz: float) -> None:
         """
-        Flash the LED constantly at a given frequency using async awaits on the sleep function.
+        Flash the LED constantly at a given frequency until cancelled.
         This should be started by task = asyncio.create_task() and cancelled with task.cancel().
         """
-        self.off()
-        sleep_duration = (1 / hz) / 2
-        while True:
-            await uasyncio.sleep(sleep_duration)
-            self.on()
-            await uasyncio.sleep(sleep_duration)
-            self.off()
+        await self.player.async_play(PatternPlayer.flash(hz))
     
     def flash(self, count: int, hz: float) -> None:
         """Flash the LED a number of times at a given frequency using standrad blocking sleep function."""
@@ -67,7 +62,8 @@ class DateTimeUtils:
     """
     
     def __init__(self) -> None:
-        self.logger = uLogger("DateTimeUtils")
+        self.logger = get_logger("DateTimeUtils")
+        self.timezone = TimeZone()
         
     def datetime_string(self) -> str:
         """
@@ -90,30 +86,6 @@ class DateTimeUtils:
             
     def uk_bst(self) -> bool:
         """
-        Return True if the UK is currently in BST - requires manual update of
-        bst_timestamps {} dict over time.
+        Return True if the UK is currently in BST.
         """
-        dt = self.datetime_string()
-        year = int(dt[0:4])
-        ts = self.timestamp(dt)
-        bst = False
-
-        bst_timestamps = {
-            2025: {"start": 1743296400, "end": 1761440400},
-            2026: {"start": 1774746000, "end": 1792890000},
-            2027: {"start": 1806195600, "end": 1824944400},
-            2028: {"start": 1837645200, "end": 1856394000},
-            2029: {"start": 1869094800, "end": 1887843600},
-            2030: {"start": 1901149200, "end": 1919293200}
-        }
-
-        if year in bst_timestamps:
-            if bst_timestamps[year]["start"] < ts and bst_timestamps[year]["end"] > ts:
-                self.logger.info(f"Current time {dt} is in BST for year {year}")
-                bst = True
-            else:
-                self.logger.info(f"Current time {dt} is not in BST for year {year}")
-        else:
-            self.logger.warn(f"Provided year is not in BST lookup dictionary: {year}")
-            raise ValueError(f"Provided year {year} is not in BST lookup dictionary.")
-        return bst
+        return self.timezone.is_dst(time())
@@ -4,7 +4,7 @@ MIT license
 (C) Konstantin Belyalov 2017-2018
 https://github.com/belyalov/tinyweb/tree/master
 """
-from lib.ulogging import uLogger
+from lib.ulogging import get_logger
 import asyncio
 import asyncio.core
 import ujson as json
@@ -15,7 +15,7 @@ import uerrno as errno
 import usocket as socket
 
 
-log = uLogger("TinyWeb")
+log = get_logger("TinyWeb")
 
 type_gen = type((lambda: (yield))())
 
@@ -1,11 +1,13 @@
-from smibhid_http.webserver import Webserver
-from lib.ulogging import uLogger, File
+from smibhid_http.webserver import Webserver, parse_query_string
+from lib.ulogging import uLogger, get_logger, get_log_levels, set_log_level, File
 from lib.module_config import ModuleConfig
 from json import dumps
 from collections import OrderedDict
 from asyncio import run, create_task
 from lib.updater import UpdateCore
 from lib.sensors.file_logging import FileLogger
+from lib.loop_monitor import monitor as loop_monitor
+from lib.supervisor import supervisor
 import config
 
 try:
@@ -20,6 +22,8 @@ if TYPE_CHECKING:
     from lib.networking import WirelessNetwork
     from lib.space_state import SpaceState
 
+LOG_CHUNK_SIZE = 512
+
 class WebApp:
 
     def __init__(self, module_config: ModuleConfig, hid: 'HID') -> None:
@@ -29,7 +33,7 @@ class WebApp:
         Pass the module_config object to the constructor to allow the webapp to
         access the necessary modules.
         """
-        self.log = uLogger("Web app")
+        self.log = get_logger("Web app")
         self.log.info("Init webserver")
         self.logging_file = File()
         self.app = Webserver()
@@ -63,6 +67,7 @@ class WebApp:
         self.create_system()
         self.create_configuration()
         self.create_test_sensors()
+        self.create_latest_readings_api()
         self.create_api()
 
     def startup(self):
@@ -71,7 +76,7 @@ class WebApp:
         if network_access:
             self.log.info("Starting web server")
             self.app.run(host='0.0.0.0', port=self.port, loop_forever=False)
-            self.log.info(f"Web server started: {self.wifi.get_ip()}:{self.port}")
+            self.log.info("Web server started: %s:%s", self.wifi.get_ip(), self.port)
             self.running = True
         else:
             self.log.error("No network access - web server not started")
@@ -202,6 +207,26 @@ class WebApp:
         async def index(request, response):
             await response.send_file('/smibhid_http/www/test_sensors.html')
 
+    def create_latest_readings_api(self) -> None:
+        @self.app.route('/api/sensors/readings/latest')
+        async def latest_readings(request, response):
+            query = parse_query_string(request.query_string.decode()) if request.query_string else {}
+            self.log.info("API request - sensors/readings/latest - Query: %s", query)
+            if query.get("fresh") == "1":
+                snapshot = await self.sensors.async_refresh_snapshot()
+            else:
+                snapshot = self.sensors.get_snapshot()
+            html = dumps(snapshot.get_readings(query.get("module", "")))
+            self.log.info("Return value: %s", html)
+            response.add_header('Content-Type', 'application/json')
+            response.add_header('Content-Length', len(html))
+            age_s = snapshot.age_s()
+            if age_s is not None:
+                response.add_header('Age', int(age_s))
+            response.add_access_control_headers()
+            await response._send_headers()
+            await response.send(html)
+
     def create_api(self) -> None:
         @self.app.route('/api')
         async def api(request, response):
@@ -210,6 +235,9 @@ class WebApp:
         self.app.add_resource(WLANMAC, '/api/wlan/mac', wifi = self.wifi, logger = self.log)
         self.app.add_resource(Version, '/api/version', hid = self.hid, logger = self.log)
         self.app.add_resource(Hostname, '/api/hostname', hid = self.hid, logger = self.log)
+        self.app.add_resource(I2CStats, '/api/i2c/stats', hid = self.hid, logger = self.log)
+        self.app.add_resource(LoopStats, '/api/system/loop', logger = self.log)
+        self.app.add_resource(SystemTasks, '/api/system/tasks', logger = self.log)
         
         self.app.add_resource(FirmwareFiles, '/api/firmware_files', update_core = self.update_core, logger = self.log)
         self.app.add_resource(Reset, '/api/reset', update_core = self.update_core, logger = self.log)
@@ -217,8 +245,8 @@ class WebApp:
         self.app.add_resource(Modules, '/api/sensors/modules', sensors = self.sensors, logger = self.log)
         self.app.add_resource(SensorsAPI, '/api/sensors/modules/<module>', sensors = self.sensors, logger = self.log)
         #self.app.add_resource(Readings, '/api/sensors/modules/<module>/readings/latest', sensors = self.sensors, logger = self.log) #TODO: Fix tinyweb to allow for multiple parameters https://github.com/belyalov/tinyweb/pull/51
-        self.app.add_resource(Readings, '/api/sensors/readings/latest', module = "", sensors = self.sensors, logger = self.log)
         self.app.add_resource(SensorData, '/api/sensors/readings/log/<log_type>', logger = self.log)
+        self.app.add_resource(SensorQuery, '/api/sensors/readings/query', logger = self.log)
         self.app.add_resource(SCD30, '/api/sensors/modules/SCD30/auto_measure', function = "auto_measure", sensors = self.sensors, logger = self.log)
         self.app.add_resource(SCD30, '/api/sensors/modules/SCD30/auto_measure/<value>', function = "auto_measure", sensors = self.sensors, logger = self.log)
         self.app.add_resource(SCD30, '/api/sensors/modules/SCD30/calibration/<value>', function = "calibration", sensors = self.sensors, logger = self.log)
@@ -228,6 +256,7 @@ class WebApp:
         self.app.add_resource(Alarm, '/api/sensors/alarm/threshold', value = 'threshold', sensors = self.sensors, logger = self.log)
         self.app.add_resource(Alarm, '/api/sensors/alarm/reset_threshold', value = 'reset_threshold', sensors = self.sensors, logger = self.log)
         self.app.add_resource(Alarm, '/api/sensors/alarm/snooze_remaining', value = 'snooze_remaining', sensors = self.sensors, logger = self.log)
+        self.app.add_resource(Alarm, '/api/sensors/alarm/rules', value = 'rules', sensors = self.sensors, logger = self.log)
         self.app.add_resource(Alarm, '/api/sensors/alarm/snooze', sensors = self.sensors, logger = self.log)
 
         self.app.add_resource(SpaceStateManagement, '/api/space/state', space_state = self.hid.space_state, logger = self.log)
@@ -238,6 +267,9 @@ class WebApp:
         self.app.add_resource(SpaceStateConfiguration, '/api/space/state/config/poll_period/<value>', space_state = self.hid.space_state, logger = self.log)
 
         self.app.add_resource(Logging, '/api/logs/read', logger = self.log, File = self.logging_file)
+        self.app.add_resource(LogSegments, '/api/logs/segments', logger = self.log, File = self.logging_file)
+        self.app.add_resource(LogLevels, '/api/logs/level', logger = self.log)
+        self.app.add_resource(LogLevels, '/api/logs/level/<value>', logger = self.log)
 
         self.app.add_resource(SMIBHIDConfiguration, '/api/configuration/list', logger = self.log)
         
@@ -247,7 +279,7 @@ class WLANMAC():
     def get(self, data, wifi: 'WirelessNetwork', logger: uLogger) -> str:
         logger.info("API request - wlan/mac")
         html = dumps(wifi.get_mac())
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
     
 class Version():
@@ -255,7 +287,7 @@ class Version():
     def get(self, data, hid: 'HID', logger: uLogger) -> str:
         logger.info("API request - version")
         html = dumps(hid.version)
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
     
 class Hostname():
@@ -263,7 +295,31 @@ class Hostname():
     def get(self, data, hid: 'HID', logger: uLogger) -> str:
         logger.info("API request - hostname")
         html = dumps(hid.wifi.determine_hostname())
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
+        return html
+
+class I2CStats():
+
+    def get(self, data, hid: 'HID', logger: uLogger) -> str:
+        logger.info("API request - i2c/stats")
+        html = dumps(hid.i2c.get_stats())
+        logger.info("Return value: %s", html)
+        return html
+
+class LoopStats():
+
+    def get(self, data, logger: uLogger) -> str:
+        logger.info("API request - system/loop")
+        html = dumps(loop_monitor.get_stats())
+        logger.info("Return value: %s", html)
+        return html
+
+class SystemTasks():
+
+    def get(self, data, logger: uLogger) -> str:
+        logger.info("API request - system/tasks")
+        html = dumps(supervisor.get_statuses())
+        logger.info("Return value: %s", html)
         return html
 
 class FirmwareFiles():
@@ -271,12 +327,12 @@ class FirmwareFiles():
     def get(self, data, update_core: 'UpdateCore', logger: uLogger) -> str:
         logger.info("API request - GET Firmware files")
         html = dumps(update_core.process_update_file())
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
     
     def post(self, data, update_core: 'UpdateCore', logger: uLogger) -> str:
         logger.info("API request - POST Firmware files")
-        logger.info(f"Data: {data}")
+        logger.info("Data: %s", data)
         if data["action"] == "add":
             logger.info("Adding update - data: {data}")
             html = update_core.stage_update_url(data["url"])
@@ -299,38 +355,37 @@ class Modules():
     def get(self, data, sensors: 'Sensors', logger: uLogger) -> str:
         logger.info("API request - sensors/modules")
         html = dumps(sensors.get_modules())
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
 
 class SensorsAPI():
 
     def get(self, data, module: str, sensors: 'Sensors', logger: uLogger) -> str:
-        logger.info(f"API request - sensors/{module}")
+        logger.info("API request - sensors/%s", module)
         sensor_list = sensors.get_sensors(module)
-        logger.info(f"Available sensors: {sensor_list}")
+        logger.info("Available sensors: %s", sensor_list)
         html = dumps(sensor_list)
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
 
-class Readings():
+class SensorData():
 
-    def get(self, data, module: str, sensors: 'Sensors', logger: uLogger) -> str:
-        logger.info(f"API request - sensors/readings - Module: {module}")
-        html = dumps(sensors.get_readings(module))
-        logger.info(f"Return value: {html}")
-        return html
+    def get(self, data, log_type: str, logger: uLogger):
+        logger.info("API request - sensors/readings/%s", log_type)
+        return FileLogger().iter_log_json(log_type)
 
-class SensorData():
+class SensorQuery():
 
-    def get(self, data, log_type: str, logger: uLogger) -> str:
-        logger.info(f"API request - sensors/readings/{log_type}")
+    def get(self, data, logger: uLogger):
+        logger.info("API request - sensors/readings/query %s", data)
         try:
-            html = dumps(FileLogger().get_log(log_type))
-        except Exception as e:
-            logger.error(f"Failed to get {log_type} log: {e}")
-            html = "Failed to get log"
-        logger.info(f"Return value: {html}")
-        return html
+            start = int(data["from"]) if data.get("from") else None
+            end = int(data["to"]) if data.get("to") else None
+            resolution = min(max(int(data.get("resolution", 100)), 2), 1000)
+            return FileLogger().query_json(data.get("log", "minute"), data.get("module", ""), data.get("sensor", ""), start, end, resolution, data.get("method", "buckets"))
+        except ValueError as e:
+            logger.error(f"Invalid sensor query: {e}")
+            return {"error": str(e)}, 400
 
 class SCD30():
         
@@ -343,13 +398,13 @@ class SCD30():
             except Exception as e:
                 logger.error(f"Failed to get SCD30 automatic measurement status: {e}")
                 html = "Failed to get automatic measurement status"
-            logger.info(f"Return value: {html}")
+            logger.info("Return value: %s", html)
 
         return html
     
     def put(self, data, value, function: str, sensors: 'Sensors', logger: uLogger) -> str:
         if function == "auto_measure":
-            logger.info(f"API request - sensors/scd30/auto_measure/{value}")
+            logger.info("API request - sensors/scd30/auto_measure/%s", value)
             
             if value not in ["start", "stop"]:
                 logger.error(f"Invalid URL suffix: {value}")
@@ -367,7 +422,7 @@ class SCD30():
                 logger.error(f"Failed to start/stop SCD30 measurement: {e}")
                 html = f"Incorrect URL suffix: {value}, expected 'start' or 'stop'"
             
-            logger.info(f"Return value: {html}")
+            logger.info("Return value: %s", html)
 
         if function == "calibration":
             if not value.isdigit():
@@ -379,8 +434,8 @@ class SCD30():
             if value == 0:
                 logger.info("Setting SCD30 calibration to default value")
                 value = config.DEFAULT_CO2_CALIBRATION_VALUE
-                logger.info(f"Default calibration value: {value}")
-            logger.info(f"API request - sensors/scd30/calibration/{value}")
+                logger.info("Default calibration value: %s", value)
+            logger.info("API request - sensors/scd30/calibration/%s", value)
             
             try:
                 scd30 = sensors.configured_modules["SCD30"]
@@ -391,7 +446,7 @@ class SCD30():
                 logger.error(f"Failed to set SCD30 calibration: {e}")
                 html = f"Failed to set calibration: {e}"
             
-            logger.info(f"Return value: {html}")
+            logger.info("Return value: %s", html)
         
         return html
 
@@ -418,11 +473,15 @@ class Alarm():
             logger.info("API request - sensors/alarm/snooze_remaining")
             html = dumps(sensors.alarm.get_remaining_snooze_time_s())
 
+        elif value == 'rules':
+            logger.info("API request - sensors/alarm/rules")
+            html = dumps(sensors.alarm.get_rule_statuses())
+
         else:
             logger.error(f"Invalid URL suffix: {value}")
             html = dumps("Invalid URL suffix")
         
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         
         return html
     
@@ -430,7 +489,7 @@ class Alarm():
         logger.info("API request - PUT sensors/alarm/snooze")
         sensors.alarm.snooze_co2_alarm()
         html = dumps("Snoozed")
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
 
 class SpaceStateManagement():
@@ -441,7 +500,7 @@ class SpaceStateManagement():
         except Exception as e:
             logger.error(f"Failed to get space state: {e}")
             html = "Failed to get space state"
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
 
     def put(self, data, state: str, space_state: SpaceState, logger: uLogger) -> str:
@@ -449,7 +508,7 @@ class SpaceStateManagement():
             logger.error(f"Invalid URL suffix: {state}")
             return "Invalid URL suffix"
         
-        logger.info(f"API request - PUT sensors/space/state/{state}")
+        logger.info("API request - PUT sensors/space/state/%s", state)
         try:
             if state == "open":
                 create_task(space_state.async_virtual_press_open_button())
@@ -460,7 +519,7 @@ class SpaceStateManagement():
             logger.error(f"Failed to set space state: {e}")
             html = dumps(f"Failed to set space state: {e}")
 
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
 
 class SpaceStateConfiguration():
@@ -472,21 +531,21 @@ class SpaceStateConfiguration():
         except Exception as e:
             logger.error(f"Failed to get space state poll period: {e}")
             html = "Failed to get space state poll period"
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
 
     def put(self, data, value: str, space_state: SpaceState, logger: uLogger) -> str:
-        logger.info(f"API request - PUT /api/space/state/config/poll_period/{value}")
+        logger.info("API request - PUT /api/space/state/config/poll_period/%s", value)
         try:
             period_s = int(value)
-            logger.info(f"Setting poll period to: {period_s}")
+            logger.info("Setting poll period to: %s", period_s)
             space_state.set_space_state_poll_period(period_s)
             html = dumps("success")
         except Exception as e:
             logger.error(f"Failed to set space state poll period: {e}")
             html = dumps(f"Failed to set space state poll period: {e}")
 
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
 
 class SMIBHIDConfiguration():
@@ -512,7 +571,7 @@ class SMIBHIDConfiguration():
                         # Get the value from the config module
                         section_config[config_item] = getattr(config, config_item)
                     except AttributeError:
-                        logger.warn(f"Configuration item '{config_item}' not found in config module")
+                        logger.warn("Configuration item '%s' not found in config module", config_item)
                         section_config[config_item] = None
 
                 configuration[section_name] = section_config
@@ -522,17 +581,61 @@ class SMIBHIDConfiguration():
             logger.error(f"Failed to get configuration list: {e}")
             html = dumps({"error": f"Failed to get configuration list: {e}"})
 
-        logger.info(f"Return value: {html}")
+        logger.info("Return value: %s", html)
         return html
 
 class Logging():
-    def get(self, data, logger: uLogger, File: File) -> str:
-        logger.info("API request - GET /api/logs/read")
+    def get(self, data, logger: uLogger, File: File):
+        logger.info("API request - GET /api/logs/read %s", data)
+        try:
+            segment = int(data["segment"]) if data.get("segment") else None
+            tail_bytes = int(data.get("tail", 0))
+        except ValueError as e:
+            logger.error(f"Invalid log read request: {e}")
+            return {"error": str(e)}, 400
+        logger.info("Returning log contents")
+        return self.log_json_chunks(File.read_lines(segment, tail_bytes), logger)
+
+    def log_json_chunks(self, lines, logger: uLogger):
+        """
+        Stream log lines as a JSON object with a single log string, a batch
+        of lines per chunk.
+        """
+        yield '{"log": "'
+        batch = ""
         try:
-            log_contents = File.read_logs()
-            html = dumps({"log": log_contents})
+            for line in lines:
+                batch += line
+                if len(batch) >= LOG_CHUNK_SIZE:
+                    yield dumps(batch)[1:-1]
+                    batch = ""
         except Exception as e:
             logger.error(f"Failed to read log file: {e}")
-            html = dumps(f"Failed to read log file: {e}")
-        logger.info("Returning log contents")
+        if batch:
+            yield dumps(batch)[1:-1]
+        yield '"}'
+
+class LogSegments():
+    def get(self, data, logger: uLogger, File: File) -> str:
+        logger.info("API request - GET /api/logs/segments")
+        html = dumps(File.get_segments())
+        logger.info("Return value: %s", html)
+        return html
+
+class LogLevels():
+    def get(self, data, logger: uLogger) -> str:
+        logger.info("API request - GET /api/logs/level")
+        html = dumps(get_log_levels())
+        logger.info("Return value: %s", html)
+        return html
+
+    def put(self, data, value: str, logger: uLogger):
+        logger.info("API request - PUT /api/logs/level/%s %s", value, data)
+        try:
+            changed = set_log_level(int(value), data.get("module", ""))
+        except ValueError as e:
+            logger.error(f"Failed to set log level: {e}")
+            return {"error": str(e)}, 400
+        html = dumps(changed)
+        logger.info("Return value: %s", html)
         return html
@@ -422,7 +422,8 @@ const SECTION_ORDER = [
     'Displays',
     'RFID',
     'UI_Logging',
-    'Overclocking'
+    'Overclocking',
+    'Diagnostics'
 ];
 
 async function loadRuntimeConfiguration() {
@@ -643,7 +644,8 @@ function getSectionIcon(sectionName, isUnknown = false) {
         'Displays': '🖥️',
         'RFID': '💳',
         'UI_Logging': '📋',
-        'Overclocking': '⚡'
+        'Overclocking': '⚡',
+        'Diagnostics': '🩺'
     };
     
     // Return specific icon if known, otherwise return default or new section indicator
@@ -28,6 +28,8 @@ class Pin:
     OUT = 1 # type: int
     PULL_DOWN = 2 # type: int
     PULL_UP = 1 # type: int
+    IRQ_FALLING = 4 # type: int
+    IRQ_RISING = 8 # type: int
 
     def __init__(self, id: int|str, /, mode: int = IN, pull: int = PULL_UP) -> None:
         pass
@@ -49,6 +51,18 @@ class Pin:
         Sets the pin to high if it's currently low, and vice versa.
         """
         pass
+
+    def value(self, value: int|None = None) -> int|None:
+        """
+        Gets the pin value with no argument, or sets it to value.
+        """
+        pass
+
+    def irq(self, handler=None, trigger: int = IRQ_FALLING | IRQ_RISING, hard: bool = False) -> None:
+        """
+        Sets the pin interrupt handler.
+        """
+        pass
     
 class freq:
     def __init__(self, freq: int) -> None:
@@ -108,6 +122,37 @@ class PWM:
         """
         pass
 
+class Timer:
+    """
+    Hardware timer mock. Callbacks are not scheduled; tests call fire() to
+    run the callback of the last init().
+    """
+    ONE_SHOT = 0
+    PERIODIC = 1
+
+    def __init__(self, id: int = -1, **kwargs):
+        self.id = id
+        self.callback = None
+        self.period = None
+        self.mode = None
+        if kwargs:
+            self.init(**kwargs)
+
+    def init(self, mode: int = PERIODIC, period: int = -1, callback=None, **kwargs):
+        self.mode = mode
+        self.period = period
+        self.callback = callback
+
+    def deinit(self):
+        self.callback = None
+
+    def fire(self):
+        callback = self.callback
+        if self.mode == self.ONE_SHOT:
+            self.callback = None
+        if callback is not None:
+            callback(self)
+
 class RTC:
     """
     Real Time Clock (RTC) class to manage date and time.
@@ -198,6 +243,14 @@ def mock_ticks_ms():
     # Return a fake millisecond tick count
     return int(time.time() * 1000)
 
+def mock_ticks_us():
+    # Return a fake microsecond tick count
+    return int(time.time() * 1000000)
+
+def mock_ticks_add(ticks, delta):
+    # Simulate MicroPython's ticks_add without wraparound
+    return ticks + delta
+
 def mock_ticks_diff(a, b):
     # Simulate MicroPython's ticks_diff: returns the signed difference
     return a - b
@@ -224,6 +277,73 @@ def mock_uname():
             return f"(sysname='{self.sysname}', nodename='{self.nodename}', release='{self.release}', version='{self.version}', machine='{self.machine}')"
     return Uname()
 
+# framebuf module
+MONO_VLSB = 0
+
+class FrameBuffer:
+    """
+    MONO_VLSB frame buffer drawing into the caller's buffer. Text is drawn
+    as one column per character holding the character code, rather than a
+    font, so tests can check which bytes change.
+    """
+    def __init__(self, buffer, width: int, height: int, format: int = MONO_VLSB, stride: int | None = None) -> None:
+        self._buffer = buffer
+        self._width = width
+        self._height = height
+
+    def pixel(self, x: int, y: int, c: int | None = None):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return None if c is not None else 0
+        index = (y >> 3) * self._width + x
+        bit = 1 << (y & 7)
+        if c is None:
+            return 1 if self._buffer[index] & bit else 0
+        if c:
+            self._buffer[index] |= bit
+        else:
+            self._buffer[index] &= ~bit & 0xFF
+
+    def fill_rect(self, x: int, y: int, w: int, h: int, c: int) -> None:
+        for row in range(y, y + h):
+            for column in range(x, x + w):
+                self.pixel(column, row, c)
+
+    def fill(self, c: int) -> None:
+        self.fill_rect(0, 0, self._width, self._height, c)
+
+    def hline(self, x: int, y: int, w: int, c: int) -> None:
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x: int, y: int, h: int, c: int) -> None:
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x: int, y: int, w: int, h: int, c: int, f: bool = False) -> None:
+        if f:
+            self.fill_rect(x, y, w, h, c)
+            return
+        self.hline(x, y, w, c)
+        self.hline(x, y + h - 1, w, c)
+        self.vline(x, y, h, c)
+        self.vline(x + w - 1, y, h, c)
+
+    def line(self, x1: int, y1: int, x2: int, y2: int, c: int) -> None:
+        steps = max(abs(x2 - x1), abs(y2 - y1))
+        for step in range(steps + 1):
+            self.pixel(x1 + round((x2 - x1) * step / (steps or 1)), y1 + round((y2 - y1) * step / (steps or 1)), c)
+
+    def text(self, s: str, x: int, y: int, c: int = 1) -> None:
+        for position, character in enumerate(s):
+            code = ord(character)
+            for bit in range(8):
+                if code & (1 << bit):
+                    self.pixel(x + position * 8, y + bit, c)
+
+    def blit(self, *args) -> None:
+        pass
+
+    def scroll(self, xstep: int, ystep: int) -> None:
+        pass
+
 # micropython module
 def mock_const(x):
     return x
@@ -231,7 +351,29 @@ def mock_const(x):
 # asyncio module
 def sleep_ms(ms):
     # Simulate MicroPython asyncio's sleep_ms.
-    return None
+    return asyncio.sleep(ms / 1000)
+
+class ThreadSafeFlag:
+    """
+    Simulate MicroPython asyncio's ThreadSafeFlag with an Event that is
+    cleared when a wait returns.
+    """
+    def __init__(self):
+        self._event = asyncio.Event()
+
+    def set(self):
+        self._event.set()
+
+    def clear(self):
+        self._event.clear()
+
+    async def wait(self):
+        await self._event.wait()
+        self._event.clear()
+
+async def wait_for_ms(awaitable, timeout):
+    # Simulate MicroPython asyncio's wait_for_ms.
+    return await asyncio.wait_for(awaitable, timeout / 1000)
 
 # Assign mock functions and classes to their respective modules, creating modules if necessary
 machine = types.ModuleType('machine')
@@ -239,6 +381,7 @@ setattr(machine, 'Pin', Pin)
 setattr(machine, 'I2C', I2C)
 setattr(machine, 'PWM', PWM)
 setattr(machine, 'RTC', RTC)
+setattr(machine, 'Timer', Timer)
 setattr(machine, 'SPI', SPI)
 setattr(machine, 'freq', freq)
 
@@ -259,8 +402,13 @@ setattr(asyncio_core, 'Event', getattr(asyncio, 'Event', None))
 setattr(asyncio_core, 'create_task', getattr(asyncio, 'create_task', None))
 
 setattr(asyncio, 'sleep_ms', sleep_ms)
+setattr(asyncio, 'wait_for_ms', wait_for_ms)
+if not hasattr(asyncio, 'ThreadSafeFlag'):
+    setattr(asyncio, 'ThreadSafeFlag', ThreadSafeFlag)
 
 setattr(time, 'ticks_ms', mock_ticks_ms)
+setattr(time, 'ticks_us', mock_ticks_us)
+setattr(time, 'ticks_add', mock_ticks_add)
 setattr(time, 'ticks_diff', mock_ticks_diff)
 
 setattr(os, 'statvfs', mock_statvfs)
@@ -269,6 +417,10 @@ setattr(os, 'uname', mock_uname)
 micropython = types.ModuleType('micropython')
 setattr(micropython, 'const', mock_const)
 
+framebuf = types.ModuleType('framebuf')
+setattr(framebuf, 'FrameBuffer', FrameBuffer)
+setattr(framebuf, 'MONO_VLSB', MONO_VLSB)
+
 # Insert mocked modules into testing environment
 sys.modules['machine'] = machine
 sys.modules['uasyncio'] = asyncio
@@ -284,3 +436,4 @@ sys.modules['ujson'] = json
 sys.modules['ustruct'] = struct
 sys.modules['asyncio.core'] = asyncio_core
 sys.modules['micropython'] = micropython
+sys.modules['framebuf'] = framebuf
@@ -0,0 +1,129 @@
+import asyncio
+import pytest
+
+class FakeScreen:
+    """
+    Display driver recording the commands it draws and whether the I2C bus
+    was held at the time.
+    """
+    def __init__(self, i2c) -> None:
+        self.i2c = i2c
+        self.calls = []
+
+    def record(self, *call) -> None:
+        self.calls.append(call + (self.i2c.locked(),))
+
+    def clear(self) -> None:
+        self.record("clear")
+
+    def update_status(self, status: dict) -> None:
+        self.record("update_status", status["state"], status["errors"])
+
+    def update_co2(self, co2: str) -> None:
+        self.record("update_co2", co2)
+
+    def add_hours(self, open_for_hours: int) -> None:
+        self.record("add_hours", open_for_hours)
+
+class FakeLCD(FakeScreen):
+    pass
+
+class FakeOLED(FakeScreen):
+    pass
+
+class FakeI2C:
+    def writeto(self, addr, buf, stop=True):
+        pass
+
+@pytest.fixture()
+def display(monkeypatch):
+    import lib.displays.display
+    from lib.i2c_bus import I2CBus
+    lib.displays.display.driver_registry.register_driver("FakeLCD", FakeLCD)
+    lib.displays.display.driver_registry.register_driver("FakeOLED", FakeOLED)
+    monkeypatch.setattr(lib.displays.display, "DISPLAY_DRIVERS", ["FakeLCD", "FakeOLED"])
+    monkeypatch.setattr(lib.displays.display, "DISPLAY_FRAME_MS", 50)
+    return lib.displays.display.Display(I2CBus(FakeI2C()))
+
+def calls(display) -> tuple:
+    return tuple([call[:-1] for call in screen.calls] for screen in display.screens)
+
+def run_with_compositor(display, producer) -> None:
+    async def main():
+        task = asyncio.create_task(display.async_compositor())
+        await asyncio.sleep(0)
+        await producer()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
+
+def test_commands_run_immediately_without_compositor(display):
+    display.update_state("Open")
+    display.update_errors(["Wifi"])
+    lcd, oled = calls(display)
+    assert lcd == [("update_status", "Open", {}), ("update_status", "Open", ["Wifi"])]
+    assert oled == lcd
+
+def test_burst_is_coalesced_into_one_frame(display):
+    async def producer():
+        display.update_state("Open")
+        display.update_errors(["Wifi"])
+        for co2 in range(10):
+            display.update_co2(str(co2))
+        display.update_state("Closed")
+        await asyncio.sleep(0.01)
+        assert calls(display) == ([], [])
+        await asyncio.sleep(0.1)
+
+    run_with_compositor(display, producer)
+    expected = [("update_co2", "9"), ("update_status", "Closed", ["Wifi"])]
+    assert calls(display) == (expected, expected)
+    assert all(call[-1] for screen in display.screens for call in screen.calls)
+    assert display.i2c.get_stats()["transactions"] == 1
+
+def test_updated_region_moves_to_end_of_frame(display):
+    async def producer():
+        display.update_state("Open")
+        display.add_hours(1)
+        display.update_state("Closed")
+        await asyncio.sleep(0.1)
+
+    run_with_compositor(display, producer)
+    assert calls(display)[0] == [("add_hours", 1), ("update_status", "Closed", {})]
+
+def test_target_screen_is_captured_per_region(display):
+    async def producer():
+        display.set_screen_for_next_command("FakeOLED")
+        display.clear()
+        display.update_co2("600")
+        display.set_screen_for_next_command("FakeOLED")
+        display.update_co2("700")
+        await asyncio.sleep(0.1)
+
+    run_with_compositor(display, producer)
+    lcd, oled = calls(display)
+    assert lcd == [("update_co2", "600")]
+    assert oled == [("clear",), ("update_co2", "600"), ("update_co2", "700")]
+
+def test_frames_are_rate_limited(display):
+    async def producer():
+        display.update_co2("600")
+        await asyncio.sleep(0.07)
+        assert calls(display)[0] == [("update_co2", "600")]
+        display.update_co2("700")
+        await asyncio.sleep(0.01)
+        assert calls(display)[0] == [("update_co2", "600")]
+        await asyncio.sleep(0.07)
+
+    run_with_compositor(display, producer)
+    assert calls(display)[0] == [("update_co2", "600"), ("update_co2", "700")]
+
+def test_stopped_compositor_falls_back_to_immediate(display):
+    run_with_compositor(display, lambda: asyncio.sleep(0))
+    assert display.compositor_running is False
+    display.update_co2("600")
+    assert calls(display)[0] == [("update_co2", "600")]
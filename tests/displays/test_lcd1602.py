@@ -0,0 +1,71 @@
+import pytest
+
+class RecordingI2C:
+    """
+    Fake machine.I2C recording LCD1602 cursor moves, text and commands.
+    """
+    def __init__(self) -> None:
+        self.writes = []
+
+    def writeto(self, addr, buf):
+        buf = bytes(buf)
+        assert buf[0] == 0x80
+        self.writes.append(("cursor", buf[1]))
+
+    def writeto_mem(self, addr, memaddr, buf):
+        if memaddr == 0x40:
+            self.writes.append(("text", bytes(buf)))
+        else:
+            self.writes.append(("command", ord(buf)))
+
+@pytest.fixture()
+def lcd(monkeypatch):
+    import lib.displays.display  # noqa: F401 - LCD1602 imports display, which must be loaded first
+    import lib.displays.LCD1602
+    monkeypatch.setattr(lib.displays.LCD1602, "sleep", lambda seconds: None)
+    i2c = RecordingI2C()
+    lcd = lib.displays.LCD1602.LCD1602(i2c)
+    lcd.print_on_line(0, "ABCDEFGHIJKLMNOP")
+    i2c.writes = []
+    return lcd, i2c
+
+def test_unchanged_text_sends_nothing(lcd):
+    lcd, i2c = lcd
+    lcd.print_on_line(0, "ABCDEFGHIJKLMNOP")
+    lcd.print_on_line(1, "")
+    assert i2c.writes == []
+
+def test_changed_character_sends_one_byte(lcd):
+    lcd, i2c = lcd
+    lcd.print_on_line(0, "ABCDEFGHIJKLMNOz")
+    lcd.print_on_line(1, "a")
+    assert i2c.writes == [("cursor", 0x80 | 15), ("text", b"z"), ("cursor", 0xC0), ("text", b"a")]
+    assert lcd.shadow == [bytearray(b"ABCDEFGHIJKLMNOz"), bytearray(b"a" + b" " * 15)]
+
+def test_runs_within_max_run_gap_are_joined(lcd):
+    from lib.displays.LCD1602 import MAX_RUN_GAP
+    lcd, i2c = lcd
+    assert MAX_RUN_GAP == 3
+    lcd.print_on_line(0, "AbCDEfGHIJKLMNOP")
+    assert i2c.writes == [("cursor", 0x80 | 1), ("text", b"bCDEf")]
+
+def test_runs_further_apart_are_sent_separately(lcd):
+    lcd, i2c = lcd
+    lcd.print_on_line(0, "AbCDEFgHIJKLMNOP")
+    assert i2c.writes == [("cursor", 0x80 | 1), ("text", b"b"), ("cursor", 0x80 | 6), ("text", b"g")]
+    assert lcd.shadow[0] == bytearray(b"AbCDEFgHIJKLMNOP")
+
+def test_printout_continues_from_cursor_and_drops_overflow(lcd):
+    lcd, i2c = lcd
+    lcd.setCursor(14, 0)
+    lcd.printout("xyz")
+    assert i2c.writes == [("cursor", 0x80 | 14), ("text", b"xy")]
+    assert lcd.cursor_col == 17
+
+def test_clear_resets_shadow(lcd):
+    lcd, i2c = lcd
+    lcd.clear()
+    assert i2c.writes == [("command", 0x01)]
+    assert lcd.shadow == [bytearray(b" " * 16), bytearray(b" " * 16)]
+    lcd.print_on_line(0, "AB")
+    assert i2c.writes[1:] == [("cursor", 0x80), ("text", b"AB")]
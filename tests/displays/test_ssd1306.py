@@ -0,0 +1,77 @@
+import pytest
+
+class RecordingI2C:
+    """
+    Fake machine.I2C splitting SSD1306 writes into commands and data.
+    """
+    def __init__(self) -> None:
+        self.commands = []
+        self.data = []
+
+    def writeto(self, addr, buf, stop=True):
+        buf = bytes(buf)
+        if buf[0] == 0x80:
+            self.commands.append(buf[1])
+        else:
+            self.data.append(buf)
+
+    def clear(self) -> None:
+        self.commands = []
+        self.data = []
+
+@pytest.fixture()
+def make_display(monkeypatch):
+    import lib.displays.SSD1306
+    monkeypatch.setattr(lib.displays.SSD1306.supervisor, "start", lambda *args, **kwargs: None)
+
+    def make(page_addressing: bool = False):
+        i2c = RecordingI2C()
+        display = lib.displays.SSD1306.SSD1306(i2c, page_addressing=page_addressing)
+        i2c.clear()
+        return display, i2c
+
+    return make
+
+def test_show_sends_nothing_when_unchanged(make_display):
+    display, i2c = make_display()
+    display.show()
+    assert i2c.commands == []
+    assert i2c.data == []
+
+def test_full_fill_sends_whole_framebuffer(make_display):
+    display, i2c = make_display()
+    display.fill(1)
+    display.show()
+    assert i2c.commands == [0x21, 0, 127, 0x22, 0, 3]
+    assert i2c.data == [b"\x40" + b"\xff" * 512]
+
+def test_update_co2_sends_top_two_pages(make_display):
+    display, i2c = make_display()
+    display.update_co2("612")
+    assert i2c.commands == [0x21, 0, 127, 0x22, 0, 1]
+    assert len(i2c.data) == 1
+    assert i2c.data[0] == b"\x40" + bytes(display.buffer[1:257])
+    assert i2c.data[0][1] == ord("C")
+    assert i2c.data[0][1 + 128 + 1:] == bytes(127)
+
+    display.show()
+    assert len(i2c.data) == 1
+
+def test_pixels_send_bounding_window(make_display):
+    display, i2c = make_display()
+    display.pixel(10, 20, 1)
+    display.pixel(12, 27, 1)
+    display.show()
+    assert i2c.commands == [0x21, 10, 12, 0x22, 2, 3]
+    # Columns 10 to 12 of page 2, then of page 3
+    assert i2c.data == [b"\x40" + b"\x10\x00\x00" + b"\x00\x00\x08"]
+
+def test_page_addressing_offsets_start_column(make_display):
+    display, i2c = make_display(page_addressing=True)
+    display.pixel(10, 20, 1)
+    display.pixel(12, 20, 1)
+    display.show()
+    # Column 0 starts at 64 with the default page column start, as before
+    # partial updates
+    assert i2c.commands == [0xB2, 0x0A, 0x14]
+    assert i2c.data == [b"\x40\x10\x00\x10"]
@@ -0,0 +1,79 @@
+import pytest
+
+START = 1718000000
+
+def evaluate_series(rule, values: list, step: int = 60) -> list:
+    states = []
+    for index, value in enumerate(values):
+        rule.evaluate(value, START + index * step)
+        states.append(rule.active)
+    return states
+
+def test_threshold_rule_hysteresis():
+    from lib.sensors.alarm_rules import AlarmRule
+    rule = AlarmRule("CO2", "SCD30", "co2", 1000, 800)
+    states = evaluate_series(rule, [700, 999, 1000, 900, 801, 800, 900, 1200])
+    assert states == [False, False, True, True, True, False, False, True]
+
+def test_rule_ignores_missing_and_zero_values():
+    from lib.sensors.alarm_rules import AlarmRule
+    rule = AlarmRule("CO2", "SCD30", "co2", 1000, 800, ignore_zero=True)
+    states = evaluate_series(rule, [1100, None, 0, 700])
+    assert states == [True, True, True, False]
+
+def test_sustained_rule_waits_for_duration():
+    from lib.sensors.alarm_rules import AlarmRule
+    rule = AlarmRule("Hot", "BME280", "temperature", 30, 28, sustain_s=120)
+    states = evaluate_series(rule, [31, 31, 29, 31, 31, 31, 29, 27])
+    assert states == [False, False, False, False, False, True, True, False]
+
+def test_rate_rule_triggers_on_fast_rise():
+    from lib.sensors.alarm_rules import AlarmRule
+    rule = AlarmRule("CO2 rising", "SCD30", "co2", rate_per_min=50)
+    states = evaluate_series(rule, [500, 520, 600, 680, 690, 650])
+    assert states == [False, False, True, True, False, False]
+    assert rule.get_status()["rate_per_min"] == -40
+
+def test_rule_needs_threshold_or_rate():
+    from lib.sensors.alarm_rules import AlarmRule
+    with pytest.raises(ValueError):
+        AlarmRule.from_dict({"module": "SCD30", "sensor": "co2"})
+
+@pytest.fixture()
+def silence_window():
+    def make(start_hour, end_hour, offset_s: int = 0):
+        from lib.sensors.alarm_rules import SilenceWindow
+        window = SilenceWindow(start_hour, end_hour)
+        window._utc_offset_s = lambda now: offset_s
+        return window
+    return make
+
+def midnight_utc() -> int:
+    return START - START % 86400
+
+@pytest.mark.parametrize("start_hour, end_hour", [(22, 8), (9, 17), (0, 23)])
+def test_silence_window_matches_hourly_check(silence_window, start_hour: int, end_hour: int):
+    window = silence_window(start_hour, end_hour)
+    for minute in range(0, 48 * 60, 7):
+        now = midnight_utc() + minute * 60
+        hour = (minute // 60) % 24
+        if start_hour < end_hour:
+            expected = start_hour <= hour < end_hour
+        else:
+            expected = hour >= start_hour or hour <= end_hour
+        assert window.active(now) == expected
+
+def test_silence_window_only_recompiles_at_transitions(silence_window):
+    window = silence_window(22, 8, offset_s=3600)
+    compiles = []
+    compile = window.compile
+    window.compile = lambda now: (compiles.append(now), compile(now))
+    for minute in range(0, 24 * 60):
+        window.active(midnight_utc() + minute * 60)
+    assert len(compiles) <= 4
+    window = silence_window(22, 8, offset_s=3600)
+    assert window.active(midnight_utc() + 20 * 3600 + 59 * 60) is False
+    assert window.active(midnight_utc() + 21 * 3600) is True
+
+def test_disabled_silence_window(silence_window):
+    assert silence_window(None, None).active(START) is False
@@ -0,0 +1,73 @@
+from json import dumps
+
+CHANNELS = [("SCD30", "co2"), ("SCD30", "temperature"), ("SCD30", "relative_humidity"), ("BME280", "pressure")]
+UNITS = {"SCD30": {"co2": "ppm", "temperature": "C", "relative_humidity": "%RH"}, "BME280": {"pressure": "hPa"}}
+
+def make_readings(count: int) -> list:
+    readings = []
+    for minute in range(count):
+        data = {"SCD30": {"co2": 600.0 + minute % 7, "temperature": round(21.5 + minute % 4 * 0.1, 1), "relative_humidity": 45.27}}
+        if minute % 3:
+            data["BME280"] = {"pressure": 1013.25}
+        readings.append({"timestamp": 1718000000 + minute * 60, "human_timestamp": "2024-06-10T06:13:20Z", "data": data})
+    return readings
+
+def strip_human_timestamps(readings: list) -> list:
+    return [{"timestamp": reading["timestamp"], "data": reading["data"]} for reading in readings]
+
+def test_round_trip_with_schema():
+    from lib.sensors.compact_payload import CompactPayload
+    compact = CompactPayload(CHANNELS, UNITS)
+    readings = make_readings(10)
+
+    payload = compact.encode(readings)
+    assert payload["timestamps"] == {"start": 1718000000, "deltas": [[60, 9]]}
+
+    decoded = CompactPayload([], {}).decode(payload)
+    assert decoded["units"] == UNITS
+    assert decoded["readings"] == strip_human_timestamps(readings)
+
+def test_round_trip_without_schema_uses_known_schema():
+    from lib.sensors.compact_payload import CompactPayload
+    compact = CompactPayload(CHANNELS, UNITS)
+    readings = make_readings(5)
+
+    payload = compact.encode(readings, include_schema=False)
+    assert "channels" not in payload
+    assert "units" not in payload
+    assert CompactPayload(CHANNELS, UNITS).decode(payload)["readings"] == strip_human_timestamps(readings)
+
+def test_irregular_timestamps_round_trip():
+    from lib.sensors.compact_payload import CompactPayload
+    compact = CompactPayload(CHANNELS, UNITS)
+    readings = make_readings(6)
+    readings[2]["timestamp"] += 5
+    readings[5]["timestamp"] += 3600
+
+    payload = compact.encode(readings)
+    assert payload["timestamps"]["deltas"] == [[60, 1], [65, 1], [55, 1], [60, 1], [3660, 1]]
+    assert compact.decode(payload)["readings"] == strip_human_timestamps(readings)
+
+def test_empty_readings_round_trip():
+    from lib.sensors.compact_payload import CompactPayload
+    compact = CompactPayload(CHANNELS, UNITS)
+    assert compact.decode(compact.encode([]))["readings"] == []
+
+def test_unknown_schema_id_is_rejected():
+    import pytest
+    from lib.sensors.compact_payload import CompactPayload
+    payload = CompactPayload(CHANNELS, UNITS).encode(make_readings(2), include_schema=False)
+    with pytest.raises(ValueError):
+        CompactPayload(CHANNELS[:2], UNITS).decode(payload)
+
+def test_schema_id_is_stable_and_schema_dependent():
+    from lib.sensors.compact_payload import CompactPayload
+    assert CompactPayload(CHANNELS, UNITS).schema_id == CompactPayload(list(CHANNELS), dict(UNITS)).schema_id
+    assert CompactPayload(CHANNELS, UNITS).schema_id != CompactPayload(CHANNELS[:3], UNITS).schema_id
+
+def test_backlog_payload_is_much_smaller():
+    from lib.sensors.compact_payload import CompactPayload
+    readings = make_readings(1440)
+    verbose = dumps({"units": UNITS, "readings": readings})
+    compact = dumps(CompactPayload(CHANNELS, UNITS).encode(readings, include_schema=False))
+    assert len(compact) * 10 < len(verbose)
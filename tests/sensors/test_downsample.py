@@ -0,0 +1,69 @@
+import pytest
+from math import sin
+
+def make_series(count: int, start: int = 1718000000, step: int = 60) -> list:
+    return [(start + index * step, round(600 + 150 * sin(index / 7) + (index % 5) * 3, 1)) for index in range(count)]
+
+def reference_lttb(points: list, threshold: int) -> list:
+    """
+    List based Largest Triangle Three Buckets for comparison with the
+    streaming implementation.
+    """
+    if threshold < 3 or len(points) <= threshold:
+        return [list(point) for point in points]
+    bucket_size = (len(points) - 2) / (threshold - 2)
+    buckets = [[] for _ in range(threshold - 2)]
+    for index, point in enumerate(points[1:-1]):
+        buckets[min(int(index / bucket_size), threshold - 3)].append(point)
+    buckets = [bucket for bucket in buckets if bucket]
+    selected = [points[0]]
+    for index, bucket in enumerate(buckets):
+        if index + 1 < len(buckets):
+            following = buckets[index + 1]
+            following = (sum(p[0] for p in following) / len(following), sum(p[1] for p in following) / len(following))
+        else:
+            following = points[-1]
+        previous = selected[-1]
+        selected.append(max(bucket, key=lambda p: abs((previous[0] - following[0]) * (p[1] - previous[1]) - (previous[0] - p[0]) * (following[1] - previous[1]))))
+    selected.append(points[-1])
+    return [list(point) for point in selected]
+
+@pytest.mark.parametrize("count, threshold", [(1440, 100), (250, 7), (101, 100), (50, 100), (1000, 3)])
+def test_lttb_matches_reference(count: int, threshold: int):
+    from lib.sensors.downsample import Downsampler
+    series = make_series(count)
+    result = list(Downsampler(threshold).lttb(iter(series), count))
+    assert result == reference_lttb(series, threshold)
+    assert len(result) == min(count, threshold)
+
+def test_lttb_skips_missing_values():
+    from lib.sensors.downsample import Downsampler
+    series = make_series(300)
+    with_gaps = [(timestamp, None if index % 10 == 3 else value) for index, (timestamp, value) in enumerate(series)]
+    result = list(Downsampler(20).lttb(iter(with_gaps), len(with_gaps)))
+    assert result[0] == list(series[0])
+    assert result[-1] == list(series[-1])
+    assert len(result) <= 20
+    assert all(value is not None for _, value in result)
+
+def test_buckets_min_avg_max():
+    from lib.sensors.downsample import Downsampler
+    series = make_series(120)
+    start = series[0][0]
+    end = series[-1][0]
+    result = list(Downsampler(10).buckets(iter(series + [(end + 60, None)]), start, end))
+    assert len(result) == 10
+    width = result[1][0] - result[0][0]
+    for bucket_start, minimum, average, maximum in result:
+        values = [value for timestamp, value in series if bucket_start <= timestamp < bucket_start + width]
+        assert minimum == min(values)
+        assert maximum == max(values)
+        assert average == pytest.approx(sum(values) / len(values), abs=0.01)
+
+def test_buckets_respect_time_range():
+    from lib.sensors.downsample import Downsampler
+    series = make_series(100)
+    start = series[20][0]
+    end = series[39][0]
+    result = list(Downsampler(100).buckets(iter(series), start, end))
+    assert [bucket[0] for bucket in result] == [timestamp for timestamp, _ in series[20:40]]
@@ -0,0 +1,48 @@
+import os
+from json import dumps
+
+CHANNELS = [("SCD30", "co2"), ("BME280", "pressure")]
+
+def legacy_entry(timestamp: int, data: dict) -> str:
+    return dumps({"timestamp": timestamp, "human_timestamp": "", "data": data}) + "\n"
+
+def open_file_logger(path: str):
+    from lib.sensors.file_logging import FileLogger, MINUTE_FIELDS, HOUR_FIELDS
+    from lib.sensors.ring_log import RingLog
+    file_logger = FileLogger()
+    file_logger.minute_log = RingLog(f"{path}/minute_log.bin")
+    file_logger.hour_log = RingLog(f"{path}/hour_log.bin")
+    file_logger.minute_log.open(CHANNELS, MINUTE_FIELDS, 4096)
+    file_logger.hour_log.open(CHANNELS, HOUR_FIELDS, 4096)
+    return file_logger
+
+def test_legacy_logs_imported_oldest_first_then_removed(tmp_path):
+    with open(f"{tmp_path}/minute_log2.txt", "w") as f:
+        f.write(legacy_entry(1000, {"SCD30": {"co2": 600.0}}))
+        f.write(legacy_entry(1060, {"SCD30": {"co2": 610.0}, "BME280": {"pressure": 1013.0}}))
+    with open(f"{tmp_path}/minute_log.txt", "w") as f:
+        f.write(legacy_entry(1120, {"SCD30": {"co2": 620.0}}))
+        f.write("not json\n")
+    with open(f"{tmp_path}/hour_log.txt", "w") as f:
+        f.write(legacy_entry(3600, {"SCD30": {"co2": {"avg": 610.0, "max": 620.0, "min": 600.0}}}))
+    with open(f"{tmp_path}/hour_log2.txt", "w") as f:
+        f.write("")
+
+    file_logger = open_file_logger(tmp_path)
+    file_logger.migrate_legacy_logs(f"{tmp_path}/")
+
+    assert list(file_logger.minute_log.read()) == [(1000, (600.0, None)), (1060, (610.0, 1013.0)), (1120, (620.0, None))]
+    assert list(file_logger.hour_log.read()) == [(3600, (610.0, 620.0, 600.0, None, None, None))]
+    assert sorted(os.listdir(tmp_path)) == ["hour_log.bin", "minute_log.bin"]
+
+def test_legacy_logs_kept_when_ring_log_not_open(tmp_path):
+    from lib.sensors.file_logging import FileLogger
+    from lib.sensors.ring_log import RingLog
+    with open(f"{tmp_path}/minute_log.txt", "w") as f:
+        f.write(legacy_entry(1000, {"SCD30": {"co2": 600.0}}))
+
+    file_logger = FileLogger()
+    file_logger.minute_log = RingLog(f"{tmp_path}/minute_log.bin")
+    file_logger.migrate_legacy_logs(f"{tmp_path}/")
+
+    assert os.listdir(tmp_path) == ["minute_log.txt"]
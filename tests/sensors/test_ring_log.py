@@ -0,0 +1,44 @@
+import os
+
+CHANNELS = [("SCD30", "co2"), ("BME280", "pressure")]
+
+def open_log(path: str, max_size: int = 1024):
+    from lib.sensors.ring_log import RingLog
+    ring_log = RingLog(path)
+    ring_log.open(CHANNELS, ["value"], max_size)
+    return ring_log
+
+def test_create_preallocates_file(tmp_path):
+    path = f"{tmp_path}/minute_log.bin"
+    ring_log = open_log(path, 5000)
+    assert ring_log.capacity == (5000 - ring_log.data_offset) // ring_log.record_size
+    assert os.path.getsize(path) == ring_log.data_offset + ring_log.capacity * ring_log.record_size
+    assert list(ring_log.read()) == []
+
+def test_records_wrap_and_range_reads(tmp_path):
+    path = f"{tmp_path}/minute_log.bin"
+    ring_log = open_log(path, 200)
+    for minute in range(ring_log.capacity + 3):
+        ring_log.append(1000 + minute * 60, [600.0 + minute, None])
+
+    reloaded = open_log(path, 200)
+    records = list(reloaded.read())
+    assert len(records) == reloaded.capacity
+    assert records[-1] == (1000 + (reloaded.capacity + 2) * 60, (600.0 + reloaded.capacity + 2, None))
+    start, end = records[1][0], records[3][0]
+    assert [record[0] for record in reloaded.read(start, end)] == [start, start + 60, end]
+    assert reloaded.count_range(start, end) == 3
+
+def test_backwards_timestamp_is_dropped(tmp_path):
+    path = f"{tmp_path}/minute_log.bin"
+    ring_log = open_log(path)
+    ring_log.append(2000, [600.0, 1013.0])
+    ring_log.append(2060, [610.0, 1013.0])
+
+    reloaded = open_log(path)
+    assert reloaded.append(60, [620.0, 1013.0]) is False
+    assert reloaded.append(120, [625.0, 1013.0]) is False
+    assert reloaded.append(2120, [630.0, 1013.0]) is True
+    assert reloaded.append(2180, [640.0, 1013.0]) is True
+    assert list(reloaded.read()) == [(2000, (600.0, 1013.0)), (2060, (610.0, 1013.0)), (2120, (630.0, 1013.0)), (2180, (640.0, 1013.0))]
+    assert reloaded.count_range(2100) == 2
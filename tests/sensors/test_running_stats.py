@@ -0,0 +1,65 @@
+import pytest
+
+MINUTE_READINGS = [
+    {"SCD30": {"co2": 612.3, "temperature": 21.6, "relative_humidity": 45.7}, "BME280": {"pressure": 1013.25}},
+    {"SCD30": {"co2": 655.1, "temperature": 21.9, "relative_humidity": 44.2}, "BME280": {"pressure": 1012.8}},
+    {"SCD30": {"co2": 598.0, "temperature": 22.4, "relative_humidity": 46.1}},
+    {"SCD30": {"co2": 701.7, "temperature": 22.1, "relative_humidity": None}, "BME280": {"pressure": 1013.1}},
+    ]
+
+@pytest.fixture()
+def file_logger():
+    from lib.sensors.file_logging import FileLogger
+    return FileLogger()
+
+def collect_value_lists(minute_readings: list) -> dict:
+    hour_data = {}
+    for readings in minute_readings:
+        for module, sensors in readings.items():
+            for sensor, value in sensors.items():
+                if value is not None:
+                    hour_data.setdefault(module, {}).setdefault(sensor, []).append(value)
+    return hour_data
+
+def assert_equivalent(summary: dict, expected: dict) -> None:
+    """
+    Averages may differ in the last rounded digit where sum() uses
+    compensated float summation.
+    """
+    assert summary.keys() == expected.keys()
+    for module, sensors in expected.items():
+        assert summary[module].keys() == sensors.keys()
+        for sensor, values in sensors.items():
+            assert summary[module][sensor]["max"] == values["max"]
+            assert summary[module][sensor]["min"] == values["min"]
+            assert summary[module][sensor]["avg"] == pytest.approx(values["avg"], abs=0.01)
+
+def test_running_stats_aggregates():
+    from lib.sensors.running_stats import RunningStats
+    stats = RunningStats()
+    assert stats.summary() is None
+    assert stats.variance() is None
+    for value in [2, 4, 4, 4, 5, 5, 7, 9]:
+        stats.add(value)
+    assert stats.count == 8
+    assert stats.total == 40
+    assert stats.minimum == 2
+    assert stats.maximum == 9
+    assert stats.mean == pytest.approx(5)
+    assert stats.variance() == pytest.approx(32 / 7)
+    stats.reset()
+    assert stats.count == 0
+    assert stats.summary() is None
+
+def test_hour_stats_match_process_hour_data_values(file_logger):
+    for readings in MINUTE_READINGS:
+        file_logger.update_hour_stats(readings)
+
+    expected = file_logger.process_hour_data_values(collect_value_lists(MINUTE_READINGS))
+    assert_equivalent(file_logger.summarise_hour_stats(), expected)
+
+def test_hour_stats_match_for_single_reading(file_logger):
+    file_logger.update_hour_stats(MINUTE_READINGS[0])
+
+    expected = file_logger.process_hour_data_values(collect_value_lists(MINUTE_READINGS[:1]))
+    assert_equivalent(file_logger.summarise_hour_stats(), expected)
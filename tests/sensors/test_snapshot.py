@@ -0,0 +1,88 @@
+import asyncio
+import pytest
+
+class FakeModule:
+    def __init__(self, sensors: list, reading: dict) -> None:
+        self.sensors = [{"name": name, "unit": "u"} for name in sensors]
+        self.reading = reading
+        self.reads = 0
+
+    def get_sensors(self) -> list:
+        return self.sensors
+
+    async def async_get_reading(self) -> dict:
+        self.reads += 1
+        await asyncio.sleep(0.01)
+        return dict(self.reading)
+
+@pytest.fixture()
+def schema():
+    from lib.sensors.schema import SensorSchema
+    return SensorSchema({
+        "SCD30": FakeModule(["co2", "temperature"], {}),
+        "BME280": FakeModule(["pressure"], {}),
+        })
+
+def test_empty_snapshot():
+    from lib.sensors.snapshot import ReadingsSnapshot
+    snapshot = ReadingsSnapshot()
+    assert snapshot.is_empty()
+    assert snapshot.get_readings() == {}
+    assert snapshot.get_value("SCD30", "co2") is None
+    assert snapshot.age_s() is None
+
+def test_snapshot_is_isolated_from_later_updates(schema):
+    from lib.sensors.snapshot import ReadingsSnapshot
+    values = [612.0, 21.5, None]
+    snapshot = ReadingsSnapshot.capture(schema, values)
+    values[0] = 700.0
+    assert snapshot.values == (612.0, 21.5, None)
+    assert snapshot.get_value("SCD30", "co2") == 612.0
+    assert snapshot.get_value("SCD30", "missing") is None
+    assert snapshot.age_s() is not None
+
+def test_snapshot_readings_are_built_on_first_use(schema):
+    from lib.sensors.snapshot import ReadingsSnapshot
+    snapshot = ReadingsSnapshot.capture(schema, [612.0, None, 1013.2])
+    assert snapshot._readings is None
+    assert snapshot.get_readings() == {"SCD30": {"co2": 612.0}, "BME280": {"pressure": 1013.2}}
+    assert snapshot.get_readings("BME280") == {"BME280": {"pressure": 1013.2}}
+    assert snapshot.get_readings("SGP30") == {}
+    assert snapshot.readings is snapshot.readings
+
+@pytest.fixture()
+def sensors():
+    from lib.sensors import Sensors
+    from lib.sensors.schema import SensorSchema
+    from lib.sensors.snapshot import ReadingsSnapshot
+    from lib.i2c_bus import I2CBus
+    from lib.ulogging import get_logger
+
+    class DisabledAlarm:
+        enabled = False
+
+    sensors = Sensors.__new__(Sensors)
+    sensors.log = get_logger("Sensors")
+    sensors.i2c = I2CBus(None)
+    sensors.alarm = DisabledAlarm()
+    sensors.configured_modules = {"BME280": FakeModule(["pressure"], {"pressure": 1013.2})}
+    sensors.schema = SensorSchema(sensors.configured_modules)
+    sensors.latest_values = sensors.schema.new_values()
+    sensors.snapshot = ReadingsSnapshot()
+    sensors._refresh_event = None
+    return sensors
+
+def test_concurrent_refreshes_share_one_poll(sensors):
+    module = sensors.configured_modules["BME280"]
+
+    async def main():
+        return await asyncio.gather(*(sensors.async_refresh_snapshot() for _ in range(3)))
+
+    snapshots = asyncio.run(main())
+    assert module.reads == 1
+    assert all(snapshot is snapshots[0] for snapshot in snapshots)
+    assert snapshots[0].get_readings() == {"BME280": {"pressure": 1013.2}}
+    assert sensors._refresh_event is None
+
+    asyncio.run(sensors.async_refresh_snapshot())
+    assert module.reads == 2
@@ -0,0 +1,131 @@
+import os
+import pytest
+
+def entry(number: int) -> dict:
+    return {"timestamp": 1718000000 + number * 60, "data": {"SCD30": {"co2": 600.0 + number}}}
+
+@pytest.fixture()
+def queue_path(tmp_path):
+    return f"{tmp_path}/upload_queue/"
+
+def open_queue(path: str, max_size: int = 8192):
+    from lib.sensors.upload_queue import UploadQueue
+    queue = UploadQueue(path, max_size)
+    queue.init()
+    return queue
+
+def segment_files(path: str) -> list:
+    return sorted(file for file in os.listdir(path) if file.endswith(".seg"))
+
+def test_commit_acknowledges_pushed_entries(queue_path):
+    queue = open_queue(queue_path)
+    for number in range(5):
+        queue.append(entry(number))
+
+    entries, cursor = queue.read_batch(3)
+    assert entries == [entry(0), entry(1), entry(2)]
+    queue.commit(cursor)
+
+    entries, cursor = queue.read_batch(10)
+    assert entries == [entry(3), entry(4)]
+    queue.commit(cursor)
+    assert queue.pending() is False
+    assert open_queue(queue_path).read_batch(10)[0] == []
+
+def test_crash_between_push_and_commit_resends_batch(queue_path):
+    queue = open_queue(queue_path)
+    for number in range(4):
+        queue.append(entry(number))
+    queue.commit(queue.read_batch(1)[1])
+
+    entries, cursor = queue.read_batch(2)
+    assert entries == [entry(1), entry(2)]
+
+    reloaded = open_queue(queue_path)
+    assert reloaded.read_batch(2) == (entries, cursor)
+    reloaded.commit(cursor)
+    assert open_queue(queue_path).read_batch(10)[0] == [entry(3)]
+
+def test_crash_during_cursor_commit_keeps_previous_cursor(queue_path):
+    queue = open_queue(queue_path)
+    for number in range(3):
+        queue.append(entry(number))
+    queue.commit(queue.read_batch(1)[1])
+    with open(queue_path + "cursor.tmp", "w") as f:
+        f.write('{"segm')
+
+    assert open_queue(queue_path).read_batch(10)[0] == [entry(1), entry(2)]
+
+def test_segments_roll_over_and_acknowledged_segments_are_deleted(queue_path):
+    queue = open_queue(queue_path)
+    assert queue.segment_size == 1024
+    for number in range(40):
+        queue.append(entry(number))
+    files = segment_files(queue_path)
+    assert len(files) > 1
+    assert all(os.path.getsize(queue_path + file) < 1024 + 100 for file in files)
+
+    entries, cursor = queue.read_batch(40)
+    assert entries == [entry(number) for number in range(40)]
+    queue.commit(cursor)
+    assert segment_files(queue_path) == files[-1:]
+    assert queue.pending() is False
+
+def test_oldest_segments_dropped_over_budget(queue_path):
+    queue = open_queue(queue_path, 2048)
+    for number in range(100):
+        queue.append(entry(number))
+
+    assert queue.size() <= 2048
+    assert len(segment_files(queue_path)) == len(queue.segments)
+    entries = queue.read_batch(100)[0]
+    assert entries[0] != entry(0)
+    assert entries[-1] == entry(99)
+    assert entries == [entry(number) for number in range(100 - len(entries), 100)]
+    assert open_queue(queue_path, 2048).read_batch(100)[0] == entries
+
+def test_partial_line_is_terminated_after_crash(queue_path):
+    queue = open_queue(queue_path)
+    queue.append(entry(0))
+    with open(queue._segment_file(queue.segments[-1]), "ab") as f:
+        f.write(b'{"timestamp": 17180')
+
+    reloaded = open_queue(queue_path)
+    reloaded.append(entry(1))
+    assert reloaded.read_batch(10)[0] == [entry(0), entry(1)]
+
+def test_import_lines_skips_corrupt_entries(queue_path, tmp_path):
+    from json import dumps
+    cache_file = f"{tmp_path}/smib_cache.txt"
+    with open(cache_file, "w") as f:
+        f.write(dumps(entry(0)) + "\n\nnot json\n" + dumps(entry(1)) + "\n")
+
+    queue = open_queue(queue_path)
+    assert queue.import_lines(cache_file) == 2
+    assert queue.read_batch(10)[0] == [entry(0), entry(1)]
+
+def test_smib_cache_migrated_to_queue(queue_path, tmp_path):
+    from json import dumps
+    from lib.sensors import Sensors
+    from lib.ulogging import get_logger
+    cache_file = f"{tmp_path}/smib_cache.txt"
+    with open(cache_file, "w") as f:
+        f.write(dumps(entry(0)) + "\n" + dumps(entry(1)) + "\n")
+
+    class CacheFileLogger:
+        smib_cache_file = cache_file
+
+        def check_for_smib_cache(self) -> bool:
+            return os.path.exists(cache_file)
+
+        def delete_smib_cache(self) -> None:
+            os.remove(cache_file)
+
+    sensors = Sensors.__new__(Sensors)
+    sensors.log = get_logger("Sensors")
+    sensors.file_logger = CacheFileLogger()
+    sensors.upload_queue = open_queue(queue_path)
+    sensors.migrate_smib_cache()
+
+    assert not os.path.exists(cache_file)
+    assert open_queue(queue_path).read_batch(10)[0] == [entry(0), entry(1)]
@@ -0,0 +1,98 @@
+import pytest
+from asyncio import Event
+
+class FakePin:
+    def __init__(self, level: int = 1):
+        self.level = level
+
+    def value(self):
+        return self.level
+
+@pytest.fixture()
+def button(monkeypatch):
+    import lib.button
+    clock = {"now": 1000}
+    monkeypatch.setattr(lib.button, "ticks_ms", lambda: clock["now"])
+    events = []
+    button = lib.button.Button(2, "Test button", Event(), lambda event, count: events.append((event, count)))
+    button.pin = FakePin()
+    button.stable_level = 1
+
+    def edge(at_ms: int, level: int) -> None:
+        clock["now"] = at_ms
+        button.pin.level = level
+        button._irq_handler(button.pin)
+
+    def process(at_ms: int) -> None:
+        clock["now"] = at_ms
+        button.process(at_ms)
+
+    button.test_edge = edge
+    button.test_process = process
+    button.test_events = events
+    return button
+
+def test_bouncing_press_and_release(button):
+    for offset, level in enumerate([0, 1, 0, 1, 0]):
+        button.test_edge(2000 + offset, level)
+    button.test_process(2005)
+    assert button.test_events == []
+    assert button.next_timeout_ms(2005) == 19
+    button.test_process(2024)
+    assert button.test_events == [("press", 1)]
+    assert button.button_pressed.is_set()
+    assert button.pressed is True
+
+    button.test_edge(2100, 1)
+    button.test_edge(2102, 0)
+    button.test_edge(2104, 1)
+    button.test_process(2104)
+    button.test_process(2123)
+    assert button.pressed is True
+    button.test_process(2124)
+    assert button.test_events == [("press", 1), ("release", 1)]
+
+def test_short_glitch_is_ignored(button):
+    button.test_edge(2000, 0)
+    button.test_edge(2005, 1)
+    button.test_process(2005)
+    button.test_process(2025)
+    assert button.pressed is False
+    assert not button.button_pressed.is_set()
+    assert button.test_events == []
+    assert button.next_timeout_ms(2025) is None
+
+def test_long_press(button):
+    button.test_edge(2000, 0)
+    button.test_process(2000)
+    button.test_process(2020)
+    assert button.next_timeout_ms(2020) == 980
+    button.test_process(3000)
+    button.test_edge(3500, 1)
+    button.test_process(3500)
+    button.test_process(3520)
+    assert button.test_events == [("press", 1), ("long_press", 1), ("release", 0)]
+    assert button.next_timeout_ms(3520) is None
+
+def test_multi_click(button):
+    for start in (2000, 2200, 2400):
+        button.test_edge(start, 0)
+        button.test_process(start + 20)
+        button.test_edge(start + 80, 1)
+        button.test_process(start + 100)
+    button.test_process(2700)
+    assert ("multi_click", 3) not in button.test_events
+    button.test_process(2880)
+    assert button.test_events[-1] == ("multi_click", 3)
+    assert button.click_count == 0
+    assert button.next_timeout_ms(2880) is None
+
+def test_continuous_bounce_waits_for_settle(button):
+    for offset in range(31):
+        button.test_edge(2000 + offset, offset % 2)
+        button.test_process(2000 + offset)
+    button.test_process(2049)
+    assert button.test_events == []
+    button.test_process(2050)
+    assert button.test_events == [("press", 1)]
+    assert button.press_time == 2030
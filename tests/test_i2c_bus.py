@@ -0,0 +1,103 @@
+import asyncio
+import pytest
+from lib.i2c_bus import I2CBus, PRIORITY_ALARM, PRIORITY_SENSOR, PRIORITY_DISPLAY
+
+class FakeI2C:
+    """
+    Fake machine.I2C recording the order of transfers.
+    """
+    def __init__(self, fail_addresses: tuple = ()) -> None:
+        self.transfers = []
+        self.fail_addresses = fail_addresses
+
+    def writeto(self, addr, buf, stop=True):
+        if addr in self.fail_addresses:
+            raise OSError(5)
+        self.transfers.append(("writeto", addr, bytes(buf)))
+        return 1
+
+    def readfrom(self, addr, nbytes, stop=True):
+        self.transfers.append(("readfrom", addr, nbytes))
+        return bytes(nbytes)
+
+    def writeto_mem(self, addr, memaddr, buf, *, addrsize=8):
+        self.transfers.append(("writeto_mem", addr, memaddr))
+
+    def readfrom_mem(self, addr, memaddr, nbytes, *, addrsize=8):
+        self.transfers.append(("readfrom_mem", addr, memaddr))
+        return bytes(nbytes)
+
+def test_transfers_are_proxied_and_counted():
+    fake = FakeI2C(fail_addresses=(0x3C,))
+    bus = I2CBus(fake)
+    bus.writeto(0x61, b"\x01")
+    assert bus.readfrom(0x61, 3) == bytes(3)
+    bus.writeto_mem(0x3E, 0x80, b"\x01")
+    with pytest.raises(OSError):
+        bus.writeto(0x3C, b"\x00")
+
+    assert fake.transfers == [("writeto", 0x61, b"\x01"), ("readfrom", 0x61, 3), ("writeto_mem", 0x3E, 0x80)]
+    devices = bus.get_stats()["devices"]
+    assert devices["0x61"]["transfers"] == 2
+    assert devices["0x61"]["errors"] == 0
+    assert devices["0x3c"]["errors"] == 1
+
+def test_waiters_served_by_priority_then_arrival():
+    fake = FakeI2C()
+    bus = I2CBus(fake)
+
+    async def user(addr: int, priority: int, started: asyncio.Event = None) -> None:
+        async with bus.transaction(priority):
+            if started:
+                started.set()
+            bus.writeto(addr, b"\x00")
+            await asyncio.sleep(0.01)
+            bus.readfrom(addr, 1)
+
+    async def run() -> None:
+        started = asyncio.Event()
+        holder = asyncio.create_task(user(0x61, PRIORITY_SENSOR, started))
+        await started.wait()
+        waiters = [
+            asyncio.create_task(user(0x3C, PRIORITY_DISPLAY)),
+            asyncio.create_task(user(0x77, PRIORITY_SENSOR)),
+            asyncio.create_task(user(0x62, PRIORITY_ALARM)),
+            asyncio.create_task(user(0x3E, PRIORITY_DISPLAY)),
+            ]
+        await asyncio.gather(holder, *waiters)
+
+    asyncio.run(run())
+
+    order = [addr for _, addr, _ in fake.transfers]
+    assert order == [0x61, 0x61, 0x62, 0x62, 0x77, 0x77, 0x3C, 0x3C, 0x3E, 0x3E]
+    stats = bus.get_stats()
+    assert stats["contended"] == 4
+    assert stats["waiting"] == 0
+    assert not bus.locked()
+
+def test_try_acquire_fails_while_transaction_held():
+    bus = I2CBus(FakeI2C())
+
+    async def run() -> None:
+        async with bus.transaction(PRIORITY_SENSOR):
+            assert bus.try_acquire() is False
+        assert bus.try_acquire() is True
+        bus.release()
+
+    asyncio.run(run())
+    assert not bus.locked()
+
+def test_cancelled_waiter_does_not_block_bus():
+    bus = I2CBus(FakeI2C())
+
+    async def run() -> None:
+        await bus.acquire(PRIORITY_SENSOR)
+        waiter = asyncio.create_task(bus.acquire(PRIORITY_DISPLAY))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        bus.release()
+
+    asyncio.run(run())
+    assert not bus.locked()
@@ -0,0 +1,76 @@
+import pytest
+from lib.loop_monitor import LoopMonitor, TaskStats, InstrumentedCoroutine
+
+def test_lag_histogram():
+    monitor = LoopMonitor(100, 50)
+    for lag_ms in [0, 3, 7, 49, 50, 120, 2000]:
+        monitor.record_lag(lag_ms)
+    histogram = monitor.get_histogram()
+    assert histogram["0-5"] == 2
+    assert histogram["5-10"] == 1
+    assert histogram["20-50"] == 1
+    assert histogram["50-100"] == 1
+    assert histogram["100-200"] == 1
+    assert histogram["1000+"] == 1
+    assert monitor.samples == 7
+    assert monitor.max_lag_ms == 2000
+
+def test_instrumented_coroutine_attributes_stalls(monkeypatch):
+    import lib.loop_monitor
+    clock = {"now": 0}
+    monkeypatch.setattr(lib.loop_monitor, "ticks_us", lambda: clock["now"])
+    durations = iter([1000, 80000, 2000])
+
+    class Stepper:
+        """
+        Coroutine stand in that advances the clock by each step's duration.
+        """
+        def __init__(self):
+            self.received = []
+
+        def send(self, value):
+            self.received.append(value)
+            clock["now"] += next(durations)
+            if len(self.received) == 3:
+                raise StopIteration("done")
+            return "yielded"
+
+        def throw(self, *args):
+            raise args[0]
+
+    monitor = LoopMonitor(100, 50)
+    stats = TaskStats("slow_task")
+    monitor.tasks["slow_task"] = stats
+    stepper = Stepper()
+    wrapped = InstrumentedCoroutine(monitor, stats, stepper)
+    assert wrapped.send(None) == "yielded"
+    assert wrapped.send(1) == "yielded"
+    with pytest.raises(StopIteration):
+        wrapped.send(2)
+    assert stepper.received == [None, 1, 2]
+    assert stats.steps == 3
+    assert stats.max_us == 80000
+    assert stats.stalls == 1
+    assert monitor.last_stall == ("slow_task", 80)
+    assert monitor.get_top_offenders()[0] == {"name": "slow_task", "steps": 3, "total_ms": 83, "max_ms": 80, "stalls": 1}
+
+def test_instrumented_coroutine_passes_exceptions():
+    monitor = LoopMonitor(100, 50)
+    stats = TaskStats("task")
+
+    async def coroutine():
+        try:
+            await Yield()
+        except ValueError:
+            return "handled"
+
+    class Yield:
+        def __await__(self):
+            yield
+
+    wrapped = InstrumentedCoroutine(monitor, stats, coroutine())
+    wrapped.send(None)
+    with pytest.raises(StopIteration) as result:
+        wrapped.throw(ValueError("stop"))
+    assert result.value.value == "handled"
+    assert stats.steps == 2
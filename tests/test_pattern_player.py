@@ -0,0 +1,110 @@
+import pytest
+import asyncio
+from lib.pattern_player import PatternPlayer
+
+class FakePin:
+    def __init__(self):
+        self.values = []
+
+    def value(self, value=None):
+        if value is not None:
+            self.values.append(value)
+
+class FakePWM:
+    def __init__(self, pin):
+        self.duties = []
+        self.frequency = None
+
+    def freq(self, frequency):
+        self.frequency = frequency
+
+    def duty_u16(self, duty):
+        self.duties.append(duty)
+
+def run_steps(player: PatternPlayer, steps: int) -> None:
+    for _ in range(steps):
+        player.timer.fire()
+
+def test_flash_pattern():
+    assert PatternPlayer.flash(2) == ((0, 250), (1, 250))
+    assert PatternPlayer.flash(4, 0.5) == ((0, 125), (0.5, 125))
+
+def test_pattern_repeats_then_turns_output_off():
+    pin = FakePin()
+    player = PatternPlayer(pin)
+    player.play(PatternPlayer.flash(2), 2)
+    assert player.timer.period == 250
+    run_steps(player, 4)
+    assert pin.values == [0, 1, 0, 1, 0]
+    assert player.is_playing() is False
+    assert player.timer.callback is None
+
+def test_pattern_plays_until_stopped():
+    pin = FakePin()
+    player = PatternPlayer(pin)
+    player.play(((1, 100), (0, 400)))
+    run_steps(player, 9)
+    assert pin.values == [1, 0] * 5
+    assert player.timer.period == 400
+    player.stop()
+    assert pin.values[-1] == 0
+    assert player.is_playing() is False
+    assert player.timer.callback is None
+
+def test_pwm_duty(monkeypatch):
+    monkeypatch.setattr("lib.pattern_player.PWM", FakePWM)
+    player = PatternPlayer(FakePin(), pwm_freq=2000)
+    assert player.pwm.frequency == 2000
+    player.play(((0.5, 10), (1, 10)), 1)
+    run_steps(player, 2)
+    assert player.pwm.duties == [0, 32767, 65535, 0]
+
+def test_alarm_buzzer_pattern_sounds_a_tone_with_pwm(monkeypatch):
+    from lib.sensors.alarm import ALARM_BUZZER_PATTERN, ALARM_BUZZER_TEST_PATTERN
+    monkeypatch.setattr("lib.pattern_player.PWM", FakePWM)
+    player = PatternPlayer(FakePin(), pwm_freq=2000)
+    player.play(ALARM_BUZZER_PATTERN, 1)
+    run_steps(player, 2)
+    player.play(ALARM_BUZZER_TEST_PATTERN, 1)
+    run_steps(player, 1)
+    assert player.pwm.duties == [0, 32767, 0, 0, 32767, 0]
+
+def test_pattern_converted_to_output_levels_on_play(monkeypatch):
+    monkeypatch.setattr("lib.pattern_player.PWM", FakePWM)
+    player = PatternPlayer(FakePin(), pwm_freq=2000)
+    player.play(((0.25, 10), (0, 20)))
+    assert player.pattern == ((16383, 10), (0, 20))
+    pin_player = PatternPlayer(FakePin())
+    pin_player.play(((0.25, 10), (0, 20)))
+    assert pin_player.pattern == ((1, 10), (0, 20))
+
+def test_async_play_waits_for_pattern():
+    pin = FakePin()
+    player = PatternPlayer(pin)
+
+    async def fire_timer():
+        while player.is_playing():
+            await asyncio.sleep(0)
+            player.timer.fire()
+
+    async def main():
+        await asyncio.gather(player.async_play(PatternPlayer.flash(10), 3), fire_timer())
+
+    asyncio.run(main())
+    assert pin.values == [0, 1, 0, 1, 0, 1, 0]
+
+def test_async_play_stops_when_cancelled():
+    pin = FakePin()
+    player = PatternPlayer(pin)
+
+    async def main():
+        task = asyncio.create_task(player.async_play(PatternPlayer.flash(1)))
+        await asyncio.sleep(0)
+        player.timer.fire()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert pin.values == [0, 1, 0]
+    assert player.is_playing() is False
@@ -0,0 +1,115 @@
+import asyncio
+import pytest
+from lib.loop_monitor import LoopMonitor
+from lib.supervisor import Supervisor, RESTART_ALWAYS, RESTART_NEVER
+
+@pytest.fixture
+def backoffs(monkeypatch):
+    import lib.supervisor
+    delays = []
+    async def fake_sleep(delay_s):
+        delays.append(delay_s)
+    monkeypatch.setattr(lib.supervisor, "sleep", fake_sleep)
+    return delays
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_failed_task_restarts_with_backoff(backoffs):
+    supervisor = Supervisor(LoopMonitor(100, 50))
+    runs = []
+
+    async def flaky():
+        runs.append(len(runs))
+        await asyncio.sleep(0)
+        if len(runs) < 4:
+            raise ValueError(f"run {len(runs)}")
+
+    async def main():
+        await supervisor.start("flaky", flaky)
+
+    run(main())
+    status = supervisor.get_statuses()["flaky"]
+    assert len(runs) == 4
+    assert backoffs == [1, 2, 4]
+    assert status["state"] == "finished"
+    assert status["restarts"] == 3
+    assert status["failures"] == 3
+    assert status["last_error"] == "ValueError: run 3"
+    assert status["steps"] >= 8
+
+def test_restart_policies(backoffs):
+    supervisor = Supervisor(LoopMonitor(100, 50))
+    runs = {"always": 0, "never": 0}
+
+    async def returns():
+        runs["always"] += 1
+        if runs["always"] == 3:
+            raise asyncio.CancelledError()
+
+    async def fails():
+        runs["never"] += 1
+        raise RuntimeError("broken")
+
+    async def main():
+        with pytest.raises(asyncio.CancelledError):
+            await supervisor.start("always", returns, RESTART_ALWAYS)
+        await supervisor.start("never", fails, RESTART_NEVER)
+
+    run(main())
+    statuses = supervisor.get_statuses()
+    assert runs == {"always": 3, "never": 1}
+    assert statuses["always"]["state"] == "stopped"
+    assert statuses["always"]["restarts"] == 2
+    assert statuses["never"]["state"] == "failed"
+    assert statuses["never"]["restarts"] == 0
+
+def test_cancel_stops_task():
+    supervisor = Supervisor(LoopMonitor(100, 50))
+
+    async def forever():
+        while True:
+            await asyncio.sleep(0)
+
+    async def main():
+        task = supervisor.start("forever", forever)
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return task
+
+    task = run(main())
+    assert task.done()
+    status = supervisor.get_statuses()["forever"]
+    assert status["state"] == "stopped"
+    assert status["steps"] > 1
+
+def test_start_returns_running_task_of_same_name():
+    supervisor = Supervisor(LoopMonitor(100, 50))
+    runs = []
+
+    async def forever():
+        runs.append(len(runs))
+        while True:
+            await asyncio.sleep(0)
+
+    async def main():
+        task = supervisor.start("forever", forever)
+        await asyncio.sleep(0.01)
+        assert supervisor.start("forever", forever) is task
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        restarted = supervisor.start("forever", forever)
+        assert restarted is not task
+        await asyncio.sleep(0.01)
+        restarted.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await restarted
+
+    run(main())
+    assert runs == [0, 1]
+    assert list(supervisor.get_statuses()) == ["forever"]
+    assert supervisor.get_statuses()["forever"]["state"] == "stopped"
@@ -0,0 +1,154 @@
+import asyncio
+import socket
+import pytest
+from lib.ulogging import Syslog, INFO, ERROR
+
+@pytest.fixture(autouse=True)
+def no_hostname(monkeypatch):
+    """
+    Other tests set the mock network hostname, which would otherwise appear
+    in the records.
+    """
+    import network
+    monkeypatch.setattr(network, "hostname", lambda name=None: None)
+
+@pytest.fixture
+def collector():
+    """
+    Local stand in for a syslog collector.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.settimeout(1)
+    yield sock
+    sock.close()
+
+def receive(collector, count: int) -> list:
+    return [collector.recv(1024).decode() for _ in range(count)]
+
+def test_records_are_sent_as_rfc5424(collector):
+    handler = Syslog("127.0.0.1", collector.getsockname()[1], 4)
+    handler.emit("[Info][Test]: first", INFO)
+    handler.emit("[Error][Test]: second", ERROR)
+    handler.send_queued()
+    assert receive(collector, 2) == [
+        "<134>1 - - smibhid - - - [Info][Test]: first",
+        "<131>1 - - smibhid - - - [Error][Test]: second",
+        ]
+    assert handler.count == 0
+    assert handler.sent == 2
+    handler.close()
+
+def test_full_queue_drops_records_and_reports_drops(collector):
+    handler = Syslog("127.0.0.1", collector.getsockname()[1], 2)
+    for number in range(5):
+        handler.emit(f"record {number}", INFO)
+    assert handler.count == 2
+    assert handler.dropped == 3
+    handler.send_queued()
+    assert receive(collector, 3) == [
+        "<132>1 - - smibhid - - - Syslog queue full, dropped 3 log records",
+        "<134>1 - - smibhid - - - record 0",
+        "<134>1 - - smibhid - - - record 1",
+        ]
+    assert handler.dropped == 0
+    handler.close()
+
+def test_records_stay_queued_while_collector_unreachable(collector, monkeypatch):
+    import lib.ulogging
+    monkeypatch.setattr(lib.ulogging, "SYSLOG_RETRY_MS", 10)
+    monkeypatch.setattr(lib.ulogging, "SYSLOG_LOOKUP_RETRY_MS", 10)
+    handler = Syslog("127.0.0.1", collector.getsockname()[1], 4)
+    handler.emit("queued while down", INFO)
+
+    def unreachable(*args):
+        raise OSError(113, "EHOSTUNREACH")
+
+    getaddrinfo = socket.getaddrinfo
+
+    async def main():
+        lib.ulogging.socket.getaddrinfo = unreachable
+        try:
+            task = asyncio.create_task(handler.async_run())
+            await asyncio.sleep(0.02)
+            assert handler.count == 1
+        finally:
+            lib.ulogging.socket.getaddrinfo = getaddrinfo
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(main())
+    assert receive(collector, 1) == ["<134>1 - - smibhid - - - queued while down"]
+    assert handler.count == 0
+    handler.close()
+
+class FailingSocket:
+    def sendto(self, data, address):
+        raise OSError(113, "EHOSTUNREACH")
+
+    def close(self):
+        pass
+
+def test_address_is_kept_across_send_failures(collector, monkeypatch):
+    import lib.ulogging
+    monkeypatch.setattr(lib.ulogging, "SYSLOG_RETRY_MS", 10)
+    lookups = []
+    getaddrinfo = socket.getaddrinfo
+
+    def counting_getaddrinfo(*args):
+        lookups.append(args[0])
+        return getaddrinfo(*args)
+
+    handler = Syslog("127.0.0.1", collector.getsockname()[1], 4)
+
+    async def main():
+        lib.ulogging.socket.getaddrinfo = counting_getaddrinfo
+        try:
+            handler.connect()
+            handler.sock.close()
+            handler.sock = FailingSocket()
+            handler.emit("sent after a failure", INFO)
+            task = asyncio.create_task(handler.async_run())
+            await asyncio.sleep(0.05)
+            task.cancel()
+        finally:
+            lib.ulogging.socket.getaddrinfo = getaddrinfo
+
+    asyncio.run(main())
+    assert receive(collector, 1) == ["<134>1 - - smibhid - - - sent after a failure"]
+    assert lookups == ["127.0.0.1"]
+    handler.close()
+
+def test_no_lookup_while_network_disconnected(monkeypatch):
+    import lib.ulogging
+    import network
+    monkeypatch.setattr(lib.ulogging, "SYSLOG_RETRY_MS", 10)
+    monkeypatch.setattr(network.WLAN, "status", lambda self: 1)
+    handler = Syslog("collector.invalid", 514, 4)
+    handler.emit("queued while offline", INFO)
+
+    def lookup(*args):
+        raise AssertionError("getaddrinfo called while offline")
+
+    getaddrinfo = socket.getaddrinfo
+
+    async def main():
+        lib.ulogging.socket.getaddrinfo = lookup
+        try:
+            task = asyncio.create_task(handler.async_run())
+            await asyncio.sleep(0.05)
+            assert not task.done()
+            task.cancel()
+        finally:
+            lib.ulogging.socket.getaddrinfo = getaddrinfo
+
+    asyncio.run(main())
+    assert handler.count == 1
+    assert handler.address is None
+
+def test_empty_host_disables_handler():
+    handler = Syslog("", 514, 4)
+    assert handler.enabled is False
+    handler.emit("not queued", INFO)
+    assert handler.count == 0
+    asyncio.run(handler.async_run())
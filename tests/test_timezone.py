@@ -0,0 +1,50 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from lib.timezone import TimeZone
+
+# Published BST start and end instants
+BST_TIMESTAMPS = {
+    2025: {"start": 1743296400, "end": 1761440400},
+    2026: {"start": 1774746000, "end": 1792890000},
+    2027: {"start": 1806195600, "end": 1824944400},
+    2028: {"start": 1837645200, "end": 1856394000},
+    2029: {"start": 1869094800, "end": 1887843600},
+    2030: {"start": 1901149200, "end": 1919293200},
+}
+
+@pytest.mark.parametrize("year", BST_TIMESTAMPS.keys())
+def test_dst_transitions_match_published_dates(year: int):
+    uk_time = TimeZone()
+    assert uk_time.dst_start(year) == BST_TIMESTAMPS[year]["start"]
+    assert uk_time.dst_end(year) == BST_TIMESTAMPS[year]["end"]
+
+@pytest.mark.parametrize("year", BST_TIMESTAMPS.keys())
+def test_offset_changes_at_transitions(year: int):
+    uk_time = TimeZone()
+    start = BST_TIMESTAMPS[year]["start"]
+    end = BST_TIMESTAMPS[year]["end"]
+    assert uk_time.utc_offset_s(start - 1) == 0
+    assert uk_time.utc_offset_s(start) == 3600
+    assert uk_time.is_dst(end - 1) is True
+    assert uk_time.is_dst(end) is False
+    assert uk_time.next_transition(start - 1) == start
+    assert uk_time.next_transition(start) == end
+    assert uk_time.next_transition(end) == uk_time.dst_start(year + 1)
+
+def test_local_hour():
+    uk_time = TimeZone()
+    assert uk_time.local_hour(BST_TIMESTAMPS[2026]["start"] - 1) == 0
+    assert uk_time.local_hour(BST_TIMESTAMPS[2026]["start"]) == 2
+    assert uk_time.local_hour(BST_TIMESTAMPS[2026]["end"] - 1) == 1
+    assert uk_time.local_hour(BST_TIMESTAMPS[2026]["end"]) == 1
+    assert uk_time.localtime(1782820800)[0:5] == (2026, 6, 30, 13, 0)
+
+def last_sunday_0100_utc(year: int, month: int) -> int:
+    day = datetime(year, month, 31, 1, tzinfo=timezone.utc)
+    return int((day - timedelta(days=(day.weekday() + 1) % 7)).timestamp())
+
+def test_transitions_for_all_years():
+    uk_time = TimeZone()
+    for year in range(1971, 2100):
+        assert uk_time.dst_start(year) == last_sunday_0100_utc(year, 3)
+        assert uk_time.dst_end(year) == last_sunday_0100_utc(year, 10)
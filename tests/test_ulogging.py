@@ -0,0 +1,282 @@
+import pytest
+import tracemalloc
+from lib.ulogging import uLogger, LogFileBuffer, LogSegments, CRITICAL, INFO
+
+class Recorder:
+    def __init__(self) -> None:
+        self.messages = []
+
+    def emit(self, message, level) -> None:
+        self.messages.append(message)
+
+def make_logger(log_level: int) -> tuple:
+    log = uLogger("Test", log_level, ["Console"])
+    recorder = Recorder()
+    log.handler_objects = [recorder]
+    return log, recorder
+
+def test_lazy_messages_are_formatted_when_enabled():
+    log, recorder = make_logger(4)
+    log.info("Readings: %s from %s", {"co2": 400}, "SCD30")
+    log.warn(lambda: "built")
+    log.error("100% plain")
+    assert recorder.messages[0].endswith("[Info][Test]: Readings: {'co2': 400} from SCD30")
+    assert recorder.messages[1].endswith("[Warning][Test]: built")
+    assert recorder.messages[2].endswith("[Error][Test]: 100% plain")
+
+def test_level_flags_gate_messages():
+    log, recorder = make_logger(2)
+    assert (log.enabled_critical, log.enabled_error, log.enabled_warn, log.enabled_info) == (True, True, False, False)
+
+    def fail() -> str:
+        raise AssertionError("disabled message was built")
+
+    log.info(fail)
+    log.warn("%s", fail)
+    assert recorder.messages == []
+
+class FakeModule:
+    def __init__(self, reading: dict) -> None:
+        self.reading = reading
+        self.poll_interval_s = 60
+
+    def get_sensors(self) -> list:
+        return [{"name": name, "unit": "u"} for name in self.reading]
+
+    async def async_get_reading(self) -> dict:
+        return dict(self.reading)
+
+class FakeWrapper:
+    async def async_slack_api_request(self, method: str, url: str, data: str) -> dict:
+        return {}
+
+class DisabledAlarm:
+    enabled = False
+
+@pytest.fixture()
+def sensors(tmp_path, monkeypatch):
+    import lib.sensors
+    import lib.displays.display
+    from lib.sensors.schema import SensorSchema
+    from lib.sensors.snapshot import ReadingsSnapshot
+    from lib.sensors.file_logging import FileLogger
+    from lib.sensors.ring_log import RingLog
+    from lib.sensors.upload_queue import UploadQueue
+    from lib.sensors.compact_payload import CompactPayload
+    from lib.i2c_bus import I2CBus
+    from lib.ulogging import get_logger
+    monkeypatch.setattr(lib.sensors, "SENSOR_LOG_CACHE_ENABLED", True)
+    monkeypatch.setattr(lib.displays.display, "DISPLAY_DRIVERS", [])
+
+    sensors = lib.sensors.Sensors.__new__(lib.sensors.Sensors)
+    sensors.log = get_logger("Sensors")
+    sensors.i2c = I2CBus(None)
+    sensors.display = lib.displays.display.Display(sensors.i2c)
+    sensors.api_wrapper = FakeWrapper()
+    sensors.alarm = DisabledAlarm()
+    sensors.configured_modules = {
+        "SCD30": FakeModule({"co2": 612.5, "temperature": 21.3, "relative_humidity": 48.2}),
+        "BME280": FakeModule({"temperature": 21.1, "pressure": 1012.8, "humidity": 47.9}),
+        "SGP30": FakeModule({"eco2": 640, "tvoc": 27}),
+        }
+    sensors.schema = SensorSchema(sensors.configured_modules)
+    sensors.latest_values = sensors.schema.new_values()
+    sensors.snapshot = ReadingsSnapshot()
+    sensors._refresh_event = None
+    sensors.MAX_PUSH_BATCHES = 10
+    sensors.file_logger = FileLogger()
+    sensors.file_logger.enabled = True
+    sensors.file_logger.minute_log = RingLog(f"{tmp_path}/minute_log.bin")
+    sensors.file_logger.hour_log = RingLog(f"{tmp_path}/hour_log.bin")
+    sensors.file_logger.configure_channels(sensors.get_channels())
+    sensors.upload_queue = UploadQueue(f"{tmp_path}/upload_queue/", 8192)
+    sensors.upload_queue.init()
+    sensors.compact_payload = CompactPayload(sensors.schema.channels, sensors.schema.units)
+    sensors.acknowledged_schema_id = None
+    return sensors
+
+def count_log_call_allocations(monkeypatch) -> list:
+    """
+    Wrap the uLogger level methods to count, on entry, the memory blocks
+    still held that were allocated on the calling line, i.e. the message
+    and arguments built for the call. Returns the list of per call counts.
+    """
+    import sys
+    counts = []
+
+    def counting(method):
+        def wrapper(self, message, *args):
+            caller = sys._getframe(1)
+            snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, caller.f_code.co_filename, caller.f_lineno)])
+            counts.append(sum(stat.count for stat in snapshot.statistics("lineno")))
+            return method(self, message, *args)
+        return wrapper
+
+    for name in ("info", "warn", "error", "critical"):
+        monkeypatch.setattr(uLogger, name, counting(getattr(uLogger, name)))
+    return counts
+
+def test_disabled_logging_allocations_for_sensor_poll_cycle(sensors, monkeypatch):
+    """
+    Count the allocations made to build log messages over real sensor poll
+    and push passes at the default LOG_LEVEL of 2, where info messages are
+    discarded and so should cost nothing to build.
+    """
+    import asyncio
+    from lib.ulogging import set_log_level, get_log_levels
+    levels = get_log_levels()
+    set_log_level(2)
+    counts = count_log_call_allocations(monkeypatch)
+
+    async def poll_cycles():
+        for _ in range(5):
+            await sensors.async_refresh_snapshot()
+            await sensors._async_push_latest_readings()
+
+    tracemalloc.start()
+    try:
+        asyncio.run(poll_cycles())
+    finally:
+        tracemalloc.stop()
+        for name, level in levels.items():
+            set_log_level(level, name)
+
+    assert sensors.upload_queue.pending() is False
+    assert sensors.file_logger.minute_log.count == 5
+    assert len(counts) > 5 * 10
+    assert sum(counts) == 0
+
+def test_log_file_buffer_flushes_on_size_and_level(tmp_path):
+    segments = LogSegments(str(tmp_path / "logs"), 1000, 4)
+    buffer = LogFileBuffer(segments, 32, 60000)
+    buffer.write("first line", INFO)
+    assert segments.segments == []
+    buffer.write("second line", INFO)
+    buffer.write("third line", INFO)
+    assert (tmp_path / "logs" / "1.txt").read_text() == "first line\nsecond line\n"
+    buffer.write("critical", CRITICAL)
+    assert (tmp_path / "logs" / "1.txt").read_text() == "first line\nsecond line\nthird line\ncritical\n"
+    assert segments.current_size == 43
+
+def test_log_file_buffer_flushes_after_interval(tmp_path, monkeypatch):
+    import lib.ulogging
+    clock = {"now": 0}
+    monkeypatch.setattr(lib.ulogging, "ticks_ms", lambda: clock["now"])
+    segments = LogSegments(str(tmp_path / "logs"), 1000, 4)
+    buffer = LogFileBuffer(segments, 256, 5000)
+    buffer.write("early", INFO)
+    clock["now"] = 5000
+    buffer.write("late", INFO)
+    assert "".join(segments.read_lines()) == "early\nlate\n"
+
+def test_log_segments_rotate_without_rewriting(tmp_path, monkeypatch):
+    import lib.ulogging
+    clock = {"now": 1000}
+    monkeypatch.setattr(lib.ulogging, "time", lambda: clock["now"])
+    directory = tmp_path / "logs"
+    segments = LogSegments(str(directory), 20, 3)
+    lines = [f"line {number:02}\n" for number in range(12)]
+    for line in lines:
+        segments.append(line.encode())
+        clock["now"] += 1
+
+    # Each segment takes three 8 byte lines before passing 20 bytes
+    assert [segment["segment"] for segment in segments.get_segments()] == [3, 4, 5]
+    assert sorted(path.name for path in directory.iterdir()) == ["3.txt", "4.txt", "index.json"]
+    assert "".join(segments.read_lines()) == "".join(lines[6:12])
+    assert "".join(segments.read_lines(segment=3)) == "".join(lines[6:9])
+    assert segments.segments[1][1] == 1008
+
+    reloaded = LogSegments(str(directory), 20, 3)
+    assert reloaded.segments == segments.segments
+    assert reloaded.current_size == 0
+    reloaded.append(b"line 12\n")
+    assert "".join(reloaded.read_lines(segment=5)) == "line 12\n"
+
+def test_log_segments_create_directory_on_first_write(tmp_path):
+    directory = tmp_path / "logs"
+    segments = LogSegments(str(directory), 20, 4)
+    assert not directory.exists()
+    assert "".join(segments.read_lines()) == ""
+    assert segments.get_segments() == []
+    segments.append(b"first\n")
+    assert (directory / "1.txt").read_text() == "first\n"
+
+def test_log_segments_adopt_legacy_log_files(tmp_path, monkeypatch):
+    import lib.ulogging
+    monkeypatch.setattr(lib.ulogging, "time", lambda: 2000)
+    (tmp_path / "log2.txt").write_text("older\n")
+    (tmp_path / "log.txt").write_text("newer\n")
+    legacy_files = [str(tmp_path / "log2.txt"), str(tmp_path / "log.txt"), str(tmp_path / "missing.txt")]
+    directory = tmp_path / "logs"
+
+    segments = LogSegments(str(directory), 20, 4, legacy_files)
+    assert (tmp_path / "log.txt").exists()
+    segments.append(b"upgraded\n")
+
+    assert not (tmp_path / "log.txt").exists()
+    assert not (tmp_path / "log2.txt").exists()
+    assert segments.segments == [[1, None], [2, None]]
+    assert "".join(segments.read_lines()) == "older\nnewer\nupgraded\n"
+    assert LogSegments(str(directory), 20, 4, legacy_files).segments == [[1, None], [2, None]]
+
+def test_log_segments_tail(tmp_path):
+    segments = LogSegments(str(tmp_path / "logs"), 20, 4)
+    lines = [f"line {number:02}\n" for number in range(9)]
+    for line in lines:
+        segments.append(line.encode())
+    assert "".join(segments.read_lines(tail_bytes=8)) == lines[8]
+    assert "".join(segments.read_lines(tail_bytes=12)) == lines[8]
+    assert "".join(segments.read_lines(tail_bytes=28)) == "".join(lines[6:9])
+    assert "".join(segments.read_lines(tail_bytes=1000)) == "".join(lines)
+
+def test_decoration_cache_reuses_timestamp_and_samples_memory(monkeypatch):
+    import lib.ulogging
+    clock = {"s": 1782820800, "ms": 0}
+    samples = []
+    gmtime_calls = []
+    real_gmtime = lib.ulogging.gmtime
+    monkeypatch.setattr(lib.ulogging, "time", lambda: clock["s"])
+    monkeypatch.setattr(lib.ulogging, "ticks_ms", lambda: clock["ms"])
+    monkeypatch.setattr(lib.ulogging, "gmtime", lambda now: gmtime_calls.append(now) or real_gmtime(now))
+    monkeypatch.setattr(lib.ulogging, "mem_free", lambda: samples.append(1) or 102400)
+    cache = lib.ulogging.DecorationCache()
+
+    assert cache.get_timestamp() == "2026-6-30 12:0:0"
+    assert cache.get_mem(INFO) == "100kB free"
+    clock["ms"] = 500
+    cache.get_timestamp()
+    cache.get_mem(INFO)
+    assert len(gmtime_calls) == 1
+    assert len(samples) == 1
+
+    cache.get_mem(lib.ulogging.WARNING)
+    assert len(samples) == 2
+    clock["s"] += 1
+    clock["ms"] += lib.ulogging.MEM_SAMPLE_MS
+    assert cache.get_timestamp() == "2026-6-30 12:0:1"
+    cache.get_mem(INFO)
+    assert len(gmtime_calls) == 2
+    assert len(samples) == 3
+
+def test_get_logger_shares_loggers_and_handlers(monkeypatch):
+    import lib.ulogging
+    monkeypatch.setattr(lib.ulogging, "loggers", {})
+    monkeypatch.setattr(lib.ulogging, "handler_instances", {})
+    monkeypatch.setattr(lib.ulogging, "logging_config", (2, ["Console"]))
+    first = lib.ulogging.get_logger("Button 12")
+    assert lib.ulogging.get_logger("Button 12") is first
+    other = lib.ulogging.get_logger("Sensors")
+    assert other is not first
+    assert other.handler_objects[0] is first.handler_objects[0]
+    assert lib.ulogging.get_log_levels() == {"Button 12": 2, "Sensors": 2}
+
+    assert lib.ulogging.set_log_level(4, "Sensors") == ["Sensors"]
+    assert other.enabled_info is True
+    assert first.enabled_info is False
+    assert sorted(lib.ulogging.set_log_level(0)) == ["Button 12", "Sensors"]
+    assert first.enabled_critical is False
+
+    for level, module in ((5, ""), (-1, ""), (3, "Missing")):
+        with pytest.raises(ValueError):
+            lib.ulogging.set_log_level(level, module)